@@ -1,4 +1,23 @@
+import os
+
 from .base_adapter import VectorDBAdapter
 from .pinecone_adapter import PineconeAdapter
+from .local_adapter import LocalVectorAdapter
+
+__all__ = ["VectorDBAdapter", "PineconeAdapter", "LocalVectorAdapter", "create_vector_adapter"]
+
+
+def create_vector_adapter(provider: str = None) -> VectorDBAdapter:
+    """
+    Create the vector database adapter selected by VECTOR_DB_PROVIDER.
+
+    Supported providers: "pinecone" (default), "local" (in-process NumPy store).
+    """
+    provider = (provider or os.getenv("VECTOR_DB_PROVIDER", "pinecone")).lower()
+
+    if provider == "pinecone":
+        return PineconeAdapter()
+    if provider == "local":
+        return LocalVectorAdapter()
 
-__all__ = ["VectorDBAdapter", "PineconeAdapter"]
+    raise ValueError(f"Unknown VECTOR_DB_PROVIDER: {provider}")
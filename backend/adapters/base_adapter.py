@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 
 
 class VectorDBAdapter(ABC):
@@ -8,7 +8,7 @@ class VectorDBAdapter(ABC):
     @abstractmethod
     def upsert(
         self,
-        vectors: List[List[float]],
+        vectors: Sequence[Sequence[float]],
         metadata: List[Dict[str, Any]],
         namespace: str,
         ids: List[str]
@@ -17,16 +17,98 @@ class VectorDBAdapter(ABC):
         Upsert vectors to the vector database
 
         Args:
-            vectors: List of embedding vectors (each should be 1536 dimensions for text-embedding-3-small)
+            vectors: Embedding vectors - float32 arrays or float lists (1536 dimensions for text-embedding-3-small)
             metadata: List of metadata dictionaries (one per vector)
             namespace: Namespace to store vectors in (typically filename-based)
             ids: List of unique identifiers for each vector
 
         Returns:
-            Dict with upsert result stats (e.g., {'upserted_count': 45})
+            Dict with upsert result stats (e.g., {'upserted_count': 45}).
+            Adapters that send several requests may also return
+            'batch_count' and 'failed_batches' ([{'batch_index', 'ids', 'error'}])
+            so callers can retry only the failed IDs.
         """
         pass
 
+    @abstractmethod
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the vectors most similar to a query vector
+
+        Args:
+            vector: Query embedding (same dimensions as the stored vectors)
+            top_k: Maximum number of matches to return
+            namespace: Namespace to search
+            filter: Optional metadata filter, e.g. {"filename": "a.pdf", "page_number": {"$in": [1, 2]}}
+
+        Returns:
+            List of matches sorted by similarity: [{"id": str, "score": float, "metadata": dict}, ...]
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str], namespace: str) -> int:
+        """
+        Delete vectors by ID
+
+        Args:
+            ids: IDs to delete (unknown IDs are ignored)
+            namespace: Namespace the vectors live in
+
+        Returns:
+            Number of IDs requested for deletion
+        """
+        pass
+
+    @abstractmethod
+    def update_metadata(
+        self,
+        ids: List[str],
+        metadata: List[Dict[str, Any]],
+        namespace: str
+    ) -> int:
+        """
+        Replace the metadata of existing vectors without re-sending their values
+
+        Args:
+            ids: IDs of vectors to update
+            metadata: New metadata (one per ID); fields are merged into the stored metadata
+            namespace: Namespace the vectors live in
+
+        Returns:
+            Number of vectors updated
+        """
+        pass
+
+    def close(self) -> None:
+        """Release network connections; the adapter isn't used afterwards."""
+        pass
+
+    def index_dimension(self) -> Optional[int]:
+        """Vector dimension the index was created with, or None if it accepts any."""
+        return None
+
+    def check_dimensions(self, dimensions: int) -> None:
+        """
+        Verify embeddings of this size can be stored in the index
+
+        Raises:
+            ValueError: If the index was created with a different dimension
+        """
+        index_dimension = self.index_dimension()
+        if index_dimension is not None and index_dimension != dimensions:
+            raise ValueError(
+                f"Embedding dimensions ({dimensions}) do not match the vector index dimension "
+                f"({index_dimension}) - set EMBEDDING_DIMENSIONS={index_dimension}, choose an EMBEDDING_PROVIDER "
+                f"model of that size or use a matching index"
+            )
+
     @abstractmethod
     def health_check(self) -> bool:
         """
@@ -0,0 +1,577 @@
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
+from .base_adapter import VectorDBAdapter
+from services.metrics import UPSERT_BATCH_SIZE
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+
+# Storage formats for vectors: float32, int8 with a per-vector scale (4x smaller)
+# or sign bits (32x smaller, scored against the full-precision query)
+QUANTIZATIONS = ("none", "int8", "binary")
+
+# Rows dequantized at a time when scoring, to bound the temporary float32 copy
+SCORE_BLOCK_ROWS = 8192
+
+# Stored code dtype per quantization
+CODE_DTYPES = {"none": np.float32, "int8": np.int8, "binary": np.uint8}
+
+# Journals shorter than this never trigger a snapshot rewrite, however small the namespace
+JOURNAL_MIN_ROWS = 1024
+
+
+# Pinecone's metadata filter operators ($exists, $and and $or are handled in _matches);
+# range operators only match numbers, as in Pinecone
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: _is_number(value) and value > operand,
+    "$gte": lambda value, operand: _is_number(value) and value >= operand,
+    "$lt": lambda value, operand: _is_number(value) and value < operand,
+    "$lte": lambda value, operand: _is_number(value) and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+
+class LocalVectorAdapter(VectorDBAdapter):
+    """
+    In-process vector store backed by NumPy (no network).
+
+    Each namespace keeps its vectors in one contiguous float32 array,
+    L2-normalized so cosine similarity is a single matrix-vector product.
+    Namespaces persist as .npy files under LOCAL_VECTOR_DIR and are
+    memory-mapped on load, so reopening a large store is near-instant.
+    Upserts and metadata updates are appended to a journal rather than
+    rewriting the namespace, so each write costs O(batch), not O(namespace).
+
+    Namespaces with at least ann_threshold vectors are searched through an
+    IVF index (k-means coarse quantizer, probing the nprobe closest lists)
+    instead of a full scan.
+
+    New namespaces store vectors in the configured quantization
+    (LOCAL_VECTOR_QUANTIZATION); existing namespaces keep the format they
+    were written with.
+    """
+
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        ann_threshold: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        quantization: Optional[str] = None,
+    ):
+        self.data_dir = data_dir or os.getenv("LOCAL_VECTOR_DIR", "./vector_store")
+        # 0 disables the approximate index (always exact search)
+        self.ann_threshold = ann_threshold if ann_threshold is not None else int(
+            os.getenv("LOCAL_VECTOR_ANN_THRESHOLD", "50000")
+        )
+        self.nprobe = nprobe or int(os.getenv("LOCAL_VECTOR_NPROBE", "8"))
+        self.quantization = (quantization or os.getenv("LOCAL_VECTOR_QUANTIZATION", "none")).lower()
+        if self.quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"LOCAL_VECTOR_QUANTIZATION must be one of {', '.join(QUANTIZATIONS)}, got {self.quantization}"
+            )
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    def upsert(
+        self,
+        vectors: Sequence[Sequence[float]],
+        metadata: List[Dict[str, Any]],
+        namespace: str,
+        ids: List[str]
+    ) -> Dict[str, Any]:
+        """Upsert vectors into a namespace and persist them to disk"""
+
+        # Same contract as Pinecone - never write to an unnamed namespace
+        if not namespace or not namespace.strip():
+            raise ValueError("namespace must be a non-empty string")
+
+        with self._lock:
+            store = self._get_namespace(namespace, create=True)
+            store.upsert(np.asarray(vectors, dtype=np.float32), metadata, ids)
+            store.save()
+
+        UPSERT_BATCH_SIZE.observe(len(ids), provider="local")
+        return {"upserted_count": len(ids)}
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the top_k most similar vectors by cosine similarity.
+
+        filter matches metadata fields exactly, or with Pinecone's operators ($eq, $ne,
+        $gt, $gte, $lt, $lte, $in, $nin, $exists, $and, $or); any other raises ValueError.
+
+        Returns list of {"id", "score", "metadata"} sorted by score descending.
+        """
+        if filter:
+            _check_filter(filter)
+        with self._lock:
+            store = self._get_namespace(namespace, create=False)
+            if store is None or store.count == 0:
+                return []
+
+            use_ann = self.ann_threshold and store.count >= self.ann_threshold
+            return store.search(
+                _normalize(np.asarray(vector, dtype=np.float32)),
+                top_k,
+                filter,
+                nprobe=self.nprobe if use_ann else None,
+            )
+
+    def delete(self, ids: List[str], namespace: str) -> int:
+        """Delete vectors by ID and persist the namespace"""
+        with self._lock:
+            store = self._get_namespace(namespace, create=False)
+            if store is not None and store.delete(ids):
+                store.save()
+        return len(ids)
+
+    def update_metadata(
+        self,
+        ids: List[str],
+        metadata: List[Dict[str, Any]],
+        namespace: str
+    ) -> int:
+        """Merge new metadata fields into existing vectors and persist them"""
+        with self._lock:
+            store = self._get_namespace(namespace, create=False)
+            if store is None:
+                return 0
+            updated = store.update_metadata(ids, metadata)
+            if updated:
+                store.save()
+        return updated
+
+    def health_check(self) -> bool:
+        """Check the data directory is writable"""
+        return os.path.isdir(self.data_dir) and os.access(self.data_dir, os.W_OK)
+
+    def _get_namespace(self, namespace: str, create: bool) -> Optional["_Namespace"]:
+        store = self._namespaces.get(namespace)
+        if store is None:
+            path = os.path.join(self.data_dir, _namespace_dirname(namespace))
+            if os.path.isdir(path):
+                store = _Namespace.load(path)
+            elif create:
+                store = _Namespace(path, namespace, self.quantization)
+            else:
+                return None
+            self._namespaces[namespace] = store
+        return store
+
+
+class _Namespace:
+    """
+    Vectors, IDs and metadata for one namespace (row i of each belongs together).
+
+    On disk a namespace is a snapshot (vectors-<generation>.npy,
+    scales-<generation>.npy, records.json) plus a journal of the upserts and metadata updates made since: stored
+    codes are appended to journal-<generation>.bin and one JSON line per
+    operation to journal-<generation>.jsonl. Loading replays the journal
+    named by the snapshot. The snapshot is rewritten, starting a new
+    generation, after a delete or once the journal holds more rows than the
+    snapshot, which keeps rewrites amortized O(1) per row.
+    """
+
+    def __init__(self, path: str, name: str, quantization: str = "none", dimension: int = 0,
+                 vectors: Optional[np.ndarray] = None, scales: Optional[np.ndarray] = None,
+                 ids: Optional[List[str]] = None, metadata: Optional[List[Dict[str, Any]]] = None,
+                 generation: Optional[int] = None):
+        self.path = path
+        self.name = name
+        self.quantization = quantization
+        self.dimension = dimension
+        self.count = len(ids) if ids else 0
+        # Stored codes (float32, int8 or packed bits); may be a read-only memmap until the first write
+        self.vectors = vectors if vectors is not None else np.empty((0, 0), dtype=np.float32)
+        # Per-vector dequantization scale (int8 only)
+        self.scales = scales
+        self.ids = ids or []
+        self.metadata = metadata or []
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self._ivf: Optional[_IVFIndex] = None
+
+        # None until a snapshot has been written
+        self.generation = generation
+        self._snapshot_rows = self.count
+        self._journal_rows = 0
+        # Operations not yet written to disk: ("upsert", ids, metadata, codes, scales) or
+        # ("update", ids, metadata, None, None); rewrite the snapshot instead if _dirty
+        self._pending: List[Tuple[str, List[str], List[Dict[str, Any]], Any, Any]] = []
+        self._dirty = False
+
+    def upsert(self, vectors: np.ndarray, metadata: List[Dict[str, Any]], ids: List[str]) -> None:
+        if vectors.ndim != 2 or len(vectors) != len(ids) or len(metadata) != len(ids):
+            raise ValueError("vectors, metadata and ids must have the same length")
+
+        if self.count and vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {vectors.shape[1]} does not match namespace dimension {self.dimension}"
+            )
+        self.dimension = vectors.shape[1]
+
+        codes, scales = _quantize(_normalize(vectors), self.quantization)
+        self._put(codes, scales, metadata, ids)
+        self._pending.append(("upsert", ids, metadata, codes, scales))
+
+    def update_metadata(self, ids: List[str], metadata: List[Dict[str, Any]]) -> int:
+        """Merge fields into the metadata of existing rows; returns the number updated."""
+        found_ids, found_metadata = [], []
+        for vector_id, fields in zip(ids, metadata):
+            row = self.rows.get(vector_id)
+            if row is not None:
+                self.metadata[row] = {**self.metadata[row], **fields}
+                found_ids.append(vector_id)
+                found_metadata.append(fields)
+        if found_ids:
+            self._pending.append(("update", found_ids, found_metadata, None, None))
+        return len(found_ids)
+
+    def _put(self, codes: np.ndarray, scales: Optional[np.ndarray],
+             metadata: List[Dict[str, Any]], ids: List[str]) -> None:
+        self._reserve(self.count + len(ids), codes.shape[1], codes.dtype)
+
+        for i, vector_id in enumerate(ids):
+            row = self.rows.get(vector_id)
+            if row is None:
+                row = self.count
+                self.rows[vector_id] = row
+                self.ids.append(vector_id)
+                self.metadata.append(metadata[i])
+                self.count += 1
+            else:
+                self.metadata[row] = metadata[i]
+            self.vectors[row] = codes[i]
+            if scales is not None:
+                self.scales[row] = scales[i]
+
+        self._ivf = None  # Rebuilt lazily on the next approximate search
+
+    def delete(self, ids: List[str]) -> int:
+        """Remove rows by ID, compacting the arrays; returns the number removed."""
+        doomed = {self.rows[vector_id] for vector_id in ids if vector_id in self.rows}
+        if not doomed:
+            return 0
+
+        keep = np.array([row for row in range(self.count) if row not in doomed], dtype=np.int64)
+        # Fancy indexing copies, which also detaches from a read-only memmap
+        self.vectors = self.vectors[keep]
+        if self.scales is not None:
+            self.scales = self.scales[keep]
+        self.ids = [self.ids[row] for row in keep]
+        self.metadata = [self.metadata[row] for row in keep]
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self.count = len(self.ids)
+
+        self._ivf = None
+        self._dirty = True  # Rows shifted - only a new snapshot can record that
+        return len(doomed)
+
+    def search(self, query: np.ndarray, top_k: int, filter: Optional[Dict[str, Any]],
+               nprobe: Optional[int]) -> List[Dict[str, Any]]:
+        if nprobe:
+            if self._ivf is None:
+                self._ivf = _IVFIndex.build(self.count, self.decode)
+            candidates = self._ivf.candidates(query, nprobe)
+        else:
+            candidates = np.arange(self.count)
+
+        if filter:
+            candidates = np.array(
+                [row for row in candidates if _matches(self.metadata[row], filter)], dtype=np.int64
+            )
+        if len(candidates) == 0:
+            return []
+
+        scores = self._scores(candidates, query)
+
+        # argpartition is O(n); only the top_k slice gets fully sorted
+        k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {
+                "id": self.ids[candidates[i]],
+                "score": float(scores[i]),
+                "metadata": self.metadata[candidates[i]],
+            }
+            for i in top
+        ]
+
+    def decode(self, rows: Any) -> np.ndarray:
+        """Approximate unit vectors (float32) for the given rows."""
+        codes = self.vectors[rows]
+        if self.quantization == "int8":
+            return codes.astype(np.float32) * self.scales[rows][:, None]
+        if self.quantization == "binary":
+            signs = np.unpackbits(codes, axis=1, count=self.dimension).astype(np.float32) * 2 - 1
+            return signs / np.sqrt(self.dimension)
+        return codes
+
+    def _scores(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if self.quantization == "none":
+            return self.vectors[rows] @ query
+        return np.concatenate([
+            self.decode(rows[i:i + SCORE_BLOCK_ROWS]) @ query
+            for i in range(0, len(rows), SCORE_BLOCK_ROWS)
+        ])
+
+    def save(self) -> None:
+        """Persist changes since the last save: append them to the journal, or rewrite the snapshot."""
+        journal_rows = self._journal_rows + sum(len(op[1]) for op in self._pending)
+        if self.generation is None or self._dirty or journal_rows > max(self._snapshot_rows, JOURNAL_MIN_ROWS):
+            self._write_snapshot()
+        elif self._pending:
+            self._append_journal()
+            self._journal_rows = journal_rows
+        self._pending = []
+
+    def _array_path(self, name: str, generation: int) -> str:
+        return os.path.join(self.path, f"{name}-{generation}.npy")
+
+    def _journal_paths(self, generation: int) -> Tuple[str, str]:
+        base = os.path.join(self.path, f"journal-{generation}")
+        return base + ".bin", base + ".jsonl"
+
+    def _append_journal(self) -> None:
+        codes_path, log_path = self._journal_paths(self.generation)
+        lines = []
+        # Codes first: a line is only written once the bytes it points at are on disk
+        with open(codes_path, "ab") as codes_file:
+            for kind, ids, metadata, codes, scales in self._pending:
+                entry: Dict[str, Any] = {"op": kind, "ids": ids, "metadata": metadata}
+                if codes is not None:
+                    entry.update(offset=codes_file.tell(), dimension=self.dimension, width=codes.shape[1])
+                    codes_file.write(np.ascontiguousarray(codes).tobytes())
+                    if scales is not None:
+                        entry["scales"] = scales.tolist()
+                lines.append(json.dumps(entry) + "\n")
+        with open(log_path, "a") as log:
+            log.write("".join(lines))
+
+    def _replay_journal(self) -> None:
+        codes_path, log_path = self._journal_paths(self.generation)
+        if not os.path.exists(log_path):
+            return
+        codes_file = np.memmap(codes_path, dtype=np.uint8, mode="r") if os.path.getsize(codes_path) else None
+        dtype = np.dtype(CODE_DTYPES[self.quantization])
+        with open(log_path) as log:
+            for line in log:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Partial line from an interrupted write
+                ids, metadata = entry["ids"], entry["metadata"]
+                if entry["op"] == "update":
+                    for vector_id, fields in zip(ids, metadata):
+                        row = self.rows.get(vector_id)
+                        if row is not None:
+                            self.metadata[row] = {**self.metadata[row], **fields}
+                else:
+                    size = len(ids) * entry["width"] * dtype.itemsize
+                    data = codes_file[entry["offset"]:entry["offset"] + size]
+                    codes = np.frombuffer(data.tobytes(), dtype=dtype).reshape(len(ids), entry["width"])
+                    scales = entry.get("scales")
+                    self.dimension = entry["dimension"]
+                    self._put(codes, None if scales is None else np.asarray(scales, dtype=np.float32), metadata, ids)
+                self._journal_rows += len(ids)
+
+    def _write_snapshot(self) -> None:
+        # Arrays go to files of the new generation, which nothing reads until records.json
+        # names it; a crash before that rename leaves the previous snapshot intact
+        os.makedirs(self.path, exist_ok=True)
+        previous = self.generation
+        generation = 0 if previous is None else previous + 1
+        arrays = {"vectors": self.vectors[:self.count]}
+        if self.scales is not None:
+            arrays["scales"] = self.scales[:self.count]
+
+        for name, array in arrays.items():
+            with open(self._array_path(name, generation), "wb") as f:
+                np.save(f, array)
+        records_path = os.path.join(self.path, "records.json")
+        with open(records_path + ".tmp", "w") as f:
+            json.dump({
+                "namespace": self.name,
+                "quantization": self.quantization,
+                "dimension": self.dimension,
+                "ids": self.ids,
+                "metadata": self.metadata,
+                "generation": generation,
+            }, f)
+
+        # The records rename switches to the new arrays and journal; the old ones are garbage
+        # from here on (readers that memory-mapped an old array keep a valid inode)
+        os.replace(records_path + ".tmp", records_path)
+        if previous is not None:
+            stale = list(self._journal_paths(previous))
+            for name in ("vectors", "scales"):
+                stale += [self._array_path(name, previous), os.path.join(self.path, f"{name}.npy")]
+            for stale_path in stale:
+                if os.path.exists(stale_path):
+                    os.unlink(stale_path)
+
+        self.generation = generation
+        self._snapshot_rows = self.count
+        self._journal_rows = 0
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> "_Namespace":
+        with open(os.path.join(path, "records.json")) as f:
+            records = json.load(f)
+        generation = records.get("generation", 0)
+
+        def array_path(name: str) -> str:
+            # Namespaces saved before arrays were named by generation use plain vectors.npy
+            versioned = os.path.join(path, f"{name}-{generation}.npy")
+            return versioned if os.path.exists(versioned) else os.path.join(path, f"{name}.npy")
+
+        # Memory-mapped: pages are read on demand rather than loaded up front
+        vectors = np.load(array_path("vectors"), mmap_mode="r")
+        quantization = records.get("quantization", "none")
+        scales = None
+        if quantization == "int8":
+            scales = np.load(array_path("scales"), mmap_mode="r")
+        dimension = records.get("dimension", vectors.shape[1] if vectors.ndim == 2 else 0)
+        store = cls(path, records["namespace"], quantization, dimension, vectors, scales,
+                    records["ids"], records["metadata"], generation=generation)
+        store._replay_journal()
+        return store
+
+    def _reserve(self, needed: int, width: int, dtype: np.dtype) -> None:
+        # Grow geometrically so appends are amortized O(1); also detaches from a read-only memmap
+        capacity = self.vectors.shape[0]
+        if needed <= capacity and self.vectors.flags.writeable:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        grown = np.empty((new_capacity, width), dtype=dtype)
+        if self.count:
+            grown[:self.count] = self.vectors[:self.count]
+        self.vectors = grown
+
+        if self.quantization == "int8":
+            scales = np.empty(new_capacity, dtype=np.float32)
+            if self.count:
+                scales[:self.count] = self.scales[:self.count]
+            self.scales = scales
+
+
+class _IVFIndex:
+    """Inverted-file index: vectors grouped by nearest k-means centroid."""
+
+    def __init__(self, centroids: np.ndarray, lists: List[np.ndarray]):
+        self.centroids = centroids
+        self.lists = lists
+
+    @classmethod
+    def build(cls, n: int, rows: Callable[[Any], np.ndarray], iterations: int = 10,
+              seed: int = 0) -> "_IVFIndex":
+        """Cluster n vectors; rows(index) returns float32 unit vectors for a slice or index array."""
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+
+        # Spherical k-means on a sample; vectors are unit length so dot product = cosine
+        sample = rows(np.sort(rng.choice(n, size=min(n, nlist * 64), replace=False)))
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        # Assign every vector in blocks to bound the temporary score matrix
+        assignment = np.concatenate([
+            np.argmax(rows(slice(i, min(i + 65536, n))) @ centroids.T, axis=1)
+            for i in range(0, n, 65536)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        lists = [order[bounds[c]:bounds[c + 1]] for c in range(nlist)]
+        return cls(centroids, lists)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = min(nprobe, len(self.centroids))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self.lists[c] for c in closest])
+
+
+def _quantize(vectors: np.ndarray, quantization: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Encode unit vectors for storage; returns (codes, per-vector scales or None)."""
+    if quantization == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    if quantization == "binary":
+        return np.packbits(vectors > 0, axis=1), None
+    return vectors.astype(np.float32, copy=False), None
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_filter(filter: Dict[str, Any]) -> None:
+    """Raise ValueError for an operator _matches doesn't implement, so no condition is skipped."""
+    for field, condition in filter.items():
+        if field in ("$and", "$or"):
+            for clause in condition:
+                _check_filter(clause)
+        elif field.startswith("$"):
+            raise ValueError(f"Unsupported filter operator: {field}")
+        elif isinstance(condition, dict):
+            for op in condition:
+                if op not in FILTER_OPERATORS and op != "$exists":
+                    raise ValueError(
+                        f"Unsupported filter operator on {field}: {op} "
+                        f"(supported: {', '.join([*FILTER_OPERATORS, '$exists'])})"
+                    )
+
+
+def _matches(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    for field, condition in filter.items():
+        if field == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$exists":
+                    if (field in metadata) != operand:
+                        return False
+                elif not FILTER_OPERATORS[op](metadata.get(field), operand):
+                    return False
+        elif metadata.get(field) != condition:
+            return False
+    return True
+
+
+def _namespace_dirname(namespace: str) -> str:
+    # Namespaces contain filenames - keep a readable slug plus a hash for uniqueness
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", namespace)[:64]
+    digest = hashlib.sha1(namespace.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}"
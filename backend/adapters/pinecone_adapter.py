@@ -1,8 +1,31 @@
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence
 from pinecone import Pinecone
 from .base_adapter import VectorDBAdapter
+from services.batching import make_batches
+from services.metrics import UPSERT_BATCH_SIZE
+from services.resilience import get_resilience
+import json
 import os
 
+import numpy as np
+
+
+# Pinecone upsert request limits
+MAX_UPSERT_VECTORS = 1000
+MAX_UPSERT_BYTES = 2 * 1024 * 1024
+
+# Pinecone accepts at most 1000 IDs per delete request
+MAX_DELETE_IDS = 1000
+
+# Values are rounded to this many decimals before JSON encoding. float32 values
+# widened to Python floats print ~20 digits each; 8 decimals ("-0.01234568")
+# halves the payload and is far below the precision cosine similarity needs.
+WIRE_DECIMALS = 8
+
+# Approximate JSON bytes per float value (e.g. "-0.01234568, ")
+BYTES_PER_VALUE = 13
+
 
 class PineconeAdapter(VectorDBAdapter):
     """Pinecone implementation of the vector database adapter"""
@@ -14,44 +37,194 @@ class PineconeAdapter(VectorDBAdapter):
         if not self.api_key:
             raise ValueError("PINECONE_API_KEY environment variable not set")
 
-        self.client = Pinecone(api_key=self.api_key)
-        self.index = self.client.Index(self.index_name)
+        # Parallel upsert requests per call
+        self.upsert_concurrency = int(os.getenv("PINECONE_UPSERT_CONCURRENCY", "4"))
+
+        # Index host from the Pinecone console; skips the control-plane lookup at startup
+        self.index_host = os.getenv("PINECONE_INDEX_HOST", "")
+
+        # gRPC sends vectors as packed float32 (4 bytes/value vs ~12 as JSON)
+        self.use_grpc = os.getenv("PINECONE_GRPC", "false").lower() == "true"
+
+        if self.use_grpc:
+            try:
+                from pinecone.grpc import PineconeGRPC
+            except ImportError:
+                raise ValueError("PINECONE_GRPC=true requires the grpc extra: pip install \"pinecone[grpc]\"")
+            self.client = PineconeGRPC(api_key=self.api_key)
+            self.index = self.client.Index(self.index_name, host=self.index_host)
+        else:
+            self.client = Pinecone(api_key=self.api_key, pool_threads=self.upsert_concurrency)
+            self.index = self.client.Index(
+                self.index_name,
+                host=self.index_host,
+                pool_threads=self.upsert_concurrency,
+                # One adapter serves every request, so the pool covers concurrent uploads too
+                connection_pool_maxsize=int(os.getenv("PINECONE_POOL_MAXSIZE", "32")),
+            )
+        self.resilience = get_resilience("pinecone")
+
+        # Looked up on first use by index_dimension()
+        self._dimension: Optional[int] = None
 
     def upsert(
         self,
-        vectors: List[List[float]],
+        vectors: Sequence[Sequence[float]],
         metadata: List[Dict[str, Any]],
         namespace: str,
         ids: List[str]
     ) -> Dict[str, Any]:
-        """Upsert vectors to Pinecone"""
+        """
+        Upsert vectors to Pinecone in parallel batches.
+
+        Vectors are split into batches under Pinecone's per-request vector
+        count and payload size limits and sent concurrently. A failed batch
+        doesn't abort the others: its IDs are reported in failed_batches so
+        the caller can retry just those.
+
+        Request payloads are built one batch at a time, so float lists only
+        exist for the batches in flight rather than the whole document.
+        """
 
         # Validate namespace - prevents accidental writes to default namespace
         # Each upload should have its own namespace (e.g., "document.pdf-uuid")
         if not namespace or not namespace.strip():
             raise ValueError("namespace must be a non-empty string")
 
-        # Prepare vectors in Pinecone format: {"id": str, "values": List[float], "metadata": dict}
-        # This format allows Pinecone to index vectors and filter by metadata
-        pinecone_vectors = [
+        dimension = len(vectors[0]) if len(vectors) else 0
+        if self._dimension is not None and len(vectors) and dimension != self._dimension:
+            raise ValueError(
+                f"Vector dimension {dimension} does not match index dimension {self._dimension}"
+            )
+
+        # Leave ~10% headroom under the byte limit for request envelope and estimate error
+        batches = make_batches(
+            range(len(ids)),
+            lambda i: _estimate_bytes(ids[i], dimension, metadata[i]),
+            MAX_UPSERT_VECTORS,
+            int(MAX_UPSERT_BYTES * 0.9),
+        )
+
+        def send(batch_index: int) -> Dict[str, Any]:
+            start, end = batches[batch_index]
+            try:
+                # Pinecone format: {"id": str, "values": List[float], "metadata": dict}
+                # Metadata includes filename, page_number, chunk_index (and text unless stored separately)
+                values = self._wire_values(vectors[start:end])
+                pinecone_vectors = [
+                    {"id": ids[i], "values": values[i - start], "metadata": metadata[i]}
+                    for i in range(start, end)
+                ]
+
+                # Upsert to Pinecone (update if ID exists, insert if new)
+                # Retried with backoff on 429/5xx; fails fast while Pinecone's circuit is open
+                upsert_response = self.resilience.call(
+                    self.index.upsert,
+                    vectors=pinecone_vectors,
+                    namespace=namespace,
+                    show_progress=False
+                )
+                UPSERT_BATCH_SIZE.observe(end - start, provider="pinecone")
+                return {"upserted_count": upsert_response.upserted_count}
+            except Exception as e:
+                return {"error": str(e)}
+
+        workers = max(1, min(self.upsert_concurrency, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(send, range(len(batches))))
+
+        failed_batches = [
             {
-                "id": ids[i],
-                "values": vectors[i],  # 1536-dimensional embedding from OpenAI
-                "metadata": metadata[i]  # Includes filename, page_number, chunk_index, text
+                "batch_index": batch_index,
+                "ids": ids[batches[batch_index][0]:batches[batch_index][1]],
+                "error": outcome["error"]
             }
-            for i in range(len(vectors))
+            for batch_index, outcome in enumerate(outcomes)
+            if "error" in outcome
         ]
 
-        # Upsert to Pinecone (update if ID exists, insert if new)
-        upsert_response = self.index.upsert(
-            vectors=pinecone_vectors,
-            namespace=namespace
-        )
-
         return {
-            "upserted_count": upsert_response.upserted_count
+            "upserted_count": sum(outcome.get("upserted_count", 0) for outcome in outcomes),
+            "batch_count": len(batches),
+            "failed_batches": failed_batches
         }
 
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Query Pinecone for the nearest vectors in a namespace"""
+        response = self.resilience.call(
+            self.index.query,
+            vector=self._wire_values([vector])[0],
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter,
+            include_metadata=True
+        )
+
+        return [
+            {"id": match.id, "score": match.score, "metadata": match.metadata or {}}
+            for match in response.matches
+        ]
+
+    def delete(self, ids: List[str], namespace: str) -> int:
+        """Delete vectors by ID in batches of MAX_DELETE_IDS"""
+        if not namespace or not namespace.strip():
+            raise ValueError("namespace must be a non-empty string")
+
+        for start in range(0, len(ids), MAX_DELETE_IDS):
+            self.resilience.call(
+                self.index.delete, ids=ids[start:start + MAX_DELETE_IDS], namespace=namespace
+            )
+        return len(ids)
+
+    def update_metadata(
+        self,
+        ids: List[str],
+        metadata: List[Dict[str, Any]],
+        namespace: str
+    ) -> int:
+        """
+        Update metadata in place (one request per vector, sent concurrently).
+
+        Pinecone has no bulk metadata update, but each request is tiny
+        compared to re-upserting the vector values.
+        """
+        if not ids:
+            return 0
+
+        def send(i: int) -> None:
+            self.resilience.call(
+                self.index.update, id=ids[i], set_metadata=metadata[i], namespace=namespace
+            )
+
+        workers = max(1, min(self.upsert_concurrency, len(ids)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(send, range(len(ids))))
+        return len(ids)
+
+    def index_dimension(self) -> Optional[int]:
+        """Dimension of the Pinecone index (cached after the first lookup)"""
+        if self._dimension is None:
+            description = self.resilience.call(self.client.describe_index, self.index_name)
+            self._dimension = description.dimension
+        return self._dimension
+
+    def _wire_values(self, vectors: Sequence[Sequence[float]]) -> List[List[float]]:
+        matrix = np.asarray(vectors, dtype=np.float64)
+        if not self.use_grpc:
+            matrix = np.round(matrix, WIRE_DECIMALS)
+        return matrix.tolist()
+
+    def close(self) -> None:
+        close = getattr(self.index, "close", None)
+        if close is not None:
+            close()
+
     def health_check(self) -> bool:
         """Check Pinecone connection health"""
         try:
@@ -61,3 +234,8 @@ class PineconeAdapter(VectorDBAdapter):
         except Exception as e:
             print(f"Pinecone health check failed: {e}")
             return False
+
+
+def _estimate_bytes(vector_id: str, dimension: int, metadata: Dict[str, Any]) -> int:
+    """Approximate JSON size of one vector record in an upsert request."""
+    return len(vector_id) + dimension * BYTES_PER_VALUE + len(json.dumps(metadata)) + 64
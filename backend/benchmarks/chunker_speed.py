@@ -0,0 +1,85 @@
+"""
+Benchmark: native TextChunker vs LangChain RecursiveCharacterTextSplitter.
+
+Extracts a generated PDF once, then chunks the same pages with each engine
+and reports time (best of --runs), throughput and how closely the native
+output matches LangChain's: the share of LangChain chunks reproduced
+exactly, per page. Across-pages and token-length variants of the native
+chunker are timed too (their output differs by design).
+
+Usage (from backend/):
+    python -m benchmarks.chunker_speed --pages 500
+    python -m benchmarks.chunker_speed --pages 500 --chunk-size 500 --chunk-overlap 100
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.pdf_corpus import make_pdf
+from services.chunker import TextChunker
+from services.pdf_processor import PDFProcessor
+
+
+def _best_of(runs: int, fn: Callable[[], List[Any]]) -> Dict[str, Any]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = fn()
+        timings.append(time.perf_counter() - start)
+    return {"seconds": min(timings), "output": output}
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3, help="repetitions per engine (best is kept)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pages = PDFProcessor().extract_text_with_pages(make_pdf(str(Path(tmp_dir) / "doc.pdf"), pages=args.pages))
+    total_chars = sum(len(page["text"]) for page in pages)
+
+    langchain = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    native = TextChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    across = TextChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, across_pages=True)
+    # Roughly the same chunk length in tokens (~4 chars per token)
+    tokens = TextChunker(
+        chunk_size=args.chunk_size // 4, chunk_overlap=args.chunk_overlap // 4, length="tokens"
+    )
+
+    engines = {
+        "langchain": lambda: [langchain.split_text(page["text"]) for page in pages],
+        "native": lambda: [native.split_text(page["text"]) for page in pages],
+        "native across pages": lambda: [[text for _, _, text in across.iter_chunks(pages)]],
+        "native tokens": lambda: [tokens.split_text(page["text"]) for page in pages],
+    }
+    results = {name: _best_of(args.runs, fn) for name, fn in engines.items()}
+
+    reference = results["langchain"]["output"]
+    print(f"{len(pages)} pages, {total_chars / 1e6:.1f}M chars, "
+          f"chunk_size={args.chunk_size} chunk_overlap={args.chunk_overlap}")
+    print(f"{'engine':>20} {'seconds':>9} {'MB/s':>7} {'speedup':>8} {'chunks':>7} {'same as langchain':>18}")
+    for name, result in results.items():
+        output = result["output"]
+        chunks = sum(len(page_chunks) for page_chunks in output)
+        if len(output) == len(reference):
+            matched = sum(
+                len(set(expected) & set(actual)) for expected, actual in zip(reference, output)
+            )
+            agreement = f"{matched / sum(len(page) for page in reference):.1%}"
+        else:
+            agreement = "n/a"
+        print(
+            f"{name:>20} {result['seconds']:>9.3f} {total_chars / 1e6 / result['seconds']:>7.1f} "
+            f"{results['langchain']['seconds'] / result['seconds']:>7.1f}x {chunks:>7} {agreement:>18}"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
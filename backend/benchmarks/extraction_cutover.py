@@ -0,0 +1,68 @@
+"""
+Benchmark: serial vs page-parallel PDF text extraction.
+
+For a range of document sizes, times serial extraction against extraction
+spread across a process pool, both with a cold pool (process startup paid
+per document, as in the sync PDFProcessor API) and a warm pool (the shared
+pool used by the upload pipeline). Prints the smallest page count where
+parallel extraction wins - use it to set PDF_PARALLEL_THRESHOLD_PAGES.
+
+Usage (from backend/):
+    python -m benchmarks.extraction_cutover --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.pdf_corpus import make_pdf
+from services.pdf_processor import PDFProcessor, _extract_ranges
+
+
+def _best_of(runs: int, fn) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pages", type=int, nargs="+", default=[4, 8, 16, 32, 64, 128, 256, 512])
+    parser.add_argument("--runs", type=int, default=3, help="repetitions per measurement (best is kept)")
+    args = parser.parse_args()
+
+    # Threshold 1 forces page-parallel ranges for every size
+    processor = PDFProcessor(extraction_workers=args.workers, parallel_threshold_pages=1)
+    cutover_cold = cutover_warm = None
+
+    print(f"workers={args.workers}")
+    print(f"{'pages':>6} {'serial':>9} {'cold pool':>10} {'warm pool':>10}")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as warm_pool:
+        warm_pool.submit(os.getpid).result()  # Start the workers before timing
+
+        for pages in args.pages:
+            ranges = processor.page_ranges(pages)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                pdf_path = make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=pages)
+                serial = _best_of(args.runs, lambda: list(processor.iter_pages(pdf_path)))
+                cold = _best_of(args.runs, lambda: processor.extract_text_with_pages(pdf_path))
+                warm = _best_of(args.runs, lambda: _extract_ranges(warm_pool, pdf_path, ranges))
+
+            if cutover_cold is None and cold < serial:
+                cutover_cold = pages
+            if cutover_warm is None and warm < serial:
+                cutover_warm = pages
+            print(f"{pages:>6} {serial * 1000:>7.0f}ms {cold * 1000:>8.0f}ms {warm * 1000:>8.0f}ms")
+
+    print(f"cutover (cold pool): {cutover_cold or 'not reached'} pages")
+    print(f"cutover (warm pool): {cutover_warm or 'not reached'} pages")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,135 @@
+"""
+Deterministic stand-ins for OpenAI and Pinecone used by offline benchmarks.
+
+They mimic the blocking behaviour of the real SDK clients (time.sleep for
+network latency) so benchmarks exercise the same threading paths. Each call
+can also fail with a seeded probability (error_rate), raising a 503-style
+error; pass a ResilientCaller to have injected errors retried the way the
+real services retry them.
+"""
+import hashlib
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from adapters import VectorDBAdapter
+from services.embeddings import MAX_BATCH_INPUTS
+from services.resilience import ResilientCaller
+
+
+class FakeProviderError(Exception):
+    """Injected provider failure; status 503 so the resilience layer treats it as transient."""
+
+    status_code = 503
+
+
+class _FakeCalls:
+    """Latency and seeded error injection shared by the fakes."""
+
+    def __init__(
+        self,
+        latency: float,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        resilience: Optional[ResilientCaller] = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.resilience = resilience
+        self.call_count = 0
+        self.error_count = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _request(self) -> None:
+        if self.resilience is not None:
+            self.resilience.call(self._attempt)
+        else:
+            self._attempt()
+
+    def _attempt(self) -> None:
+        with self._lock:
+            self.call_count += 1
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if fail:
+                self.error_count += 1
+        time.sleep(self.latency)
+        if fail:
+            raise FakeProviderError(f"injected failure (error_rate={self.error_rate})")
+
+
+class FakeEmbeddingService(_FakeCalls):
+    """Returns hash-derived vectors after a fixed per-call latency."""
+
+    # Same request limits as EmbeddingProvider; every call is one request
+    max_batch_inputs = MAX_BATCH_INPUTS
+    max_concurrency = 1
+
+    def __init__(self, dimensions: int = 1536, latency: float = 0.05, **faults: Any):
+        super().__init__(latency, **faults)
+        self.model = "fake-embedding"
+        self.dimensions = dimensions
+
+    def generate_embeddings(
+        self, texts: List[str], on_batch: Optional[Callable[[int], None]] = None
+    ) -> List[np.ndarray]:
+        if not texts:
+            return []
+        self._request()
+        if on_batch is not None:
+            on_batch(len(texts))
+        return [self._vector(text) for text in texts]
+
+    def generate_embedding(self, text: str) -> np.ndarray:
+        return self.generate_embeddings([text])[0]
+
+    def close(self) -> None:
+        pass
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = np.frombuffer(hashlib.sha256(text.encode("utf-8")).digest(), dtype=np.uint8)
+        return (np.resize(seed, self.dimensions) / 255.0).astype(np.float32)
+
+
+class FakeVectorAdapter(_FakeCalls, VectorDBAdapter):
+    """Counts upserted vectors after a fixed per-call latency."""
+
+    def __init__(self, latency: float = 0.05, **faults: Any):
+        super().__init__(latency, **faults)
+        self.upserted = 0
+
+    def upsert(
+        self,
+        vectors: List[np.ndarray],
+        metadata: List[Dict[str, Any]],
+        namespace: str,
+        ids: List[str]
+    ) -> Dict[str, Any]:
+        self._request()
+        with self._lock:
+            self.upserted += len(vectors)
+        return {"upserted_count": len(vectors)}
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        self._request()
+        return []
+
+    def delete(self, ids: List[str], namespace: str) -> int:
+        self._request()
+        return len(ids)
+
+    def update_metadata(self, ids: List[str], metadata: List[Dict[str, Any]], namespace: str) -> int:
+        self._request()
+        return len(ids)
+
+    def health_check(self) -> bool:
+        return True
@@ -0,0 +1,123 @@
+"""
+Load benchmark: /api/health latency while uploads are being processed.
+
+Starts the real FastAPI app under uvicorn with fake OpenAI/Pinecone services,
+fires concurrent uploads of a generated PDF and probes /api/health throughout.
+With the pipeline offloaded, health latency should stay flat; pass --inline to
+run the pipeline directly on the event loop for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.health_latency --uploads 8 --pages 200
+    python -m benchmarks.health_latency --uploads 8 --pages 200 --inline
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+import uvicorn
+
+import main
+from services.clients import AppClients, get_clients
+from services.ingestion import IngestionPipeline
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+
+
+def _install_fakes(inline: bool) -> None:
+    # health_ttl=0: check on every probe, so latency reflects the event loop rather than the cache
+    clients = AppClients(
+        embedding_factory=FakeEmbeddingService, adapter_factory=FakeVectorAdapter, health_ttl=0
+    )
+    main.app.dependency_overrides[get_clients] = lambda: clients
+
+    if inline:
+        # Reproduce the old behaviour: every stage runs on the event loop
+        async def ingest_inline(self, pdf_path, filename, on_progress=None, process_pool=None):
+            return self.ingest(pdf_path, filename, on_progress)
+
+        IngestionPipeline.ingest_async = ingest_inline
+
+
+def _start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(main.app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _summary(latencies: List[float]) -> str:
+    ms = sorted(latency * 1000 for latency in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    return (
+        f"n={len(ms)} p50={statistics.median(ms):.1f}ms "
+        f"p99={p99:.1f}ms max={ms[-1]:.1f}ms"
+    )
+
+
+async def _probe_health(client: httpx.AsyncClient, stop: asyncio.Event) -> List[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/health")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.02)
+    return latencies
+
+
+async def _run(base_url: str, pdf_path: str, uploads: int) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        # Idle baseline
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_health(client, stop))
+        await asyncio.sleep(1.0)
+        stop.set()
+        print(f"idle:        {_summary(await probe)}")
+
+        # Under concurrent uploads
+        pdf_bytes = Path(pdf_path).read_bytes()
+
+        async def upload_one(i: int) -> None:
+            files = {"files": (f"bench-{i}.pdf", pdf_bytes, "application/pdf")}
+            response = await client.post("/api/upload", files=files)
+            response.raise_for_status()
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_health(client, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(upload_one(i) for i in range(uploads)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        print(f"under load:  {_summary(await probe)}")
+        print(f"uploads:     {uploads} files in {elapsed:.2f}s")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--uploads", type=int, default=8, help="concurrent uploads")
+    parser.add_argument("--pages", type=int, default=200, help="pages per PDF")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--inline", action="store_true", help="run pipeline on the event loop")
+    args = parser.parse_args()
+
+    _install_fakes(args.inline)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_pdf(str(Path(tmp_dir) / "doc.pdf"), pages=args.pages)
+        server = _start_server(args.port)
+        try:
+            mode = "inline (blocking)" if args.inline else "offloaded"
+            print(f"mode: {mode}, {args.uploads} uploads x {args.pages} pages")
+            asyncio.run(_run(f"http://127.0.0.1:{args.port}", pdf_path, args.uploads))
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main_cli()
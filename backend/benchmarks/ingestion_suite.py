@@ -0,0 +1,302 @@
+"""
+Benchmark suite: ingestion throughput, latency and memory with fake providers.
+
+Runs entirely offline over a generated PDF corpus (benchmarks.pdf_corpus),
+with the deterministic fakes (benchmarks.fakes) standing in for OpenAI and
+Pinecone at a configurable latency and injected error rate. Scenarios:
+
+    pdf_processor   PDFProcessor extract + chunk, per document size
+    upload          full POST /api/upload path, one request at a time
+    concurrent      N uploads in flight at once, per concurrency level
+
+Each reports throughput, p50/p99 latency, failed requests and peak RSS.
+Peak RSS is the largest combined resident size of this process and its
+live children (the PDF process pool), sampled every 50 ms while the
+measurement runs. Without /proc (e.g. macOS) it falls back to this
+process's own high-water mark, which excludes the pool workers.
+Results are written as JSON; pass --compare with an earlier file to print
+the change per metric, e.g. between two commits.
+
+Usage (from backend/):
+    python -m benchmarks.ingestion_suite --output before.json
+    python -m benchmarks.ingestion_suite --output after.json --compare before.json
+    python -m benchmarks.ingestion_suite --error-rate 0.05 --retry
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+import main
+from services.clients import AppClients, get_clients
+from services.executors import shutdown_executors
+from services.pdf_processor import PDFProcessor
+from services.resilience import ResilientCaller
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass  # Exited since it was listed
+    return 0
+
+
+def _descendants(pid: int) -> List[int]:
+    children = []
+    try:
+        for task in Path(f"/proc/{pid}/task").iterdir():
+            children += [int(child) for child in (task / "children").read_text().split()]
+    except OSError:
+        return []
+    return children + [grandchild for child in children for grandchild in _descendants(child)]
+
+
+class _RSSSampler:
+    """
+    Tracks the peak of this process's RSS plus its live children's, sampled on a thread.
+
+    ru_maxrss can't give this: RUSAGE_CHILDREN only covers children that
+    have exited, and adding separate maxima mixes peaks from different moments.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self._peak_kb = 0
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while True:
+            total = sum(_rss_kb(p) for p in [pid, *_descendants(pid)])
+            with self._lock:
+                self._peak_kb = max(self._peak_kb, total)
+            time.sleep(self.interval)
+
+    def take_peak_kb(self) -> int:
+        """Peak since the last call, then start a new measurement."""
+        total = sum(_rss_kb(p) for p in [os.getpid(), *_descendants(os.getpid())])
+        with self._lock:
+            peak, self._peak_kb = max(self._peak_kb, total), 0
+        return peak
+
+
+_sampler: Optional[_RSSSampler] = None
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS of this process and its pool workers since the previous call."""
+    global _sampler
+    if not os.path.exists("/proc/self/status"):
+        # Parent-only fallback; ru_maxrss is bytes on macOS
+        unit = 1 if sys.platform == "darwin" else 1024
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / (1024 * 1024), 1)
+    if _sampler is None:
+        _sampler = _RSSSampler()
+    return round(_sampler.take_peak_kb() / 1024, 1)
+
+
+def _summarize(latencies: List[float], elapsed: float, items: Dict[str, int], failures: int) -> Dict[str, Any]:
+    """Latency percentiles (ms), per-second throughput for each item count, failures and peak RSS."""
+    result = {
+        "requests": len(latencies),
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+    }
+    for name, count in items.items():
+        result[f"{name}_per_s"] = round(count / elapsed, 1) if elapsed else 0.0
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def bench_pdf_processor(corpus: Dict[int, str], runs: int) -> Dict[str, Any]:
+    processor = PDFProcessor()
+    results = {}
+    for pages, path in corpus.items():
+        latencies, chunks = [], 0
+        start = time.perf_counter()
+        for _ in range(runs):
+            run_start = time.perf_counter()
+            chunks += len(processor.process_pdf(path))
+            latencies.append(time.perf_counter() - run_start)
+        elapsed = time.perf_counter() - start
+        results[f"pages={pages}"] = _summarize(
+            latencies, elapsed, {"pages": pages * runs, "chunks": chunks}, failures=0
+        )
+    return results
+
+
+async def _upload_all(
+    client: httpx.AsyncClient, pdf_bytes: bytes, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+    chunks = 0
+
+    async def upload_one(i: int) -> None:
+        nonlocal failures, chunks
+        async with semaphore:
+            files = {"files": (f"bench-{i}.pdf", pdf_bytes, "application/pdf")}
+            start = time.perf_counter()
+            response = await client.post("/api/upload", files=files)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code == 200:
+                chunks += sum(result["chunks_created"] for result in response.json()["results"])
+            else:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(upload_one(i) for i in range(requests)))
+    return {"latencies": latencies, "elapsed": time.perf_counter() - start, "failures": failures, "chunks": chunks}
+
+
+async def bench_uploads(
+    corpus: Dict[int, str], runs: int, concurrency: List[int], requests: int, concurrent_pages: int
+) -> Dict[str, Dict[str, Any]]:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        sequential = {}
+        for pages, path in corpus.items():
+            run = await _upload_all(client, Path(path).read_bytes(), runs, concurrency=1)
+            sequential[f"pages={pages}"] = _summarize(
+                run["latencies"], run["elapsed"],
+                {"requests": len(run["latencies"]), "pages": pages * runs, "chunks": run["chunks"]},
+                run["failures"],
+            )
+
+        concurrent = {}
+        pdf_bytes = Path(corpus[concurrent_pages]).read_bytes()
+        for level in concurrency:
+            run = await _upload_all(client, pdf_bytes, requests, concurrency=level)
+            concurrent[f"concurrency={level}"] = _summarize(
+                run["latencies"], run["elapsed"],
+                {"requests": requests, "pages": concurrent_pages * requests, "chunks": run["chunks"]},
+                run["failures"],
+            )
+    return {"upload": sequential, "concurrent": concurrent}
+
+
+def _install_fakes(
+    embeddings: FakeEmbeddingService, adapter: FakeVectorAdapter
+) -> Callable[[], None]:
+    """Route /api/upload to the shared fakes; returns a function that restores the real clients."""
+    clients = AppClients(embedding_factory=lambda: embeddings, adapter_factory=lambda: adapter)
+    main.app.dependency_overrides[get_clients] = lambda: clients
+
+    def restore() -> None:
+        main.app.dependency_overrides.pop(get_clients, None)
+
+    return restore
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    for scenario, cases in results["scenarios"].items():
+        print(f"\n{scenario}")
+        for case, metrics in cases.items():
+            previous = (baseline or {}).get("scenarios", {}).get(scenario, {}).get(case, {})
+            parts = []
+            for name, value in metrics.items():
+                change = ""
+                if isinstance(previous.get(name), (int, float)) and previous[name]:
+                    change = f" ({(value - previous[name]) / previous[name]:+.1%})"
+                parts.append(f"{name}={value}{change}")
+            print(f"  {case:<16} " + " ".join(parts))
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200], help="corpus document sizes")
+    parser.add_argument("--runs", type=int, default=5, help="documents per size (pdf_processor, upload)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="uploads per concurrency level")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="seconds per embeddings call")
+    parser.add_argument("--upsert-latency", type=float, default=0.02, help="seconds per upsert call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability each fake call fails")
+    parser.add_argument("--retry", action="store_true", help="retry injected errors with backoff")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    def fault_options(name: str) -> Dict[str, Any]:
+        caller = ResilientCaller(f"fake-{name}", base_delay=0.01, max_delay=0.1) if args.retry else None
+        return {"error_rate": args.error_rate, "seed": args.seed, "resilience": caller}
+
+    embeddings = FakeEmbeddingService(latency=args.embed_latency, **fault_options("openai"))
+    adapter = FakeVectorAdapter(latency=args.upsert_latency, **fault_options("pinecone"))
+
+    corpus_dir = Path(tempfile.mkdtemp(prefix="vectory-bench-"))
+    pages = sorted(args.pages)
+    corpus = {
+        count: make_pdf(str(corpus_dir / f"corpus-{count}.pdf"), pages=count, seed=args.seed)
+        for count in pages
+    }
+
+    restore = _install_fakes(embeddings, adapter)
+    _peak_rss_mb()  # Starts sampling; each result reports the peak since the one before
+    try:
+        scenarios = {"pdf_processor": bench_pdf_processor(corpus, args.runs)}
+        scenarios.update(asyncio.run(bench_uploads(
+            corpus, args.runs, sorted(args.concurrency), args.requests, concurrent_pages=pages[len(pages) // 2]
+        )))
+    finally:
+        restore()
+        shutdown_executors()
+        for path in corpus.values():
+            Path(path).unlink()
+        corpus_dir.rmdir()
+
+    results = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "fake_calls": {
+            "embeddings": {"calls": embeddings.call_count, "injected_errors": embeddings.error_count},
+            "upserts": {"calls": adapter.call_count, "injected_errors": adapter.error_count},
+        },
+        "scenarios": scenarios,
+    }
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    _print_results(results, baseline)
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"\nresults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,85 @@
+"""
+Benchmark: in-flight memory and upsert payload size per document.
+
+Compares the previous representation (embeddings as lists of Python
+floats, dict chunks, full metadata with text on every vector, JSON with
+widened float32 values) against the compact one (float32 arrays, slotted
+Chunk records, rounded wire values, optionally text in the chunk store).
+
+Usage (from backend/):
+    python -m benchmarks.payload_size --chunks 2000
+"""
+import argparse
+import json
+import tracemalloc
+
+import numpy as np
+
+from adapters.pinecone_adapter import WIRE_DECIMALS
+from services.ingestion import build_metadata
+from services.pdf_processor import Chunk
+
+
+def _measure(build) -> int:
+    tracemalloc.start()
+    held = build()  # Keep the result alive while measuring
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    raw = (rng.standard_normal((args.chunks, args.dimensions)) / np.sqrt(args.dimensions)).astype(np.float32)
+    texts = [f"chunk {i} " + "lorem ipsum " * 80 for i in range(args.chunks)]
+
+    def legacy():
+        embeddings = raw.tolist()
+        chunks = [{"page_number": i // 4 + 1, "chunk_index": i, "text": text} for i, text in enumerate(texts)]
+        return embeddings, chunks
+
+    def compact():
+        embeddings = list(raw.copy())
+        chunks = [Chunk(i // 4 + 1, i, text) for i, text in enumerate(texts)]
+        return embeddings, chunks
+
+    # texts are shared by both variants, so only the representation is measured
+    legacy_bytes = _measure(legacy)
+    compact_bytes = _measure(compact)
+
+    chunks = [Chunk(i // 4 + 1, i, text) for i, text in enumerate(texts)]
+    ids, full_metadata = build_metadata(chunks, "doc.pdf", "doc.pdf-1234")
+    _, compact_metadata = build_metadata(chunks, "doc.pdf", "doc.pdf-1234", compact=True)
+
+    def wire_bytes(values, metadata) -> int:
+        return sum(
+            len(json.dumps({"id": ids[i], "values": values[i], "metadata": metadata[i]}))
+            for i in range(args.chunks)
+        )
+
+    widened = raw.tolist()
+    rounded = np.round(raw.astype(np.float64), WIRE_DECIMALS).tolist()
+    legacy_wire = wire_bytes(widened, full_metadata)
+    rounded_wire = wire_bytes(rounded, full_metadata)
+    compact_wire = wire_bytes(rounded, compact_metadata)
+    # gRPC: packed float32 values plus the same metadata
+    grpc_wire = args.chunks * args.dimensions * 4 + sum(len(json.dumps(m)) for m in compact_metadata)
+
+    mb = 1024 * 1024
+    print(f"chunks={args.chunks} dimensions={args.dimensions}")
+    print(f"in-flight memory   legacy {legacy_bytes / mb:8.1f} MB   compact {compact_bytes / mb:8.1f} MB"
+          f"   ({legacy_bytes / compact_bytes:.1f}x)")
+    print(f"upsert payload     legacy {legacy_wire / mb:8.1f} MB")
+    print(f"  rounded values          {rounded_wire / mb:8.1f} MB   ({legacy_wire / rounded_wire:.1f}x)")
+    print(f"  + text in chunk store   {compact_wire / mb:8.1f} MB   ({legacy_wire / compact_wire:.1f}x)")
+    print(f"  + gRPC (PINECONE_GRPC)  {grpc_wire / mb:8.1f} MB   ({legacy_wire / grpc_wire:.1f}x)")
+
+
+if __name__ == "__main__":
+    main_cli()
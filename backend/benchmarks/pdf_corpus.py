@@ -0,0 +1,85 @@
+"""
+Synthetic PDF generator for offline benchmarks.
+
+Writes minimal text PDFs (Helvetica, one content stream per page) without any
+extra dependency, so pypdf has real text to extract and chunk.
+"""
+import random
+from pathlib import Path
+from typing import List
+
+
+WORDS = (
+    "vector embedding chunk page document index namespace metadata pipeline "
+    "retrieval latency throughput batch query semantic search token model "
+    "upload extract split overlap storage adapter service request response"
+).split()
+
+
+def _page_lines(rng: random.Random, lines_per_page: int, words_per_line: int) -> List[str]:
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(words_per_line))
+        for _ in range(lines_per_page)
+    ]
+
+
+def make_pdf(
+    path: str,
+    pages: int,
+    lines_per_page: int = 40,
+    words_per_line: int = 12,
+    seed: int = 0,
+) -> str:
+    """
+    Write a text PDF with the given number of pages.
+
+    Content is deterministic for a given seed so benchmark runs are comparable.
+    """
+    rng = random.Random(seed)
+
+    # Object numbering: 1 catalog, 2 pages tree, 3 font, then (page, content) pairs
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+
+    for page_index in range(pages):
+        page_obj = 4 + page_index * 2
+        content_obj = page_obj + 1
+        kids.append(f"{page_obj} 0 R")
+
+        text_ops = ["BT", "/F1 10 Tf", "12 TL", "50 750 Td"]
+        for line in _page_lines(rng, lines_per_page, words_per_line):
+            text_ops.append(f"({line}) Tj T*")
+        text_ops.append("ET")
+        stream = "\n".join(text_ops).encode("latin-1")
+
+        objects[page_obj] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_obj} 0 R >>"
+        ).encode("latin-1")
+        objects[content_obj] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1")
+            + stream
+            + b"\nendstream"
+        )
+
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode("latin-1")
+
+    # Serialize with a byte-accurate cross-reference table
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_num in sorted(objects):
+        offsets[obj_num] = len(out)
+        out += f"{obj_num} 0 obj\n".encode("latin-1") + objects[obj_num] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for obj_num in range(1, size):
+        out += f"{offsets[obj_num]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+
+    Path(path).write_bytes(bytes(out))
+    return path
@@ -0,0 +1,98 @@
+"""
+Benchmark: search recall vs storage size for shortened and quantized embeddings.
+
+Stores a fixed corpus in LocalVectorAdapter at several embedding
+dimensions (EMBEDDING_DIMENSIONS) and quantizations
+(LOCAL_VECTOR_QUANTIZATION), and reports recall@k against exact float32
+search at full dimension along with bytes stored per vector.
+
+The default corpus is synthetic and seeded, so runs are comparable. It has
+topic clusters, and most of each vector's energy sits in the leading
+dimensions, the way text-embedding-3 models are trained so that shortened
+vectors stay useful. For numbers that reflect your documents, pass
+--embeddings with an (n, 1536) .npy file of real chunk embeddings.
+
+Usage (from backend/):
+    python -m benchmarks.quantization_recall
+    python -m benchmarks.quantization_recall --embeddings chunks.npy --dimensions 1536 512 256
+"""
+import argparse
+import tempfile
+
+import numpy as np
+
+from adapters import LocalVectorAdapter
+from adapters.local_adapter import QUANTIZATIONS
+
+
+def _synthetic_corpus(count: int, dimensions: int, topics: int = 50, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((topics, dimensions))
+    vectors = centroids[rng.integers(topics, size=count)] + 0.8 * rng.standard_normal((count, dimensions))
+    # Energy concentrated in leading dimensions (Matryoshka-style)
+    vectors *= 1 / np.sqrt(np.arange(1, dimensions + 1))
+    return vectors.astype(np.float32)
+
+
+def _bytes_per_vector(dimensions: int, quantization: str) -> int:
+    if quantization == "int8":
+        return dimensions + 4  # codes + float32 scale
+    if quantization == "binary":
+        return (dimensions + 7) // 8
+    return dimensions * 4
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--embeddings", help=".npy file of real embeddings (rows = chunks)")
+    parser.add_argument("--corpus", type=int, default=5000, help="synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[1536, 1024, 768, 512, 256])
+    args = parser.parse_args()
+
+    if args.embeddings:
+        corpus = np.load(args.embeddings).astype(np.float32)
+    else:
+        corpus = _synthetic_corpus(args.corpus, max(args.dimensions))
+
+    # Queries: held-out perturbations of corpus vectors
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(corpus), size=args.queries, replace=False)
+    noise = rng.standard_normal((args.queries, corpus.shape[1])).astype(np.float32)
+    queries = corpus[picks] + 0.3 * noise * np.abs(corpus[picks]).mean(axis=1, keepdims=True)
+
+    ids = [f"v{i}" for i in range(len(corpus))]
+    metadata = [{} for _ in ids]
+
+    # Ground truth: exact float32 search at full dimension
+    full = LocalVectorAdapter(data_dir=tempfile.mkdtemp(), ann_threshold=0, quantization="none")
+    full.upsert(corpus, metadata, "bench", ids)
+    truth = [
+        {match["id"] for match in full.query(query, top_k=args.top_k, namespace="bench")}
+        for query in queries
+    ]
+
+    print(f"corpus={len(corpus)} queries={args.queries} recall@{args.top_k} vs float32 @ {corpus.shape[1]} dims")
+    print(f"{'dims':>6} {'quantization':>13} {'bytes/vector':>13} {'size':>7} {'recall':>7}")
+    baseline_bytes = _bytes_per_vector(corpus.shape[1], "none")
+
+    for dimensions in args.dimensions:
+        # Shortened embeddings are the leading dimensions, re-normalized (the adapter normalizes)
+        truncated = corpus[:, :dimensions]
+        for quantization in QUANTIZATIONS:
+            adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp(), ann_threshold=0, quantization=quantization)
+            adapter.upsert(truncated, metadata, "bench", ids)
+
+            found = 0
+            for query, expected in zip(queries, truth):
+                matches = adapter.query(query[:dimensions], top_k=args.top_k, namespace="bench")
+                found += len(expected & {match["id"] for match in matches})
+            recall = found / (args.top_k * len(queries))
+
+            size = _bytes_per_vector(dimensions, quantization)
+            print(f"{dimensions:>6} {quantization:>13} {size:>13} {size / baseline_bytes:>6.1%} {recall:>7.3f}")
+
+
+if __name__ == "__main__":
+    main_cli()
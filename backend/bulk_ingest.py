@@ -0,0 +1,58 @@
+"""
+Bulk ingestion: load a directory tree or zip/tar archive of PDFs directly, without the API.
+
+For backfills too large to push through POST /api/upload. Uses the same
+pipeline configuration as the API (.env), extracts and chunks files in
+parallel processes and packs chunks from many files into each embedding
+request (see services.bulk.BulkIngestor).
+
+Every finished file is appended to the manifest. After an interruption,
+run the same command again: files that succeeded are skipped, failed and
+unfinished files are processed again. Throughput is printed every
+--report-interval seconds and a JSON summary at the end; the exit status
+is 1 if any file failed.
+
+Usage (from backend/):
+    python -m bulk_ingest /data/pdfs --manifest backfill.jsonl
+    python -m bulk_ingest /data/pdfs.tar.gz --manifest backfill.jsonl --processes 8
+"""
+import argparse
+import json
+import sys
+
+from dotenv import load_dotenv
+
+from services.bulk import BulkIngestor, Manifest
+from services.embeddings import MAX_BATCH_INPUTS
+from services.ingestion import create_pipeline
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("source", help="directory, .zip or .tar(.gz/.bz2/.xz) of PDFs")
+    parser.add_argument("--manifest", required=True, help="JSON-lines progress file, reused to resume")
+    parser.add_argument("--processes", type=int, default=None, help="parsing processes (default: one per core)")
+    parser.add_argument("--pack-size", type=int, default=MAX_BATCH_INPUTS, help="chunks per embedding call")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="seconds between throughput lines")
+    args = parser.parse_args()
+
+    load_dotenv()
+    manifest = Manifest(args.manifest)
+    try:
+        ingestor = BulkIngestor(
+            create_pipeline(),
+            manifest,
+            processes=args.processes,
+            pack_size=args.pack_size,
+            report_interval=args.report_interval,
+        )
+        summary = ingestor.run(args.source)
+    finally:
+        manifest.close()
+
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary["files_failed"] else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,16 +1,43 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from adapters import PineconeAdapter
 from dotenv import load_dotenv
-from routers import upload
+from routers import upload, jobs, search, metrics
+from services.clients import AppClients, get_clients
+from services.embedding_cache import get_embedding_cache
+from services.extraction_cache import get_extraction_cache
+from services.executors import shutdown_executors
+from services.jobs import get_job_manager
 
 # Load environment variables from .env file (API keys, Pinecone config)
 load_dotenv()
 
-app = FastAPI(title="Vectory API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the OpenAI/vector database clients once, then start background ingestion workers.
+    # On shutdown: cancel the workers, stop the CPU pool and close pooled connections.
+    clients = get_clients()
+    clients.start()
+    job_manager = get_job_manager()
+    job_manager.start()
+    yield
+    await job_manager.stop()
+    shutdown_executors()
+    clients.close()
+
+
+app = FastAPI(title="Vectory API", version="0.1.0", lifespan=lifespan)
 
 # Include routers
 app.include_router(upload.router)
+app.include_router(jobs.router)
+app.include_router(search.router)
+app.include_router(metrics.router)
+
+# Refuse oversize uploads before multipart parsing buffers them
+app.middleware("http")(upload.limit_upload_size)
 
 # Configure CORS for local development
 # Allows Next.js frontend (localhost:3000) to make requests to FastAPI (localhost:8000)
@@ -28,17 +55,32 @@ def root():
     return {"message": "Vectory API - PDF to Vector Pipeline"}
 
 @app.get("/api/health")
-def health_check():
+def health_check(clients: AppClients = Depends(get_clients)):
     """
-    Health check endpoint - verifies API is running and Pinecone connection works.
+    Health check endpoint - verifies API is running and the vector database connection works.
 
     Used by monitoring tools and frontend to check backend status.
-    Returns 200 even if Pinecone fails (graceful degradation).
+    Returns 200 even if the vector database fails (graceful degradation).
+    The connection check uses the shared adapter and is cached for
+    HEALTH_CHECK_CACHE_SECONDS, so frequent probes don't each hit the database.
+    Includes embedding and extraction cache hit/miss counters when enabled.
     """
-    try:
-        adapter = PineconeAdapter()
-        pinecone_status = adapter.health_check()
-        return {"status": "ok", "pinecone_connected": pinecone_status}
-    except Exception as e:
-        # Return 200 with error details - don't crash the health check
-        return {"status": "ok", "pinecone_connected": False, "error": str(e)}
+    provider = os.getenv("VECTOR_DB_PROVIDER", "pinecone").lower()
+    health = {"status": "ok", "vector_db": provider}
+
+    cache = get_embedding_cache()
+    if cache is not None:
+        health["embedding_cache"] = cache.stats()
+
+    cache = get_extraction_cache()
+    if cache is not None:
+        health["extraction_cache"] = cache.stats()
+
+    # Returns error details instead of raising - don't crash the health check
+    health.update(clients.health())
+
+    # Kept for existing monitors that read the Pinecone-specific field
+    if provider == "pinecone":
+        health["pinecone_connected"] = health["vector_db_connected"]
+
+    return health
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException
+
+from services.jobs import get_job_manager
+
+
+router = APIRouter(prefix="/api", tags=["jobs"])
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Get the status of a background ingestion job.
+
+    Returns overall status (queued, running, succeeded, failed), per-stage
+    progress (extract, chunk, embed, upsert) and, once finished, the
+    namespace and vector counts or the error message.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services.embedding_cache import get_embedding_cache
+from services.extraction_cache import get_extraction_cache
+from services.metrics import REGISTRY, record_cache_stats
+from services.search import result_cache_stats
+
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _collect_cache_stats() -> None:
+    cache = get_embedding_cache()
+    if cache is not None:
+        record_cache_stats("embedding", cache.stats())
+
+    cache = get_extraction_cache()
+    if cache is not None:
+        record_cache_stats("extraction", cache.stats())
+
+    stats = result_cache_stats()
+    if stats is not None:
+        record_cache_stats("search", stats)
+
+
+REGISTRY.add_collector(_collect_cache_stats)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Per-stage ingestion latency and throughput, tokens embedded, embedding
+    and upsert batch sizes, provider retries and cache hit rates. Rates
+    such as pages/s across all uploads come from rate() over the
+    vectory_stage_items_total counter.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+from services.search import get_search_service_async
+
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    namespace: str = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=100)
+    filename: Optional[str] = None
+    page_number: Optional[int] = None
+
+
+@router.post("/search")
+async def search(request: SearchRequest):
+    """
+    Semantic search over an uploaded document.
+
+    Embeds the query (concurrent queries share one embeddings request) and
+    returns the top_k most similar chunks from the namespace, optionally
+    filtered by filename and/or page_number. Repeated queries are served
+    from a short-lived result cache ("cached": true).
+    """
+    try:
+        service = await get_search_service_async()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service initialization failed: {str(e)}"
+        )
+
+    filter: Dict[str, Any] = {}
+    if request.filename is not None:
+        filter["filename"] = {"$eq": request.filename}
+    if request.page_number is not None:
+        filter["page_number"] = {"$eq": request.page_number}
+
+    try:
+        result = await service.search(
+            request.query, request.namespace, request.top_k, filter or None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Search failed: {str(e)}")
+
+    return {
+        "query": request.query,
+        "namespace": request.namespace,
+        "matches": result["matches"],
+        "cached": result["cached"]
+    }
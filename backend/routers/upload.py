@@ -1,20 +1,46 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
-from datetime import datetime, timezone
-import uuid
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+import asyncio
+import contextlib
+import json
 import tempfile
 import os
 
-from services.pdf_processor import PDFProcessor
-from services.embeddings import EmbeddingService
-from adapters import PineconeAdapter
+from services.executors import get_process_pool
+from services.clients import AppClients, get_clients
+from services.ingestion import EmptyDocumentError, IngestionPipeline, ProgressCallback
+from services.jobs import QueueFullError, get_job_manager
 
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
+# Upload size limits - oversize files are rejected before they are processed.
+# Read per request rather than at import: main.py loads .env after importing the routers.
+def max_upload_bytes() -> int:
+    return int(os.getenv("MAX_UPLOAD_MB", "50")) * 1024 * 1024
+
+
+def max_upload_request_bytes() -> int:
+    return int(os.getenv("MAX_UPLOAD_REQUEST_MB", "500")) * 1024 * 1024
+
+
+# Files from one request processed at the same time, also read per request
+def upload_file_concurrency() -> int:
+    return int(os.getenv("UPLOAD_FILE_CONCURRENCY", "4"))
+
+# Uploads are copied to disk in fixed-size blocks so memory per file stays constant
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
 
 @router.post("/upload")
-async def upload_pdf(files: List[UploadFile] = File(...)):
+async def upload_pdf(
+    request: Request,
+    response: Response,
+    files: List[UploadFile] = File(...),
+    mode: Literal["sync", "async", "stream"] = Query("sync"),
+    clients: AppClients = Depends(get_clients),
+):
     """
     Upload and process PDF files into vector embeddings.
 
@@ -27,6 +53,16 @@ async def upload_pdf(files: List[UploadFile] = File(...)):
     4. Store vectors in Pinecone with rich metadata
 
     Each file gets a unique namespace: {filename}-{uuid} to allow re-uploads.
+    With INGESTION_VERSIONED=true the namespace is the filename instead, and
+    a re-upload only embeds/stores the chunks that changed since the last one.
+
+    mode=sync (default) processes the files concurrently (UPLOAD_FILE_CONCURRENCY)
+    and returns per-file results; a failing file is reported in "errors"
+    without aborting the others (the request only fails if every file fails).
+    mode=async queues one background job per file and returns 202 immediately;
+    poll GET /api/jobs/{job_id} for progress and results.
+    mode=stream processes the files like mode=sync but streams progress events
+    while it runs - see _stream_uploads for the event format.
     """
 
     # Validate file types - reject non-PDFs early
@@ -36,97 +72,289 @@ async def upload_pdf(files: List[UploadFile] = File(...)):
                 status_code=400,
                 detail=f"Invalid file type: {file.filename}. Only PDF files are accepted."
             )
+        if file.size is not None and file.size > max_upload_bytes():
+            raise _too_large(file.filename)
+
+    if mode == "async":
+        return await _enqueue_uploads(files, response)
 
-    # Initialize services (fails fast if API keys missing)
+    # Shared pipeline and clients (fails fast if API keys missing)
     try:
-        pdf_processor = PDFProcessor()
-        embedding_service = EmbeddingService()
-        vector_adapter = PineconeAdapter()
+        pipeline = clients.pipeline()
     except Exception as e:
         raise HTTPException(
             status_code=503,
             detail=f"Service initialization failed: {str(e)}"
         )
 
-    results = []
-
-    for file in files:
+    if mode == "stream":
+        # Save every file before responding - upload bodies can't be read once streaming starts
+        saved: List[Tuple[str, str]] = []
         try:
-            # Save uploaded file to temporary location
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
-                tmp_file_path = tmp_file.name
+            for file in files:
+                saved.append((file.filename, await _save_to_tempfile(file)))
+        except BaseException:
+            for _, path in saved:
+                os.unlink(path)
+            raise
 
+        sse = "text/event-stream" in request.headers.get("accept", "")
+        return StreamingResponse(
+            _stream_uploads(pipeline, saved, sse),
+            media_type="text/event-stream" if sse else "application/x-ndjson",
+            # Disable proxy buffering (nginx) so events arrive as they are sent
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # Files are processed concurrently (bounded) and fail independently
+    semaphore = asyncio.Semaphore(upload_file_concurrency())
+
+    async def process(file: UploadFile) -> Dict[str, Any]:
+        async with semaphore:
             try:
-                # STEP 1: Extract and chunk PDF
-                # Extracts text page-by-page, then splits into ~1000 char chunks with 200 char overlap
-                chunks = pdf_processor.process_pdf(tmp_file_path)
-
-                if not chunks:
-                    raise HTTPException(
-                        status_code=422,
-                        detail=f"No text could be extracted from {file.filename}"
-                    )
-
-                # STEP 2: Generate embeddings
-                # Batch process all chunks through OpenAI to get 1536-dimensional vectors
-                chunk_texts = [chunk["text"] for chunk in chunks]
-                embeddings = embedding_service.generate_embeddings(chunk_texts)
-
-                # STEP 3: Prepare metadata for each chunk
-                # Namespace format: filename-uuid ensures uniqueness for re-uploads
-                upload_timestamp = datetime.now(timezone.utc).isoformat()
-                namespace = f"{file.filename}-{uuid.uuid4().hex[:8]}"
-
-                metadata_list = []
-                ids = []
-
-                for i, chunk in enumerate(chunks):
-                    chunk_id = f"{namespace}-chunk-{i}"
-                    ids.append(chunk_id)
-
-                    # Store rich metadata for future retrieval/filtering
-                    metadata_list.append({
-                        "filename": file.filename,
-                        "page_number": chunk["page_number"],
-                        "chunk_index": chunk["chunk_index"],
-                        "upload_timestamp": upload_timestamp,
-                        "total_chunks": len(chunks),
-                        "text": chunk["text"]  # Store original text for display in search results
-                    })
-
-                # STEP 4: Upsert to vector database
-                # Uses adapter pattern - swap Pinecone for Chroma/Supabase by changing VECTOR_DB_PROVIDER env var
-                upsert_result = vector_adapter.upsert(
-                    vectors=embeddings,
-                    metadata=metadata_list,
-                    namespace=namespace,
-                    ids=ids
-                )
-
-                # Add to results
-                results.append({
-                    "filename": file.filename,
-                    "chunks_created": len(chunks),
-                    "vectors_stored": upsert_result["upserted_count"],
-                    "namespace": namespace
-                })
-
-            finally:
-                # Clean up temporary file (runs even if processing fails)
-                os.unlink(tmp_file_path)
+                return {"result": await _ingest_upload(pipeline, file)}
+            except HTTPException as e:
+                return {"error": {"filename": file.filename, "status_code": e.status_code, "detail": e.detail}}
 
-        except HTTPException:
-            raise
+    outcomes = await asyncio.gather(*(process(file) for file in files))
+    summary = _summarize(outcomes)
+
+    # Nothing succeeded - surface the first failure as the response status
+    if not summary["results"]:
+        error = summary["errors"][0]
+        raise HTTPException(status_code=error["status_code"], detail=error["detail"])
+
+    return summary
+
+
+def _summarize(outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    results = [outcome["result"] for outcome in outcomes if "result" in outcome]
+    errors = [outcome["error"] for outcome in outcomes if "error" in outcome]
+    return {
+        "success": not errors,
+        "files_processed": len(results),
+        "results": results,
+        "errors": errors
+    }
+
+
+async def _stream_uploads(
+    pipeline: IngestionPipeline, saved: List[Tuple[str, str]], sse: bool
+) -> AsyncIterator[str]:
+    """
+    Ingest saved uploads (filename, temp path), yielding events as they happen.
+
+    One JSON event per line (NDJSON), or per SSE message when the client
+    sent Accept: text/event-stream:
+
+        {"event": "progress", "filename", "stage", "status", "details"}
+            each stage starting and completing (pages extracted, chunks
+            created, ...), plus running counts as embedding batches finish
+            (and upsert batches, with INGESTION_STREAMING=true)
+        {"event": "result", "filename", "result"}  a file finished
+        {"event": "error", "filename", "status_code", "detail"}  a file failed
+        {"event": "done", "success", "files_processed", "results", "errors"}
+            last event, same body as the mode=sync response
+
+    Files are processed concurrently as in mode=sync. If the client
+    disconnects, files not yet finished are cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(upload_file_concurrency())
+
+    async def process(filename: str, path: str) -> Dict[str, Any]:
+        def on_progress(stage: str, status: str, details: Dict[str, Any]) -> None:
+            # Called from worker threads as well as the event loop
+            loop.call_soon_threadsafe(events.put_nowait, {
+                "event": "progress", "filename": filename, "stage": stage, "status": status, "details": details
+            })
+
+        try:
+            async with semaphore:
+                try:
+                    outcome = {"result": await _ingest_saved(pipeline, path, filename, on_progress)}
+                    event = {"event": "result", "filename": filename, "result": outcome["result"]}
+                except HTTPException as e:
+                    outcome = {"error": {"filename": filename, "status_code": e.status_code, "detail": e.detail}}
+                    event = {"event": "error", **outcome["error"]}
+        finally:
+            _remove_file(path)  # Cancelled before it started
+
+        # Queued behind progress events still in flight from worker threads
+        loop.call_soon(events.put_nowait, event)
+        return outcome
+
+    task = asyncio.ensure_future(asyncio.gather(*(process(filename, path) for filename, path in saved)))
+    try:
+        while True:
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, task}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                next_event.cancel()
+                break
+            yield _format_event(next_event.result(), sse)
+
+        await asyncio.sleep(0)  # Let the last result event land
+        while not events.empty():
+            yield _format_event(events.get_nowait(), sse)
+        yield _format_event({"event": "done", **_summarize(task.result())}, sse)
+    finally:
+        # Client went away - stop processing
+        if not task.done():
+            task.cancel()
+
+
+def _format_event(event: Dict[str, Any], sse: bool) -> str:
+    if sse:
+        return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    return json.dumps(event) + "\n"
+
+
+async def _ingest_upload(pipeline: IngestionPipeline, file: UploadFile) -> Dict[str, Any]:
+    """
+    Run one uploaded file through the pipeline.
+
+    Raises:
+        HTTPException: 413 (too large), 422 (no text) or 503 (processing failed)
+    """
+    try:
+        # Save uploaded file to temporary location
+        tmp_file_path = await _save_to_tempfile(file)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Processing failed for {file.filename}: {str(e)}"
+        )
+
+    return await _ingest_saved(pipeline, tmp_file_path, file.filename)
+
+
+async def _ingest_saved(
+    pipeline: IngestionPipeline,
+    tmp_file_path: str,
+    filename: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Run a saved upload through the pipeline, then delete it.
+
+    Raises:
+        HTTPException: 422 (no text) or 503 (processing failed)
+    """
+    try:
+        try:
+            # Parsing runs in the process pool and SDK calls in threads,
+            # so other requests (e.g. /api/health) keep being served
+            return await pipeline.ingest_async(
+                tmp_file_path, filename, on_progress, process_pool=get_process_pool()
+            )
+        finally:
+            # Clean up temporary file (runs even if processing fails)
+            _remove_file(tmp_file_path)
+
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Processing failed for {filename}: {str(e)}"
+        )
+
+
+async def _enqueue_uploads(files: List[UploadFile], response: Response):
+    """Save each upload to disk and queue it as a background ingestion job."""
+    job_manager = get_job_manager()
+    jobs = []
+
+    for file in files:
+        tmp_file_path = await _save_to_tempfile(file)
+
+        # Job manager owns the temp file once submitted
+        try:
+            job = job_manager.submit(tmp_file_path, file.filename)
+        except QueueFullError as e:
+            os.unlink(tmp_file_path)
+            raise HTTPException(status_code=429, detail=str(e))
         except Exception as e:
+            # The durable queue may already have moved the file into its spool directory
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_file_path)
             raise HTTPException(
                 status_code=503,
-                detail=f"Processing failed for {file.filename}: {str(e)}"
+                detail=f"Service initialization failed: {str(e)}"
             )
 
+        jobs.append({
+            "job_id": job.id,
+            "filename": file.filename,
+            "status": job.status,
+            "status_url": f"/api/jobs/{job.id}"
+        })
+
+    response.status_code = 202
     return {
         "success": True,
-        "files_processed": len(results),
-        "results": results
+        "files_queued": len(jobs),
+        "jobs": jobs
     }
+
+
+async def _save_to_tempfile(file: UploadFile) -> str:
+    """
+    Copy an uploaded file to a temporary .pdf file in fixed-size blocks.
+
+    Never holds more than UPLOAD_BLOCK_SIZE bytes of the file in memory and
+    stops with 413 as soon as the file exceeds MAX_UPLOAD_MB.
+    """
+    limit = max_upload_bytes()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+        try:
+            while block := await file.read(UPLOAD_BLOCK_SIZE):
+                size += len(block)
+                if size > limit:
+                    raise _too_large(file.filename)
+                tmp_file.write(block)
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+        return tmp_file.name
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _too_large(filename: str) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large: {filename}. Maximum size is {max_upload_bytes() // (1024 * 1024)}MB."
+    )
+
+
+async def limit_upload_size(request: Request, call_next):
+    """
+    Reject oversize upload requests from Content-Length before the body is read.
+
+    Multipart parsing runs before the endpoint, so this is the only point
+    where an oversize request can be refused without buffering it first.
+    """
+    if request.url.path == "/api/upload":
+        content_length = request.headers.get("content-length")
+        limit = max_upload_request_bytes()
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            return JSONResponse(
+                status_code=413,
+                content={
+                    "detail": f"Upload too large. Maximum request size is "
+                              f"{limit // (1024 * 1024)}MB."
+                }
+            )
+    return await call_next(request)
@@ -0,0 +1,37 @@
+from typing import Callable, List, Sequence, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+def make_batches(
+    items: Sequence[T],
+    size_of: Callable[[T], int],
+    max_items: int,
+    max_size: int,
+) -> List[Tuple[int, int]]:
+    """
+    Split items into contiguous batches bounded by count and total size.
+
+    Used for API request limits (e.g. inputs/tokens per embedding request,
+    vectors/bytes per upsert). An item larger than max_size gets a batch of
+    its own. Returns (start, end) index ranges so results can be
+    reassembled in order.
+    """
+    batches = []
+    start = 0
+    batch_size = 0
+
+    for i, item in enumerate(items):
+        size = size_of(item)
+        batch_full = i - start >= max_items or batch_size + size > max_size
+        if batch_full and i > start:
+            batches.append((start, i))
+            start = i
+            batch_size = 0
+        batch_size += size
+
+    if start < len(items):
+        batches.append((start, len(items)))
+
+    return batches
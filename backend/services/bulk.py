@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.embeddings import MAX_BATCH_INPUTS
+from services.ingestion import ChunkedDocument, IngestionPipeline
+from services.pdf_processor import Chunk, PDFProcessor
+
+
+class SourceFile:
+    """One PDF to ingest: its manifest key, display filename and path on disk."""
+
+    __slots__ = ("key", "filename", "path", "temporary")
+
+    def __init__(self, key: str, filename: str, path: str, temporary: bool = False):
+        self.key = key
+        self.filename = filename
+        self.path = path
+        # Archive members are extracted to a spool file, deleted once parsed
+        self.temporary = temporary
+
+
+def iter_sources(source: str, spool_dir: str) -> Iterator[SourceFile]:
+    """
+    Yield every PDF in a directory tree or a zip/tar archive, in a stable order.
+
+    Keys are paths relative to the directory (or member names in the
+    archive). Archive members are extracted to spool_dir one at a time, as
+    the caller advances the iterator, so disk use stays bounded by how many
+    files are in flight rather than the archive size.
+    """
+    if os.path.isdir(source):
+        root = Path(source)
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() == ".pdf":
+                yield SourceFile(path.relative_to(root).as_posix(), path.name, str(path))
+
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    with archive.open(info) as member:
+                        yield _spool(info.filename, member, spool_dir)
+
+    elif tarfile.is_tarfile(source):
+        # Streamed in member order - compressed tars can't seek back
+        with tarfile.open(source, mode="r|*") as archive:
+            for info in archive:
+                if info.isfile() and info.name.lower().endswith(".pdf"):
+                    yield _spool(info.name, archive.extractfile(info), spool_dir)
+
+    else:
+        raise ValueError(f"Not a directory, zip or tar archive: {source}")
+
+
+def _spool(key: str, member: Any, spool_dir: str) -> SourceFile:
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=spool_dir)
+    with os.fdopen(fd, "wb") as f:
+        shutil.copyfileobj(member, f)
+    return SourceFile(key, os.path.basename(key), path, temporary=True)
+
+
+class Manifest:
+    """
+    Append-only JSON-lines record of every file a bulk run has finished.
+
+    Each line is {"key", "status": "succeeded"|"failed", ...result or error}.
+    A rerun with the same manifest skips files that succeeded and retries
+    the ones that failed; the last line for a key wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partial line from an interrupted write
+                    self.records[record["key"]] = record
+        self._file = open(path, "a", encoding="utf-8")
+
+    def succeeded(self, key: str) -> bool:
+        return self.records.get(key, {}).get("status") == "succeeded"
+
+    def record(self, key: str, status: str, **fields: Any) -> None:
+        record = {"key": key, "status": status, **fields}
+        self.records[key] = record
+        # Flushed per file so an interrupted run loses at most the files in flight
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Throughput:
+    """Running totals for a bulk run, with per-second rates."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.files_succeeded = 0
+        self.files_failed = 0
+        self.files_skipped = 0
+        self.pages = 0
+        self.chunks = 0
+        self.vectors = 0
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = self.clock() - self.started
+        summary: Dict[str, Any] = {
+            "files_succeeded": self.files_succeeded,
+            "files_failed": self.files_failed,
+            "files_skipped": self.files_skipped,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "vectors": self.vectors,
+            "elapsed_s": round(elapsed, 1),
+        }
+        for rate, count in (("files", self.files_succeeded), ("pages", self.pages),
+                            ("chunks", self.chunks), ("vectors", self.vectors)):
+            summary[f"{rate}_per_s"] = round(count / elapsed, 1) if elapsed else 0.0
+        return summary
+
+    def line(self) -> str:
+        s = self.summary()
+        return (
+            f"{s['files_succeeded']} files ({s['files_failed']} failed, {s['files_skipped']} skipped) "
+            f"in {s['elapsed_s']}s | {s['files_per_s']} files/s, {s['pages_per_s']} pages/s, "
+            f"{s['chunks_per_s']} chunks/s, {s['vectors_per_s']} vectors/s"
+        )
+
+
+def parse_pdf(pdf_path: str, processor_settings: Dict[str, Any]) -> Tuple[int, List[Chunk]]:
+    """Extract and chunk one PDF (runs inside a worker process). Returns (pages, chunks)."""
+    processor = PDFProcessor(**processor_settings)
+    pages = list(processor.iter_pages(pdf_path))
+    return len(pages), processor.chunk_text(pages)
+
+
+class BulkIngestor:
+    """
+    Ingests a directory tree or archive of PDFs without going through HTTP.
+
+    Files are extracted and chunked in parallel worker processes and handed
+    to the pipeline's ingest_chunked() as they finish, which packs their
+    chunks into embedding calls of pack_size texts regardless of file
+    boundaries and stores each file once its last chunk is embedded. Every
+    finished file is recorded in the manifest.
+
+    Namespaces are derived from the source and the file's key instead of a
+    random suffix, so rerunning an interrupted backfill overwrites the
+    vectors of a file that was half-stored rather than leaving orphans.
+    Versioned ingestion isn't supported.
+    """
+
+    def __init__(
+        self,
+        pipeline: IngestionPipeline,
+        manifest: Manifest,
+        processes: Optional[int] = None,
+        pack_size: int = MAX_BATCH_INPUTS,
+        report_interval: float = 10.0,
+        log: Callable[[str], None] = print,
+    ):
+        if pipeline.versioned:
+            raise ValueError("Bulk ingestion doesn't support INGESTION_VERSIONED=true")
+        self.pipeline = pipeline
+        self.manifest = manifest
+        self.processes = processes or os.cpu_count() or 1
+        self.pack_size = pack_size
+        self.report_interval = report_interval
+        self.log = log
+
+        processor = pipeline.pdf_processor
+        self._processor_settings = {
+            "chunk_size": processor.chunk_size,
+            "chunk_overlap": processor.chunk_overlap,
+            "chunker": processor.chunker,
+            "chunk_length": processor.chunk_length,
+            "chunk_across_pages": processor.chunk_across_pages,
+        }
+
+    def run(self, source: str) -> Dict[str, Any]:
+        """Ingest every PDF under source not already in the manifest. Returns the run's totals."""
+        stats = Throughput()
+
+        def on_done(document: ChunkedDocument, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+            if error is not None:
+                self._fail(document.source, error, stats)
+                return
+            stats.files_succeeded += 1
+            stats.chunks += result["chunks_created"]
+            stats.vectors += result["vectors_stored"]
+            self.manifest.record(document.source.key, "succeeded", **result)
+
+        with tempfile.TemporaryDirectory() as spool_dir, ProcessPoolExecutor(self.processes) as pool:
+            self.pipeline.ingest_chunked(
+                self._parse(source, spool_dir, pool, stats), on_done, pack_size=self.pack_size
+            )
+
+        self.log(stats.line())
+        return stats.summary()
+
+    def _parse(
+        self, source: str, spool_dir: str, pool: ProcessPoolExecutor, stats: Throughput
+    ) -> Iterator[ChunkedDocument]:
+        """Parse files in the worker processes, yielding each as it finishes."""
+        source_id = os.path.abspath(source)
+        sources = iter_sources(source, spool_dir)
+        in_flight: Dict[Future, SourceFile] = {}
+        exhausted = False
+        last_report = stats.clock()
+
+        while True:
+            # Keep every worker busy with one file queued behind it
+            while not exhausted and len(in_flight) < self.processes * 2:
+                file = next(sources, None)
+                if file is None:
+                    exhausted = True
+                elif self.manifest.succeeded(file.key):
+                    stats.files_skipped += 1
+                    if file.temporary:
+                        os.unlink(file.path)
+                else:
+                    in_flight[pool.submit(parse_pdf, file.path, self._processor_settings)] = file
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file = in_flight.pop(future)
+                if file.temporary:
+                    os.unlink(file.path)
+                try:
+                    pages, chunks = future.result()
+                except Exception as e:
+                    self._fail(file, f"Parsing failed: {e}", stats)
+                    continue
+                stats.pages += pages
+                digest = hashlib.sha256(f"{source_id}\0{file.key}".encode("utf-8")).hexdigest()[:8]
+                yield ChunkedDocument(file, file.filename, f"{file.filename}-{digest}", chunks)
+
+            if stats.clock() - last_report >= self.report_interval:
+                self.log(stats.line())
+                last_report = stats.clock()
+
+    def _fail(self, file: SourceFile, error: str, stats: Throughput) -> None:
+        stats.files_failed += 1
+        self.manifest.record(file.key, "failed", filename=file.filename, error=error)
+        self.log(f"Failed {file.key}: {error}")
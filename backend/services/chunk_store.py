@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional
+
+from services.sqlite_store import SQLiteStore, store_from_env
+
+
+class ChunkStore(SQLiteStore):
+    """
+    Chunk text and per-document fields kept outside the vector database.
+
+    With the store enabled, vector metadata carries only the filterable
+    fields (filename, page_number, chunk_index). Chunk text is stored here
+    keyed by vector ID, and upload_timestamp / total_chunks once per
+    namespace, instead of being repeated on every vector. Search results
+    are rehydrated from the store.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "id TEXT PRIMARY KEY, namespace TEXT NOT NULL, text TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_namespace ON chunks (namespace)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "namespace TEXT PRIMARY KEY, filename TEXT NOT NULL, "
+            "upload_timestamp TEXT NOT NULL, total_chunks INTEGER)"
+        )
+        self._conn.commit()
+
+    def put_chunks(self, namespace: str, ids: List[str], texts: List[str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (id, namespace, text) VALUES (?, ?, ?)",
+                [(vector_id, namespace, text) for vector_id, text in zip(ids, texts)],
+            )
+            self._conn.commit()
+
+    def put_document(
+        self, namespace: str, filename: str, upload_timestamp: str, total_chunks: Optional[int]
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (namespace, filename, upload_timestamp, total_chunks) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, filename, upload_timestamp, total_chunks),
+            )
+            self._conn.commit()
+
+    def delete_chunks(self, ids: List[str]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(vector_id,) for vector_id in ids])
+            self._conn.commit()
+
+    def get_texts(self, ids: List[str]) -> Dict[str, str]:
+        """Chunk text by vector ID; unknown IDs are omitted."""
+        with self._lock:
+            return dict(self._select_in("SELECT id, text FROM chunks WHERE id IN ({placeholders})", ids))
+
+    def get_document(self, namespace: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename, upload_timestamp, total_chunks FROM documents WHERE namespace = ?",
+                (namespace,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"filename": row[0], "upload_timestamp": row[1], "total_chunks": row[2]}
+
+    def hydrate(self, namespace: str, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add text and document fields back into the metadata of search matches."""
+        missing = [match["id"] for match in matches if "text" not in match["metadata"]]
+        if not missing:
+            return matches
+
+        texts = self.get_texts(missing)
+        document = self.get_document(namespace) or {}
+        for match in matches:
+            if match["id"] in texts:
+                metadata = {**match["metadata"], "text": texts[match["id"]]}
+                for field in ("upload_timestamp", "total_chunks"):
+                    if document.get(field) is not None:
+                        metadata.setdefault(field, document[field])
+                match["metadata"] = metadata
+        return matches
+
+
+def get_chunk_store() -> Optional[ChunkStore]:
+    """
+    Return the process-wide chunk store, or None if disabled.
+
+    Enabled by setting CHUNK_STORE_PATH to a SQLite file path.
+    """
+    return store_from_env("CHUNK_STORE_PATH", ChunkStore)
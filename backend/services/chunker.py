@@ -0,0 +1,247 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Optional - fall back to a conservative estimate
+    tiktoken = None
+
+
+# Break points in order of preference, as in RecursiveCharacterTextSplitter
+SEPARATORS = ("\n\n", "\n", " ")
+
+# Joins consecutive pages when chunks may cross page boundaries. A line
+# break rather than a paragraph break, so a page boundary isn't preferred
+# over the lines around it and text flows on from one page to the next.
+PAGE_SEPARATOR = "\n"
+
+LENGTH_UNITS = ("chars", "tokens")
+
+_NON_WHITESPACE = re.compile(r"\S")
+
+Span = Tuple[int, int]
+
+
+class TextChunker:
+    """
+    Single-pass text splitter with the same size/overlap semantics as
+    RecursiveCharacterTextSplitter.
+
+    Walks the document once with offsets: each chunk takes up to chunk_size
+    units from the current position and ends at the last paragraph break,
+    line break or space inside that window (hard cut if there is none). The
+    next chunk starts up to chunk_overlap units before the previous end,
+    aligned to a break. Only the final chunk strings are copied.
+
+    length="tokens" measures chunk_size/chunk_overlap in embedding-model
+    tokens (tiktoken cl100k_base when installed, else ~3 bytes per token)
+    so chunks line up with embedding token limits.
+
+    With across_pages=True, pages are chunked as one continuous document:
+    chunks may span a page break and record the page range they cover.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        length: str = "chars",
+        across_pages: bool = False,
+        separators: Sequence[str] = SEPARATORS,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})"
+            )
+        if length not in LENGTH_UNITS:
+            raise ValueError(f"length must be one of {LENGTH_UNITS}, got {length!r}")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length = length
+        self.across_pages = across_pages
+        self.separators = tuple(separators)
+
+    def split_text(self, text: str) -> List[str]:
+        """Split one text into chunk strings (drop-in for text_splitter.split_text)."""
+        spans, _, _ = self._split(text, final=True)
+        return [text[start:end] for start, end in spans]
+
+    def iter_chunks(self, pages: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, Optional[int], str]]:
+        """
+        Incrementally chunk pages as they arrive.
+
+        Yields (page_number, page_end, text); page_end is None unless chunking
+        across pages. Across pages, only the text that can't yet form a full
+        chunk is carried over to the next page, so memory stays bounded.
+        """
+        if not self.across_pages:
+            for page in pages:
+                for text in self.split_text(page["text"]):
+                    yield page["page_number"], None, text
+            return
+
+        buffer = ""
+        page_starts: List[int] = []  # Offset in buffer where each pending page begins
+        page_numbers: List[int] = []
+        floor = 0  # End of the last emitted chunk, relative to buffer
+
+        def emit(final: bool) -> Iterator[Tuple[int, Optional[int], str]]:
+            nonlocal buffer, page_starts, page_numbers, floor
+            spans, resume, floor = self._split(buffer, final, floor)
+            for start, end in spans:
+                first = bisect_right(page_starts, start) - 1
+                last = bisect_right(page_starts, end - 1) - 1
+                yield page_numbers[first], page_numbers[last], buffer[start:end]
+
+            # Drop consumed text, keeping the page that contains the resume point
+            keep = max(0, bisect_right(page_starts, resume) - 1)
+            buffer = buffer[resume:]
+            floor = max(0, floor - resume)
+            page_starts = [max(0, offset - resume) for offset in page_starts[keep:]]
+            page_numbers = page_numbers[keep:]
+
+        for page in pages:
+            if buffer:
+                # Trailing/leading newlines around the break would read as a paragraph break
+                buffer = buffer.rstrip() + PAGE_SEPARATOR
+                floor = min(floor, len(buffer))
+            page_starts.append(len(buffer))
+            page_numbers.append(page["page_number"])
+            buffer += page["text"].lstrip()
+            yield from emit(final=False)
+
+        if buffer:
+            yield from emit(final=True)
+
+    def _split(self, text: str, final: bool, floor: int = 0) -> Tuple[List[Span], int, int]:
+        """
+        Chunk spans of text, the offset where chunking stopped and the end of the last chunk.
+
+        With final=False, stops before the first chunk whose window would run
+        past the end of text - more text may still arrive - and returns its
+        start so the caller can resume there. Each chunk must end past floor
+        (the previous chunk's end), so an overlap never re-ends at the same break.
+        """
+        boundaries = self._boundaries(text) if self.length == "tokens" else None
+        n = len(text)
+        spans = []
+        start = _skip_whitespace(text, 0, n)
+
+        while start < n:
+            limit = self._advance(boundaries, start, self.chunk_size, n)
+            if limit >= n:
+                if not final:
+                    break
+                end, separator = n, ""
+            else:
+                end, separator = self._break(text, max(start, floor), limit)
+
+            trimmed = end
+            while trimmed > start and text[trimmed - 1].isspace():
+                trimmed -= 1
+            if trimmed > start:
+                spans.append((start, trimmed))
+            if end >= n:
+                start = n
+                break
+
+            floor = end
+            start = _skip_whitespace(text, self._overlap_start(text, boundaries, start, end, separator), n)
+
+        return spans, start, floor
+
+    def _break(self, text: str, start: int, limit: int) -> Tuple[int, str]:
+        """End of a chunk and the separator it ends at: the last preferred break within (start, limit]."""
+        for separator in self.separators:
+            index = text.rfind(separator, start + 1, limit + len(separator))
+            if start < index <= limit:
+                return index, separator
+        return limit, ""  # No break at all - hard cut
+
+    def _overlap_start(
+        self, text: str, boundaries: Optional[List[int]], start: int, end: int, separator: str
+    ) -> int:
+        """
+        Start of the next chunk: up to chunk_overlap units before end.
+
+        Like LangChain, the overlap is made of whole pieces at the level the
+        chunk was split at (paragraphs, lines or words), so it is shorter -
+        or empty - when those pieces don't fit in chunk_overlap.
+        """
+        if self.chunk_overlap == 0:
+            return end
+        earliest = max(start + 1, self._retreat(boundaries, end, self.chunk_overlap))
+        if not separator:
+            return earliest
+        index = text.find(separator, earliest, end)
+        if index == -1:
+            return end
+        overlap_start = index + len(separator)
+
+        # Drop leading overlap pieces that would leave no room for the next piece
+        next_break = text.find(separator, end + len(separator))
+        next_end = len(text) if next_break == -1 else next_break
+        while overlap_start < end and self._advance(boundaries, overlap_start, self.chunk_size, len(text)) < next_end:
+            index = text.find(separator, overlap_start, end)
+            overlap_start = index + len(separator) if index != -1 else end
+        return overlap_start
+
+    @staticmethod
+    def _advance(boundaries: Optional[List[int]], offset: int, units: int, n: int) -> int:
+        if boundaries is None:
+            return min(n, offset + units)
+        index = bisect_right(boundaries, offset) - 1 + units
+        return boundaries[index] if index < len(boundaries) else n
+
+    @staticmethod
+    def _retreat(boundaries: Optional[List[int]], offset: int, units: int) -> int:
+        if boundaries is None:
+            return offset - units
+        return boundaries[max(0, bisect_left(boundaries, offset) - units)]
+
+    def _boundaries(self, text: str) -> List[int]:
+        """Character offset where each token starts."""
+        encoding = _encoding()
+        if encoding is not None:
+            _, offsets = encoding.decode_with_offsets(encoding.encode(text, disallowed_special=()))
+            return offsets
+
+        # Estimate: a token every ~3 UTF-8 bytes (matches EmbeddingService.count_tokens)
+        if text.isascii():
+            return list(range(0, len(text), 3))
+        offsets, size, next_token = [], 0, 0
+        for i, char in enumerate(text):
+            if size >= next_token:
+                offsets.append(i)
+                next_token = size + 3
+            size += len(char.encode("utf-8"))
+        return offsets
+
+
+def count_tokens(text: str) -> int:
+    """Token length function for splitters (same estimate as TextChunker length="tokens")."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+_cached_encoding: Any = None
+
+
+def _encoding() -> Any:
+    global _cached_encoding
+    if _cached_encoding is None and tiktoken is not None:
+        try:
+            # Tokenizer of the text-embedding-3 models
+            _cached_encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _cached_encoding = False  # Encoding files unavailable (e.g. offline) - use the estimate
+    return _cached_encoding or None
+
+
+def _skip_whitespace(text: str, offset: int, n: int) -> int:
+    match = _NON_WHITESPACE.search(text, offset)
+    return match.start() if match else n
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from adapters import VectorDBAdapter, create_vector_adapter
+from services.embeddings import EmbeddingProvider, create_embedding_service
+from services.ingestion import IngestionPipeline, create_pipeline
+
+
+class AppClients:
+    """
+    Provider clients and the ingestion pipeline, shared by every request.
+
+    Each is created once - at startup by the app lifespan, or on first use -
+    and reused, so requests don't pay for new OpenAI/Pinecone clients, TLS
+    handshakes and index-host lookups. Creation failures (e.g. missing API
+    keys) are raised to the caller and retried on the next call.
+
+    The vector database health check is cached for health_ttl seconds
+    (HEALTH_CHECK_CACHE_SECONDS) so frequent probes don't each call
+    describe_index_stats.
+    """
+
+    def __init__(
+        self,
+        embedding_factory: Callable[[], EmbeddingProvider] = create_embedding_service,
+        adapter_factory: Callable[[], VectorDBAdapter] = create_vector_adapter,
+        health_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.embedding_factory = embedding_factory
+        self.adapter_factory = adapter_factory
+        self.health_ttl = (
+            health_ttl if health_ttl is not None else float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", "5"))
+        )
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._embedding_service: Optional[EmbeddingProvider] = None
+        self._vector_adapter: Optional[VectorDBAdapter] = None
+        self._pipeline: Optional[IngestionPipeline] = None
+        self._health: Optional[Dict[str, Any]] = None
+        self._health_checked_at = 0.0
+
+    def embedding_service(self) -> EmbeddingProvider:
+        with self._lock:
+            if self._embedding_service is None:
+                self._embedding_service = self.embedding_factory()
+            return self._embedding_service
+
+    def vector_adapter(self) -> VectorDBAdapter:
+        with self._lock:
+            if self._vector_adapter is None:
+                self._vector_adapter = self.adapter_factory()
+            return self._vector_adapter
+
+    def pipeline(self) -> IngestionPipeline:
+        """
+        The shared ingestion pipeline.
+
+        Raises:
+            Exception: If a client can't be created or dimensions don't match the index
+        """
+        if self._pipeline is None:
+            pipeline = create_pipeline(self.embedding_service(), self.vector_adapter())
+            with self._lock:
+                self._pipeline = self._pipeline or pipeline
+        return self._pipeline
+
+    def start(self) -> None:
+        """Create everything up front so the first request doesn't pay for it."""
+        try:
+            self.pipeline()
+        except Exception as e:
+            # Keep serving - uploads report the error as 503 until it's fixed
+            print(f"Service initialization deferred: {e}")
+
+    def health(self) -> Dict[str, Any]:
+        """Vector database connectivity, re-checked at most every health_ttl seconds."""
+        now = self.clock()
+        if self._health is not None and now - self._health_checked_at < self.health_ttl:
+            return self._health
+
+        try:
+            health = {"vector_db_connected": self.vector_adapter().health_check()}
+        except Exception as e:
+            # Report the error instead of failing the health check
+            health = {"vector_db_connected": False, "error": str(e)}
+
+        self._health, self._health_checked_at = health, now
+        return health
+
+    def close(self) -> None:
+        """Release pooled connections (app shutdown)."""
+        with self._lock:
+            if self._embedding_service is not None:
+                self._embedding_service.close()
+            if self._vector_adapter is not None:
+                self._vector_adapter.close()
+            self._embedding_service = self._vector_adapter = self._pipeline = None
+            self._health = None
+
+
+_clients: Optional[AppClients] = None
+_clients_lock = threading.Lock()
+
+
+def get_clients() -> AppClients:
+    """
+    Return the process-wide clients.
+
+    Also the FastAPI dependency routes use - tests swap in fakes with
+    app.dependency_overrides[get_clients].
+    """
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = AppClients()
+        return _clients
+
+
+def shared_pipeline() -> IngestionPipeline:
+    """Pipeline factory for background workers: the same pipeline requests use."""
+    return get_clients().pipeline()
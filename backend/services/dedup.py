@@ -0,0 +1,310 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.pdf_processor import Chunk
+from services.sqlite_store import SQLiteStore, store_from_env
+
+
+DEDUP_MODES = ("off", "exact", "near")
+
+_WORD = re.compile(r"\w+")
+_WHITESPACE = re.compile(r"\s+")
+
+# MinHash signature length, split into LSH bands of BAND_ROWS values each.
+# Two chunks become candidates when any band matches exactly: likely above
+# ~0.4 Jaccard similarity, near-certain above 0.8; candidates are then
+# checked against the threshold.
+NUM_PERMUTATIONS = 128
+BAND_ROWS = 4
+
+# Chunks with fewer word shingles than this are only matched exactly -
+# a handful of words is too little to call anything a near-duplicate
+MIN_SHINGLES = 8
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)  # Fixed: signatures are stored in the corpus index
+_A = _rng.integers(1, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)[:, None]
+
+
+def fingerprint(text: str) -> str:
+    """Exact-duplicate key: sha256 of the text with whitespace runs collapsed."""
+    normalized = _WHITESPACE.sub(" ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """
+    MinHash signature over lowercase word 3-shingles, or None for very short text.
+
+    The share of equal values in two signatures estimates the Jaccard
+    similarity of the texts' shingle sets.
+    """
+    words = _WORD.findall(text.lower())
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(0, len(words) - 2))}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") for s in shingles],
+        dtype=np.uint64,
+    )
+    # One universal hash per permutation: (a*h + b) mod p, all < 2^63 so uint64 never overflows
+    return ((_A * hashes + _B) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(a == b))
+
+
+def _bands(signature: np.ndarray) -> List[int]:
+    # Each band of BAND_ROWS values hashed to a signed 64-bit key (fits a SQLite INTEGER)
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), "big", signed=True)
+        for band in signature.reshape(-1, BAND_ROWS)
+    ]
+
+
+class ChunkDeduplicator:
+    """
+    Collapses duplicate chunks before they are embedded.
+
+    Exact duplicates (same text up to whitespace) are always collapsed;
+    with near_duplicates=True, so are chunks whose estimated Jaccard
+    similarity to an earlier chunk (MinHash over word 3-shingles) is at
+    least threshold - repeated headers/footers and boilerplate pages with a
+    changed date or page number. The first occurrence is kept and records
+    the pages of the copies it replaced in duplicate_pages, so search
+    results still point at every location.
+
+    With a corpus-wide index (CHUNK_DEDUP_INDEX_PATH), chunks that match a
+    chunk of an earlier document reuse its stored embedding instead of being
+    embedded again. They are still upserted, since searches are per
+    namespace and each document's namespace must be complete.
+    """
+
+    def __init__(
+        self,
+        near_duplicates: bool = False,
+        threshold: float = 0.85,
+        index: Optional["DedupIndex"] = None,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.near_duplicates = near_duplicates
+        self.threshold = threshold
+        self.index = index
+
+    def dedupe(self, chunks: List[Chunk]) -> List[Chunk]:
+        """Unique chunks of one document, in order."""
+        return self.session().dedupe(chunks)
+
+    def session(self) -> "DedupSession":
+        """State for deduplicating one document that arrives in batches."""
+        return DedupSession(self)
+
+    def embed(
+        self, texts: List[str], generate: Callable[[List[str]], List[np.ndarray]], model: str
+    ) -> List[np.ndarray]:
+        """
+        Embeddings for texts, reusing corpus-wide duplicates from the index.
+
+        Only texts with no match are passed to generate; their embeddings
+        are then added to the index.
+        """
+        if self.index is None or not texts:
+            return generate(texts)
+
+        found = self.index.lookup(texts, model, self.threshold if self.near_duplicates else None)
+        missing = [i for i in range(len(texts)) if i not in found]
+        if missing:
+            vectors = generate([texts[i] for i in missing])
+            self.index.add([texts[i] for i in missing], vectors, model)
+            found.update(zip(missing, vectors))
+        return [found[i] for i in range(len(texts))]
+
+
+class DedupSession:
+    """
+    Duplicates seen so far in one document.
+
+    late holds chunks returned by an earlier dedupe() call that have since
+    gained duplicate pages - their stored metadata needs updating.
+    """
+
+    def __init__(self, deduplicator: ChunkDeduplicator):
+        self.deduplicator = deduplicator
+        self.skipped = 0
+        self.late: Dict[int, Chunk] = {}
+        self._exact: Dict[str, Chunk] = {}
+        self._bands: Dict[Tuple[int, int], List[Tuple[np.ndarray, Chunk]]] = {}
+        self._returned: Set[int] = set()
+
+    def dedupe(self, chunks: List[Chunk]) -> List[Chunk]:
+        unique = []
+        for chunk in chunks:
+            original = self._match(chunk)
+            if original is None:
+                unique.append(chunk)
+                continue
+
+            self.skipped += 1
+            page = chunk.page_number
+            if page != original.page_number and page not in (original.duplicate_pages or []):
+                original.duplicate_pages = (original.duplicate_pages or []) + [page]
+                if id(original) in self._returned:
+                    self.late[id(original)] = original
+
+        self._returned.update(id(chunk) for chunk in unique)
+        return unique
+
+    def _match(self, chunk: Chunk) -> Optional[Chunk]:
+        key = fingerprint(chunk.text)
+        if key in self._exact:
+            return self._exact[key]
+        original = self._match_near(chunk) if self.deduplicator.near_duplicates else None
+        # Later exact copies of a near-duplicate map straight to the chunk that was kept
+        self._exact[key] = original or chunk
+        return original
+
+    def _match_near(self, chunk: Chunk) -> Optional[Chunk]:
+        signature = minhash(chunk.text)
+        if signature is None:
+            return None
+
+        bands = list(enumerate(_bands(signature)))
+        for band in bands:
+            for candidate, original in self._bands.get(band, ()):
+                if similarity(candidate, signature) >= self.deduplicator.threshold:
+                    return original
+        for band in bands:
+            self._bands.setdefault(band, []).append((signature, chunk))
+        return None
+
+
+class DedupIndex(SQLiteStore):
+    """
+    Corpus-wide chunk fingerprints and their embeddings, in a SQLite file.
+
+    Keyed by fingerprint and embedding model (including dimensions), with
+    MinHash signatures and their LSH bands for near-duplicate lookups
+    across documents.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_fingerprints ("
+            "fingerprint TEXT NOT NULL, model TEXT NOT NULL, signature BLOB, vector BLOB NOT NULL, "
+            "PRIMARY KEY (fingerprint, model))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_bands ("
+            "model TEXT NOT NULL, band INTEGER NOT NULL, value INTEGER NOT NULL, fingerprint TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_bands ON chunk_bands (model, band, value)")
+        self._conn.commit()
+
+    def lookup(self, texts: List[str], model: str, threshold: Optional[float] = None) -> Dict[int, np.ndarray]:
+        """
+        Stored embeddings of texts seen before, by position in texts.
+
+        With threshold, texts with no exact match are matched to a stored
+        chunk with at least that estimated similarity.
+        """
+        keys = [fingerprint(text) for text in texts]
+        found: Dict[int, np.ndarray] = {}
+        with self._lock:
+            vectors: Dict[str, bytes] = dict(self._select_in(
+                "SELECT fingerprint, vector FROM chunk_fingerprints "
+                "WHERE model = ? AND fingerprint IN ({placeholders})",
+                keys, params=[model],
+            ))
+
+            for i, key in enumerate(keys):
+                if key in vectors:
+                    found[i] = np.frombuffer(vectors[key], dtype=np.float32)
+                elif threshold is not None:
+                    vector = self._nearest(texts[i], model, threshold)
+                    if vector is not None:
+                        found[i] = vector
+        return found
+
+    def _nearest(self, text: str, model: str, threshold: float) -> Optional[np.ndarray]:
+        # Caller holds lock
+        signature = minhash(text)
+        if signature is None:
+            return None
+        for band, value in enumerate(_bands(signature)):
+            for stored, vector in self._conn.execute(
+                "SELECT f.signature, f.vector FROM chunk_bands b JOIN chunk_fingerprints f "
+                "ON f.fingerprint = b.fingerprint AND f.model = b.model "
+                "WHERE b.model = ? AND b.band = ? AND b.value = ?",
+                (model, band, value),
+            ):
+                if similarity(np.frombuffer(stored, dtype=np.uint32), signature) >= threshold:
+                    return np.frombuffer(vector, dtype=np.float32)
+        return None
+
+    def add(self, texts: List[str], vectors: List[np.ndarray], model: str) -> None:
+        rows = []
+        for text, vector in zip(texts, vectors):
+            key = fingerprint(text)
+            signature = minhash(text)
+            bands = [] if signature is None else [
+                (model, band, value, key) for band, value in enumerate(_bands(signature))
+            ]
+            row = (
+                key, model,
+                None if signature is None else signature.tobytes(),
+                np.asarray(vector, dtype=np.float32).tobytes(),
+            )
+            rows.append((row, bands))
+        with self._lock:
+            for row, bands in rows:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO chunk_fingerprints (fingerprint, model, signature, vector) "
+                    "VALUES (?, ?, ?, ?)",
+                    row,
+                )
+                # Bands only for new fingerprints - a known one already has its bands
+                if cursor.rowcount == 1 and bands:
+                    self._conn.executemany(
+                        "INSERT INTO chunk_bands (model, band, value, fingerprint) VALUES (?, ?, ?, ?)", bands
+                    )
+            self._conn.commit()
+
+
+_deduplicator: Optional[ChunkDeduplicator] = None
+_deduplicator_lock = threading.Lock()
+
+
+def get_deduplicator() -> Optional[ChunkDeduplicator]:
+    """
+    Return the process-wide deduplicator, or None if disabled.
+
+    CHUNK_DEDUP=exact|near enables it (default off); CHUNK_DEDUP_THRESHOLD
+    sets the near-duplicate similarity and CHUNK_DEDUP_INDEX_PATH a SQLite
+    file for the corpus-wide index.
+    """
+    global _deduplicator
+    mode = os.getenv("CHUNK_DEDUP", "off").lower()
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"CHUNK_DEDUP must be one of {DEDUP_MODES}, got {mode!r}")
+    if mode == "off":
+        return None
+
+    with _deduplicator_lock:
+        if _deduplicator is None:
+            _deduplicator = ChunkDeduplicator(
+                near_duplicates=mode == "near",
+                threshold=float(os.getenv("CHUNK_DEDUP_THRESHOLD", "0.85")),
+                index=store_from_env("CHUNK_DEDUP_INDEX_PATH", DedupIndex),
+            )
+        return _deduplicator
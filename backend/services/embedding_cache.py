@@ -0,0 +1,153 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.sqlite_store import SQLiteStore, store_from_env
+
+
+class EmbeddingCache(SQLiteStore):
+    """
+    Content-addressed embedding cache.
+
+    Keys are SHA-256 hashes of (model, chunk text), so the same chunk is only
+    embedded once per model no matter which upload or namespace it came from.
+    Vectors are stored as float32 blobs in SQLite with an optional in-memory
+    LRU tier in front. The disk tier is bounded by max_entries and evicts the
+    least recently used rows.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1_000_000, memory_entries: int = 5000):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+        )
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        """Cache key for a chunk: sha256(model + NUL + text)."""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for texts.
+
+        Returns a list of float32 arrays aligned with texts; None marks a cache miss.
+        """
+        keys = [self.key(model, text) for text in texts]
+        found: Dict[str, bytes] = {}
+
+        with self._lock:
+            disk_keys = []
+            for key in keys:
+                blob = self._memory.get(key)
+                if blob is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = blob
+                else:
+                    disk_keys.append(key)
+
+            for key, blob in self._select_in(
+                "SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", disk_keys
+            ):
+                found[key] = blob
+                self._remember(key, blob)
+
+            # Touch disk rows so eviction keeps hot entries
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            results = [_decode(found[key]) if key in found else None for key in keys]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        return results
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[np.ndarray]) -> None:
+        """Store embeddings for texts, evicting least recently used rows if over capacity."""
+        now = time.time()
+        rows = [(self.key(model, text), _encode(embedding), now) for text, embedding in zip(texts, embeddings)]
+
+        with self._lock:
+            # Content-addressed: an existing key already holds the same vector
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            self._entries += max(cursor.rowcount, 0)
+            for key, blob, _ in rows:
+                self._remember(key, blob)
+
+            overflow = self._entries - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+                self._entries -= overflow
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size of each tier."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": self._entries,
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        # In-memory LRU tier (caller holds lock); stores packed bytes, not float lists
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+def _encode(embedding: np.ndarray) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def _decode(blob: bytes) -> np.ndarray:
+    # Read-only view over the blob - no copy, no per-value Python floats
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Return the process-wide embedding cache, or None if disabled.
+
+    Enabled by setting EMBEDDING_CACHE_PATH to a SQLite file path.
+    """
+    return store_from_env("EMBEDDING_CACHE_PATH", lambda path: EmbeddingCache(
+        path,
+        max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "1000000")),
+        memory_entries=int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "5000")),
+    ))
@@ -1,50 +1,136 @@
+import base64
+import hashlib
 import os
-from openai import OpenAI
-from typing import List
+import re
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+from typing import Callable, List, Optional, Tuple
 
+import numpy as np
 
-class EmbeddingService:
-    """Generate embeddings using OpenAI's text-embedding-3-small model."""
+from services.batching import make_batches
+from services.embedding_cache import EmbeddingCache, get_embedding_cache
+from services.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_REQUESTS, TOKENS_EMBEDDED
+from services.resilience import get_resilience
 
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
+try:
+    import tiktoken
+except ImportError:  # Optional - fall back to a conservative estimate
+    tiktoken = None
+
+
+# OpenAI embeddings API limits (per request)
+MAX_BATCH_INPUTS = 2048
+MAX_BATCH_TOKENS = 300_000
+
+# Native output size of text-embedding-3-small; smaller values are shortened by the API
+MAX_DIMENSIONS = 1536
+
+_WORD = re.compile(r"\w+")
 
-        self.client = OpenAI(api_key=api_key)
-        self.model = "text-embedding-3-small"
-        self.dimensions = 1536
 
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+class EmbeddingProvider(ABC):
+    """
+    Base interface for embedding backends.
+
+    Subclasses set model and dimensions and implement _embed_batch for one
+    request-sized batch; caching, batching under max_batch_inputs and
+    max_batch_tokens, concurrency (up to max_concurrency batches at once)
+    and progress callbacks are shared here.
+    """
+
+    model: str
+    dimensions: int
+    max_batch_inputs: int = MAX_BATCH_INPUTS
+    max_batch_tokens: int = MAX_BATCH_TOKENS
+    max_concurrency: int = 1
+    cache: Optional[EmbeddingCache] = None
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Estimate tokens for batching: ~3 bytes per token, which overestimates
+        English text and keeps batches under the cap.
+        """
+        return len(text.encode("utf-8")) // 3 + 1
+
+    def generate_embeddings(
+        self, texts: List[str], on_batch: Optional[Callable[[int], None]] = None
+    ) -> List[np.ndarray]:
         """
         Generate embeddings for a list of text chunks.
 
+        Cached chunks are served from the embedding cache; the rest are split
+        into batches under the provider's per-request input and token limits,
+        run concurrently (up to max_concurrency) and returned in input order.
+
         Args:
-            texts: List of text strings to embed (max 2048 per batch)
+            texts: List of text strings to embed (any length)
+            on_batch: Optional callback invoked as each batch completes,
+                with the number of texts embedded so far
 
         Returns:
-            List of embedding vectors (each is a list of 1536 floats)
+            List of embedding vectors (each a float32 array of `dimensions` values)
 
         Raises:
-            Exception: If OpenAI API call fails
+            Exception: If the provider fails to embed a batch
         """
         if not texts:
             return []
 
-        try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=texts
+        if self.cache is None:
+            return list(self._embed_uncached(texts, on_batch))
+
+        # Cache key includes dimensions so differently-sized vectors never mix
+        cache_model = f"{self.model}:{self.dimensions}"
+        embeddings = self.cache.get_many(cache_model, texts)
+
+        # Embed each missing text once, even if it repeats within the document
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        if missing:
+            # Cached texts count as already embedded
+            cached = len(texts) - len(missing)
+            fresh = self._embed_uncached(
+                missing, on_batch and (lambda done: on_batch(cached + done))
             )
+            self.cache.put_many(cache_model, missing, fresh)
+            by_text = dict(zip(missing, fresh))
+            embeddings = [
+                embedding if embedding is not None else by_text[text]
+                for text, embedding in zip(texts, embeddings)
+            ]
+
+        return embeddings
 
-            # Extract embeddings maintaining order
-            embeddings = [item.embedding for item in response.data]
+    def _embed_uncached(
+        self, texts: List[str], on_batch: Optional[Callable[[int], None]] = None
+    ) -> np.ndarray:
+        batches = make_batches(texts, self.count_tokens, self.max_batch_inputs, self.max_batch_tokens)
+        done = 0
+        lock = threading.Lock()
+
+        def embed(batch: Tuple[int, int]) -> np.ndarray:
+            nonlocal done
+            embeddings = self._embed_batch(texts[batch[0]:batch[1]])
+            if on_batch is not None:
+                with lock:
+                    done += len(embeddings)
+                    on_batch(done)
             return embeddings
 
-        except Exception as e:
-            raise Exception(f"Failed to generate embeddings: {str(e)}")
+        if len(batches) == 1:
+            return embed(batches[0])
+
+        # pool.map preserves batch order, so results line up with inputs
+        workers = min(self.max_concurrency, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return np.concatenate(list(pool.map(embed, batches)))
 
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text string.
 
@@ -52,7 +138,162 @@ class EmbeddingService:
             text: Text string to embed
 
         Returns:
-            Embedding vector (list of 1536 floats)
+            Embedding vector (float32 array of `dimensions` values)
         """
         embeddings = self.generate_embeddings([text])
         return embeddings[0]
+
+    @abstractmethod
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed one batch; returns a (len(texts), dimensions) float32 matrix."""
+        pass
+
+    def close(self) -> None:
+        """Release provider resources (connections, models)."""
+        pass
+
+
+class EmbeddingService(EmbeddingProvider):
+    """Generate embeddings using OpenAI's text-embedding-3-small model."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[EmbeddingCache] = None,
+        dimensions: Optional[int] = None,
+    ):
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable not set")
+
+        # Retries are handled by the shared resilience layer, not the SDK.
+        # Kept-alive pooled connections avoid a TLS handshake per request; the
+        # pool should cover EMBEDDING_MAX_CONCURRENCY x concurrent uploads.
+        max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+        self.client = OpenAI(
+            api_key=api_key,
+            max_retries=0,
+            http_client=DefaultHttpxClient(limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "60")),
+            )),
+        )
+        self.resilience = get_resilience("openai")
+        self.model = "text-embedding-3-small"
+
+        # Shortened embeddings (e.g. 512) cut storage and query cost with a small recall loss
+        self.dimensions = dimensions or int(os.getenv("EMBEDDING_DIMENSIONS", str(MAX_DIMENSIONS)))
+        if not 1 <= self.dimensions <= MAX_DIMENSIONS:
+            raise ValueError(
+                f"EMBEDDING_DIMENSIONS must be between 1 and {MAX_DIMENSIONS}, got {self.dimensions}"
+            )
+
+        # Max batches in flight at once when a document needs several requests
+        self.max_concurrency = max_concurrency or int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+
+        # Content-addressed cache (enabled via EMBEDDING_CACHE_PATH); skips re-embedding known chunks
+        self.cache = cache if cache is not None else get_embedding_cache()
+
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except Exception:
+                pass  # Encoding files unavailable (e.g. offline) - use the estimate
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count tokens for batching.
+
+        Uses tiktoken when installed; otherwise assumes ~3 bytes per token,
+        which overestimates English text and keeps batches under the cap.
+        """
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return super().count_tokens(text)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        # Vectors are fetched base64-encoded and decoded straight into float32
+        # arrays, so a 1536-dimension vector takes 6 KB instead of ~50 KB of
+        # boxed Python floats
+        try:
+            tokens = sum(self.count_tokens(text) for text in texts)
+
+            # Backoff on 429/5xx, OpenAI rate-limit buckets and circuit breaker
+            response = self.resilience.call(
+                self.client.embeddings.create,
+                model=self.model,
+                input=texts,
+                dimensions=self.dimensions,
+                encoding_format="base64",
+                cost=tokens,
+            )
+            EMBEDDING_REQUESTS.inc()
+            EMBEDDING_BATCH_SIZE.observe(len(texts))
+            TOKENS_EMBEDDED.inc(tokens)
+
+            # Decode into one (len(texts), dimensions) float32 matrix, placed by index
+            embeddings = None
+            for item in response.data:
+                vector = np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), len(vector)), dtype=np.float32)
+                embeddings[item.index] = vector
+            return embeddings
+
+        except Exception as e:
+            raise Exception(f"Failed to generate embeddings: {str(e)}")
+
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        self.client.close()
+
+
+class HashingEmbeddingService(EmbeddingProvider):
+    """
+    Deterministic, dependency-free embeddings from hashed word counts.
+
+    Each word is hashed to one of dimensions buckets with a random sign (the
+    hashing trick) and the vector is L2-normalized, so texts sharing words
+    score higher than unrelated ones. No network, no model and identical
+    output on every machine - for tests and offline development, not for
+    production search quality.
+    """
+
+    def __init__(self, dimensions: Optional[int] = None):
+        self.model = "hashing-v1"
+        self.dimensions = dimensions or int(os.getenv("EMBEDDING_DIMENSIONS", str(MAX_DIMENSIONS)))
+        if self.dimensions < 1:
+            raise ValueError(f"EMBEDDING_DIMENSIONS must be positive, got {self.dimensions}")
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+                embeddings[row, h % self.dimensions] += 1.0 if h >> 63 else -1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms == 0, 1, norms)
+
+
+def create_embedding_service(provider: Optional[str] = None) -> EmbeddingProvider:
+    """
+    Create the embedding provider selected by EMBEDDING_PROVIDER.
+
+    Supported providers: "openai" (default, text-embedding-3-small), "local"
+    (sentence-transformers model on CPU, see services.local_embeddings) and
+    "hashing" (deterministic, for tests and offline development).
+    """
+    provider = (provider or os.getenv("EMBEDDING_PROVIDER", "openai")).lower()
+
+    if provider == "openai":
+        return EmbeddingService()
+    if provider == "local":
+        # Imported here: it pulls in sentence-transformers/torch, only needed for this provider
+        from services.local_embeddings import LocalEmbeddingService
+        return LocalEmbeddingService()
+    if provider == "hashing":
+        return HashingEmbeddingService()
+
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider}")
@@ -0,0 +1,25 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+
+# Shared process pool for CPU-bound pipeline work (pypdf parsing, text splitting).
+# Created lazily so importing the app doesn't fork worker processes.
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process-wide pool for CPU-bound work (PDF_PROCESS_WORKERS sizes it)."""
+    global _process_pool
+    if _process_pool is None:
+        max_workers = int(os.getenv("PDF_PROCESS_WORKERS", "0")) or os.cpu_count() or 1
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+    return _process_pool
+
+
+def shutdown_executors() -> None:
+    """Shut down the shared pools (called from the app lifespan on exit)."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
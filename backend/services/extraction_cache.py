@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+import pypdf
+
+from services.sqlite_store import SQLiteStore, store_from_env
+
+
+# Part of every cache key - bump when extraction output changes (e.g. the
+# empty-page filter in PDFProcessor.iter_pages) so stale pages are never served.
+# Upgrading pypdf changes extract_text() output too, so its version is included.
+EXTRACTOR_VERSION = f"pypdf-{pypdf.__version__}/1"
+
+# Files are hashed in fixed-size blocks so memory stays constant
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ExtractionCache(SQLiteStore):
+    """
+    Content-addressed cache of extracted page text.
+
+    Keys are SHA-256 hashes of the PDF's bytes plus EXTRACTOR_VERSION, so a
+    retried upload, a re-upload of the same file under another name, or a
+    re-chunking run with different chunk settings skips pypdf entirely.
+    Pages are stored as zlib-compressed JSON in SQLite. The file is bounded
+    by max_bytes (compressed size) and evicts the least recently used
+    documents.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024 * 1024):
+        super().__init__(path)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extracted_pages ("
+            "key TEXT PRIMARY KEY, pages BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extracted_pages_last_access ON extracted_pages (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(pdf_path: str) -> str:
+        """Cache key for a file: sha256(file bytes) + NUL + EXTRACTOR_VERSION."""
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            while block := f.read(HASH_BLOCK_SIZE):
+                digest.update(block)
+        return f"{digest.hexdigest()}\0{EXTRACTOR_VERSION}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached pages for key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT pages FROM extracted_pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            # Touch the row so eviction keeps hot documents
+            self._conn.execute("UPDATE extracted_pages SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, pages: List[Dict[str, Any]]) -> None:
+        """Store pages for key, evicting least recently used documents if over max_bytes."""
+        blob = zlib.compress(json.dumps(pages).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return  # Would evict everything else and still not fit
+
+        with self._lock:
+            # The insert opens a write transaction, so the total below includes rows
+            # written by other processes sharing the file and can't change under us
+            self._conn.execute(
+                "INSERT OR IGNORE INTO extracted_pages (key, pages, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extracted_pages").fetchone()
+            while total > self.max_bytes:
+                row = self._conn.execute(
+                    "SELECT key, size FROM extracted_pages ORDER BY last_access LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._conn.execute("DELETE FROM extracted_pages WHERE key = ?", (row[0],))
+                total -= row[1]
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters (this process) and current size (the whole file)."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extracted_pages"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "bytes": size,
+            }
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    Return the process-wide extraction cache, or None if disabled.
+
+    Enabled by setting EXTRACTION_CACHE_PATH to a SQLite file path;
+    EXTRACTION_CACHE_MAX_MB bounds its size.
+    """
+    return store_from_env("EXTRACTION_CACHE_PATH", lambda path: ExtractionCache(
+        path, max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_MB", "1024")) * 1024 * 1024
+    ))
@@ -0,0 +1,962 @@
+import asyncio
+import functools
+import json
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+import uuid
+
+import numpy as np
+
+from services.chunk_store import ChunkStore, get_chunk_store
+from services.dedup import ChunkDeduplicator, get_deduplicator
+from services.pdf_processor import (
+    Chunk,
+    PDFProcessor,
+    chunk_pages,
+    count_pages,
+    extract_page_range,
+    extract_pages,
+)
+from services.embeddings import EmbeddingProvider, create_embedding_service
+from services.extraction_cache import get_extraction_cache
+from services.metrics import track_ingestion
+from services.search import invalidate_cached_results
+from services.versions import Position, VersionStore, content_ids, get_version_store
+from adapters import VectorDBAdapter, create_vector_adapter
+
+
+# Pipeline stages in execution order - used for per-stage progress reporting
+STAGES = ("extract", "chunk", "embed", "upsert")
+
+# Progress callback signature: on_progress(stage, status, details)
+ProgressCallback = Callable[[str, str, Dict[str, Any]], None]
+
+
+class EmptyDocumentError(ValueError):
+    """Raised when no text could be extracted from a PDF."""
+
+
+class ChunkedDocument:
+    """
+    A document already extracted and chunked, for IngestionPipeline.ingest_chunked.
+
+    source is the caller's handle for the document (e.g. a manifest key);
+    the pipeline never looks at it.
+    """
+
+    __slots__ = ("source", "filename", "namespace", "chunks", "embeddings", "remaining", "failed")
+
+    def __init__(self, source: Any, filename: str, namespace: str, chunks: List[Chunk]):
+        self.source = source
+        self.filename = filename
+        self.namespace = namespace
+        self.chunks = chunks
+        self.embeddings: List[Optional[np.ndarray]] = []
+        self.remaining = 0
+        self.failed = False
+
+
+# on_done(document, result, error) - exactly one of result and error is set
+DocumentCallback = Callable[[ChunkedDocument, Optional[Dict[str, Any]], Optional[str]], None]
+
+
+class Checkpoint:
+    """
+    Named blobs saved by ingest_resumable as each piece of work finishes.
+
+    Kept in memory here; the durable job queue stores them in SQLite so
+    they survive the worker process.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, bytes] = {}
+
+    def load(self, name: str) -> Optional[bytes]:
+        return self._data.get(name)
+
+    def save(self, name: str, data: bytes) -> None:
+        self._data[name] = data
+
+    def load_json(self, name: str) -> Any:
+        data = self.load(name)
+        return None if data is None else json.loads(data)
+
+    def save_json(self, name: str, value: Any) -> None:
+        self.save(name, json.dumps(value).encode("utf-8"))
+
+
+class IngestionPipeline:
+    """
+    Runs the 4-stage ingestion pipeline for a single PDF file.
+
+    PDF → Text Extraction → Chunking → Embeddings → Vector Storage
+
+    Shared by the upload endpoint and the background job workers so both
+    paths produce identical namespaces, IDs and metadata.
+
+    With streaming enabled (INGESTION_STREAMING=true), ingest_async parses
+    pages lazily and embeds/upserts chunks in rolling batches of
+    stream_batch_size, so peak memory no longer grows with document size.
+
+    With a chunk store (CHUNK_STORE_PATH), chunk text and document-level
+    fields are written there and vector metadata is kept compact.
+
+    With versioning enabled (INGESTION_VERSIONED=true), each filename has a
+    stable namespace and content-derived chunk IDs. Re-uploading a file
+    diffs it against the previous version: only new chunks are embedded and
+    upserted, moved chunks get a metadata update and removed chunks are
+    deleted. Versioned ingestion doesn't stream.
+
+    With deduplication enabled (CHUNK_DEDUP=exact|near), duplicate chunks
+    are collapsed after chunking, so each distinct text is embedded and
+    stored once and records the other pages it appeared on.
+
+    With an extraction cache (EXTRACTION_CACHE_PATH) on the PDF processor,
+    every ingestion path reuses the page text of a file extracted before.
+    """
+
+    def __init__(
+        self,
+        pdf_processor: PDFProcessor,
+        embedding_service: EmbeddingProvider,
+        vector_adapter: VectorDBAdapter,
+        streaming: Optional[bool] = None,
+        stream_batch_size: Optional[int] = None,
+        chunk_store: Optional[ChunkStore] = None,
+        versioned: Optional[bool] = None,
+        version_store: Optional[VersionStore] = None,
+        deduplicator: Optional[ChunkDeduplicator] = None,
+    ):
+        self.pdf_processor = pdf_processor
+        self.embedding_service = embedding_service
+        self.vector_adapter = vector_adapter
+        self.chunk_store = chunk_store if chunk_store is not None else get_chunk_store()
+        self.deduplicator = deduplicator if deduplicator is not None else get_deduplicator()
+
+        if versioned is None:
+            versioned = os.getenv("INGESTION_VERSIONED", "false").lower() == "true"
+        self.versioned = versioned
+        self._version_store = version_store
+
+        if streaming is None:
+            streaming = os.getenv("INGESTION_STREAMING", "false").lower() == "true"
+        self.streaming = streaming
+        self.stream_batch_size = stream_batch_size or int(os.getenv("INGESTION_STREAM_BATCH_SIZE", "256"))
+
+    def ingest(
+        self,
+        pdf_path: str,
+        filename: str,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingest a PDF file stored on disk.
+
+        Args:
+            pdf_path: Path to the PDF file
+            filename: Original filename (used for namespace and metadata)
+            on_progress: Optional callback invoked as each stage starts/completes
+
+        Returns:
+            Dict with filename, chunks_created, vectors_stored and namespace
+
+        Raises:
+            EmptyDocumentError: If no text could be extracted
+            Exception: If embedding or vector storage fails
+        """
+        # Stage timings, throughput and counters for /metrics
+        with track_ingestion(filename, on_progress) as report:
+            return self._ingest(pdf_path, filename, report)
+
+    def _ingest(self, pdf_path: str, filename: str, report: ProgressCallback) -> Dict[str, Any]:
+        # STEP 1: Extract text page-by-page
+        report("extract", "running", {})
+        pages_data = self.pdf_processor.extract_text_with_pages(pdf_path)
+        report("extract", "completed", {"pages_extracted": len(pages_data)})
+
+        # STEP 2: Split into ~1000 char chunks with 200 char overlap
+        report("chunk", "running", {})
+        chunks, dedup_details = self._dedupe(self.pdf_processor.chunk_text(pages_data))
+        report("chunk", "completed", {"chunks_created": len(chunks), **dedup_details})
+
+        if not chunks:
+            raise EmptyDocumentError(f"No text could be extracted from {filename}")
+
+        if self.versioned:
+            # Diff against the previous version - only changed chunks are embedded/stored
+            return {**self._store_versioned(chunks, filename, report), **dedup_details}
+
+        # STEP 3: Generate embeddings
+        # Batch process all chunks through OpenAI to get 1536-dimensional vectors
+        report("embed", "running", {})
+        chunk_texts = [chunk.text for chunk in chunks]
+        embeddings = self._embed(chunk_texts, self._batch_progress(report))
+        report("embed", "completed", {"embeddings_generated": len(embeddings)})
+
+        # STEP 4: Upsert to vector database
+        report("upsert", "running", {})
+        result = self._store(chunks, embeddings, filename)
+        report("upsert", "completed", {"vectors_stored": result["vectors_stored"]})
+
+        return {**result, **dedup_details}
+
+    async def ingest_async(
+        self,
+        pdf_path: str,
+        filename: str,
+        on_progress: Optional[ProgressCallback] = None,
+        process_pool: Optional[Executor] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingest a PDF without blocking the event loop.
+
+        Same stages and result as ingest(), but CPU-bound parsing and chunking
+        run in process_pool (or a thread if none is given) and the blocking
+        OpenAI/Pinecone SDK calls run in worker threads.
+        """
+        with track_ingestion(filename, on_progress) as report:
+            if self.streaming and not self.versioned:
+                return await self._ingest_streaming(pdf_path, filename, report)
+            return await self._ingest_async(pdf_path, filename, report, process_pool)
+
+    async def _ingest_async(
+        self,
+        pdf_path: str,
+        filename: str,
+        report: ProgressCallback,
+        process_pool: Optional[Executor] = None,
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+
+        # STEP 1: Extract text page-by-page (CPU-bound: pypdf), unless already cached
+        report("extract", "running", {})
+        cache = self.pdf_processor.extraction_cache
+        if cache is None:
+            pages_data = await self._extract_async(pdf_path, process_pool)
+        else:
+            cache_key = await asyncio.to_thread(cache.key, pdf_path)
+            pages_data = await asyncio.to_thread(cache.get, cache_key)
+            if pages_data is None:
+                pages_data = await self._extract_async(pdf_path, process_pool)
+                await asyncio.to_thread(cache.put, cache_key, pages_data)
+        report("extract", "completed", {"pages_extracted": len(pages_data)})
+
+        # STEP 2: Chunk (CPU-bound: text splitter)
+        report("chunk", "running", {})
+        chunks = await loop.run_in_executor(
+            process_pool,
+            chunk_pages,
+            pages_data,
+            self.pdf_processor.chunk_size,
+            self.pdf_processor.chunk_overlap,
+            self.pdf_processor.chunker,
+            self.pdf_processor.chunk_length,
+            self.pdf_processor.chunk_across_pages,
+        )
+        chunks, dedup_details = await asyncio.to_thread(self._dedupe, chunks)
+        report("chunk", "completed", {"chunks_created": len(chunks), **dedup_details})
+
+        if not chunks:
+            raise EmptyDocumentError(f"No text could be extracted from {filename}")
+
+        if self.versioned:
+            # Diff against the previous version - only changed chunks are embedded/stored
+            result = await asyncio.to_thread(self._store_versioned, chunks, filename, report)
+            return {**result, **dedup_details}
+
+        # STEP 3: Generate embeddings (I/O-bound: OpenAI SDK call in a thread)
+        report("embed", "running", {})
+        chunk_texts = [chunk.text for chunk in chunks]
+        embeddings = await asyncio.to_thread(self._embed, chunk_texts, self._batch_progress(report))
+        report("embed", "completed", {"embeddings_generated": len(embeddings)})
+
+        # STEP 4: Upsert to vector database (I/O-bound: Pinecone SDK call in a thread)
+        report("upsert", "running", {})
+        result = await asyncio.to_thread(self._store, chunks, embeddings, filename)
+        report("upsert", "completed", {"vectors_stored": result["vectors_stored"]})
+
+        return {**result, **dedup_details}
+
+    async def _extract_async(
+        self, pdf_path: str, process_pool: Optional[Executor]
+    ) -> List[Dict[str, Any]]:
+        # Large documents fan page ranges out across the pool; small ones use one worker
+        loop = asyncio.get_running_loop()
+        page_count = await asyncio.to_thread(count_pages, pdf_path)
+        ranges = self.pdf_processor.page_ranges(page_count)
+        if len(ranges) > 1:
+            page_batches = await asyncio.gather(*(
+                loop.run_in_executor(process_pool, extract_page_range, pdf_path, start, end)
+                for start, end in ranges
+            ))
+            return [page for pages in page_batches for page in pages]
+        return await loop.run_in_executor(process_pool, extract_pages, pdf_path)
+
+    async def _ingest_streaming(
+        self,
+        pdf_path: str,
+        filename: str,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Streaming variant of ingest_async.
+
+        A producer thread parses pages lazily and chunks them incrementally,
+        handing off batches through a small bounded queue. The event loop
+        embeds and upserts each batch as it arrives, so embedding starts
+        while later pages are still being parsed and at most a few batches
+        are held in memory. total_chunks is omitted from metadata because it
+        isn't known until the last page.
+        """
+        report = on_progress or (lambda stage, status, details: None)
+        namespace = f"{filename}-{uuid.uuid4().hex[:8]}"
+        upload_timestamp = datetime.now(timezone.utc).isoformat()
+
+        # maxsize gives backpressure: parsing pauses while two batches are waiting
+        batches: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        pages_extracted = 0
+
+        def put(item: Any) -> None:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def take() -> Any:
+            # Polls so the thread returns once the consumer is cancelled and stop is set
+            while not stop.is_set():
+                try:
+                    return batches.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return None
+
+        def track_pages(pages, extracted):
+            nonlocal pages_extracted
+            for page in pages:
+                pages_extracted += 1
+                if extracted is not None:
+                    extracted.append(page)
+                yield page
+
+        def produce() -> None:
+            try:
+                # Cached pages replace parsing; on a miss the page text (small next to
+                # the chunks and embeddings in flight) is kept to fill the cache
+                cache = self.pdf_processor.extraction_cache
+                cache_key = cached = extracted = None
+                if cache is not None:
+                    cache_key = cache.key(pdf_path)
+                    cached = cache.get(cache_key)
+                    extracted = [] if cached is None else None
+                source = cached if cached is not None else self.pdf_processor.iter_pages(pdf_path)
+                pages = track_pages(source, extracted)
+                batch = []
+                for chunk in self.pdf_processor.iter_chunks(pages):
+                    if stop.is_set():
+                        return  # Consumer failed - stop parsing
+                    batch.append(chunk)
+                    if len(batch) >= self.stream_batch_size:
+                        put(batch)
+                        batch = []
+                put(batch)
+                if extracted is not None:
+                    cache.put(cache_key, extracted)
+                put(None)  # End of document
+            except Exception as e:
+                put(e)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        chunks_created = 0
+        vectors_stored = 0
+        dedup = self.deduplicator.session() if self.deduplicator is not None else None
+        for stage in STAGES:
+            report(stage, "running", {})
+
+        try:
+            while True:
+                batch = await asyncio.to_thread(take)
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                if dedup is not None:
+                    batch = dedup.dedupe(batch)
+                if not batch:
+                    continue
+
+                chunks_created += len(batch)
+                report("extract", "running", {"pages_extracted": pages_extracted})
+                report("chunk", "running", {"chunks_created": chunks_created})
+
+                embeddings = await asyncio.to_thread(self._embed, [chunk.text for chunk in batch])
+                report("embed", "running", {"embeddings_generated": chunks_created})
+
+                ids, metadata_list = build_metadata(
+                    batch, filename, namespace, upload_timestamp=upload_timestamp,
+                    include_total_chunks=False, compact=self.chunk_store is not None
+                )
+                if self.chunk_store is not None:
+                    await asyncio.to_thread(
+                        self.chunk_store.put_chunks, namespace, ids, [chunk.text for chunk in batch]
+                    )
+                vectors_stored += await asyncio.to_thread(
+                    upsert_vectors, self.vector_adapter, embeddings, metadata_list, namespace, ids
+                )
+                report("upsert", "running", {"vectors_stored": vectors_stored})
+        finally:
+            stop.set()
+
+        if chunks_created == 0:
+            raise EmptyDocumentError(f"No text could be extracted from {filename}")
+
+        dedup_details = {}
+        if dedup is not None:
+            dedup_details["duplicates_skipped"] = dedup.skipped
+            if dedup.late:
+                # Duplicates found after their original was upserted - record their pages now
+                late = list(dedup.late.values())
+                await asyncio.to_thread(
+                    self.vector_adapter.update_metadata,
+                    [f"{namespace}-chunk-{chunk.chunk_index}" for chunk in late],
+                    [{"duplicate_pages": _page_list(chunk.duplicate_pages)} for chunk in late],
+                    namespace,
+                )
+
+        if self.chunk_store is not None:
+            await asyncio.to_thread(
+                self.chunk_store.put_document, namespace, filename, upload_timestamp, chunks_created
+            )
+
+        report("extract", "completed", {"pages_extracted": pages_extracted})
+        report("chunk", "completed", {"chunks_created": chunks_created, **dedup_details})
+        report("embed", "completed", {"embeddings_generated": chunks_created})
+        report("upsert", "completed", {"vectors_stored": vectors_stored})
+
+        return {
+            "filename": filename,
+            "chunks_created": chunks_created,
+            "vectors_stored": vectors_stored,
+            "namespace": namespace,
+            **dedup_details,
+        }
+
+    def ingest_resumable(
+        self,
+        pdf_path: str,
+        filename: str,
+        checkpoint: Checkpoint,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingest a PDF, saving each stage's output to checkpoint as it completes.
+
+        Extracted pages, chunks, and each batch of embeddings
+        (stream_batch_size chunks) are saved as they are produced, and each
+        upserted batch is recorded. Run again with the same checkpoint after a
+        crash and finished work is loaded instead of redone: no page is
+        re-parsed and no batch re-embedded. The namespace and vector IDs are
+        saved too, so a batch upserted just before the crash is overwritten,
+        not duplicated. Versioned pipelines resume from the chunk checkpoint.
+
+        Stages report "resumed": True when their output came from the checkpoint.
+        """
+        with track_ingestion(filename, on_progress) as report:
+            return self._ingest_resumable(pdf_path, filename, checkpoint, report)
+
+    def _ingest_resumable(
+        self, pdf_path: str, filename: str, checkpoint: Checkpoint, report: ProgressCallback
+    ) -> Dict[str, Any]:
+        # STEP 1: Extract text page-by-page
+        report("extract", "running", {})
+        pages_data = checkpoint.load_json("pages")
+        resumed = pages_data is not None
+        if not resumed:
+            pages_data = self.pdf_processor.extract_text_with_pages(pdf_path)
+            checkpoint.save_json("pages", pages_data)
+        report("extract", "completed", {"pages_extracted": len(pages_data), "resumed": resumed})
+
+        # STEP 2: Chunk
+        report("chunk", "running", {})
+        records = checkpoint.load_json("chunks")
+        resumed = records is not None
+        if not resumed:
+            records = [
+                [chunk.page_number, chunk.chunk_index, chunk.text, chunk.page_end]
+                for chunk in self.pdf_processor.chunk_text(pages_data)
+            ]
+            checkpoint.save_json("chunks", records)
+        # Deduplication is deterministic, so a resumed job gets the same batches
+        chunks, dedup_details = self._dedupe([Chunk(*record) for record in records])
+        report("chunk", "completed", {"chunks_created": len(chunks), "resumed": resumed, **dedup_details})
+
+        if not chunks:
+            raise EmptyDocumentError(f"No text could be extracted from {filename}")
+
+        if self.versioned:
+            # Diff against the previous version - only changed chunks are embedded/stored
+            return {**self._store_versioned(chunks, filename, report), **dedup_details}
+
+        # Fixed on first run so a resumed job writes the same vector IDs
+        document = checkpoint.load_json("document")
+        if document is None:
+            document = {
+                "namespace": f"{filename}-{uuid.uuid4().hex[:8]}",
+                "upload_timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+            checkpoint.save_json("document", document)
+        namespace = document["namespace"]
+
+        ids, metadata_list = build_metadata(
+            chunks, filename, namespace, upload_timestamp=document["upload_timestamp"],
+            compact=self.chunk_store is not None
+        )
+        batches = [
+            range(start, min(start + self.stream_batch_size, len(chunks)))
+            for start in range(0, len(chunks), self.stream_batch_size)
+        ]
+
+        # STEP 3: Generate embeddings, one checkpointed batch at a time
+        report("embed", "running", {})
+        embeddings: List[np.ndarray] = []
+        resumed_batches = 0
+        for i, batch in enumerate(batches):
+            data = checkpoint.load(f"embeddings/{i}")
+            if data is not None:
+                embeddings.extend(np.frombuffer(data, dtype=np.float32).reshape(len(batch), -1))
+                resumed_batches += 1
+                continue
+            vectors = self._embed([chunks[j].text for j in batch])
+            checkpoint.save(f"embeddings/{i}", np.asarray(vectors, dtype=np.float32).tobytes())
+            embeddings.extend(vectors)
+            report("embed", "running", {"embeddings_generated": batch.stop})
+        report("embed", "completed", {
+            "embeddings_generated": len(embeddings), "batches_resumed": resumed_batches
+        })
+
+        # STEP 4: Upsert each batch not already recorded as stored
+        report("upsert", "running", {})
+        vectors_stored = 0
+        resumed_batches = 0
+        for i, batch in enumerate(batches):
+            stored = checkpoint.load_json(f"upserted/{i}")
+            if stored is not None:
+                vectors_stored += stored
+                resumed_batches += 1
+                continue
+            batch_ids = [ids[j] for j in batch]
+            if self.chunk_store is not None:
+                self.chunk_store.put_chunks(namespace, batch_ids, [chunks[j].text for j in batch])
+            stored = upsert_vectors(
+                self.vector_adapter, [embeddings[j] for j in batch],
+                [metadata_list[j] for j in batch], namespace, batch_ids
+            )
+            checkpoint.save_json(f"upserted/{i}", stored)
+            vectors_stored += stored
+            report("upsert", "running", {"vectors_stored": vectors_stored})
+
+        if self.chunk_store is not None:
+            self.chunk_store.put_document(namespace, filename, document["upload_timestamp"], len(chunks))
+        report("upsert", "completed", {"vectors_stored": vectors_stored, "batches_resumed": resumed_batches})
+
+        return {
+            "filename": filename,
+            "chunks_created": len(chunks),
+            "vectors_stored": vectors_stored,
+            "namespace": namespace,
+            **dedup_details,
+        }
+
+    def ingest_chunked(
+        self,
+        documents: Iterable[ChunkedDocument],
+        on_done: DocumentCallback,
+        pack_size: Optional[int] = None,
+    ) -> None:
+        """
+        Embed and store already-chunked documents, packing chunks across documents.
+
+        Chunks are queued in document order and embedded in packs of
+        pack_size (default: the provider's max_batch_inputs) regardless of
+        document boundaries, so many small documents still send full
+        embedding requests. Up to the provider's max_concurrency packs are
+        embedded at once, and a document is stored (chunk store and vector
+        upsert, as ingest() does) on a separate thread as soon as its last
+        chunk is embedded, while later packs are still embedding.
+
+        documents is consumed lazily, so it can still be producing (e.g.
+        parsing PDFs) while earlier documents embed. on_done is called from
+        the calling thread once per document. Versioned ingestion isn't
+        supported - each document is stored in the namespace it names.
+        """
+        if self.versioned:
+            raise ValueError("ingest_chunked doesn't support INGESTION_VERSIONED=true")
+        pack_size = pack_size or self.embedding_service.max_batch_inputs
+        concurrency = max(1, self.embedding_service.max_concurrency)
+
+        queued: List[Tuple[ChunkedDocument, int]] = []  # (document, chunk position) awaiting embedding
+        embedding: Deque[Tuple[Future, List[Tuple[ChunkedDocument, int]]]] = deque()
+        storing: Dict[Future, ChunkedDocument] = {}
+
+        def fail(document: ChunkedDocument, error: str) -> None:
+            # Chunks still queued for a failed document are dropped from later packs
+            if not document.failed:
+                document.failed = True
+                on_done(document, None, error)
+
+        def finish_stores(block: bool) -> None:
+            done, _ = wait(storing, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in done:
+                document = storing.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    fail(document, f"Upsert failed: {e}")
+                    continue
+                document.chunks = document.embeddings = []  # Release memory as soon as stored
+                on_done(document, result, None)
+
+        def finish_oldest_pack() -> None:
+            # Packs complete in submission order, so documents complete in order too
+            future, pack = embedding.popleft()
+            try:
+                vectors = future.result()
+            except Exception as e:
+                for document in {id(document): document for document, _ in pack}.values():
+                    fail(document, f"Embedding failed: {e}")
+                return
+            for (document, i), vector in zip(pack, vectors):
+                if document.failed:
+                    continue
+                document.embeddings[i] = vector
+                document.remaining -= 1
+                if document.remaining == 0:
+                    storing[store_pool.submit(
+                        self._store, document.chunks, document.embeddings, document.filename, document.namespace
+                    )] = document
+
+        def submit_pack() -> None:
+            pack = [(document, i) for document, i in queued[:pack_size] if not document.failed]
+            del queued[:pack_size]
+            if not pack:
+                return
+            while len(embedding) >= concurrency:
+                finish_oldest_pack()
+            embedding.append((embed_pool.submit(self._embed, [document.chunks[i].text for document, i in pack]), pack))
+
+        with ThreadPoolExecutor(concurrency) as embed_pool, ThreadPoolExecutor(concurrency) as store_pool:
+            for document in documents:
+                document.chunks, _ = self._dedupe(document.chunks)
+                if not document.chunks:
+                    fail(document, f"No text could be extracted from {document.filename}")
+                    continue
+                document.embeddings = [None] * len(document.chunks)
+                document.remaining = len(document.chunks)
+                queued.extend((document, i) for i in range(len(document.chunks)))
+
+                while len(queued) >= pack_size:
+                    submit_pack()
+                while embedding and embedding[0][0].done():
+                    finish_oldest_pack()
+                if storing:
+                    finish_stores(block=False)
+                # Bound the embeddings held for documents waiting to be stored
+                while len(storing) > concurrency * 2:
+                    finish_stores(block=True)
+
+            while queued:
+                submit_pack()
+            while embedding:
+                finish_oldest_pack()
+            while storing:
+                finish_stores(block=True)
+
+    def _dedupe(self, chunks: List[Chunk]) -> Tuple[List[Chunk], Dict[str, Any]]:
+        """Collapse duplicate chunks; returns the chunks to embed and details for progress/results."""
+        if self.deduplicator is None:
+            return chunks, {}
+        unique = self.deduplicator.dedupe(chunks)
+        return unique, {"duplicates_skipped": len(chunks) - len(unique)}
+
+    def _embed(
+        self, texts: List[str], on_batch: Optional[Callable[[int], None]] = None
+    ) -> List[np.ndarray]:
+        generate = self.embedding_service.generate_embeddings
+        if on_batch is not None:
+            generate = functools.partial(generate, on_batch=on_batch)
+        if self.deduplicator is None:
+            return generate(texts)
+        # Corpus-wide duplicates reuse stored embeddings; the key includes dimensions
+        model = f"{self.embedding_service.model}:{self.embedding_service.dimensions}"
+        return self.deduplicator.embed(texts, generate, model)
+
+    @staticmethod
+    def _batch_progress(report: ProgressCallback) -> Callable[[int], None]:
+        # Embedding API batches finish in worker threads; each reports the running total
+        return lambda done: report("embed", "running", {"embeddings_generated": done})
+
+    def _store(
+        self,
+        chunks: List[Chunk],
+        embeddings: List[np.ndarray],
+        filename: str,
+        namespace: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        # Namespace format: filename-uuid ensures uniqueness for re-uploads
+        namespace = namespace or f"{filename}-{uuid.uuid4().hex[:8]}"
+        upload_timestamp = datetime.now(timezone.utc).isoformat()
+        ids, metadata_list = build_metadata(
+            chunks, filename, namespace, upload_timestamp=upload_timestamp,
+            compact=self.chunk_store is not None
+        )
+
+        # Text goes in before the vectors so every searchable vector can be rehydrated
+        if self.chunk_store is not None:
+            self.chunk_store.put_chunks(namespace, ids, [chunk.text for chunk in chunks])
+            self.chunk_store.put_document(namespace, filename, upload_timestamp, len(chunks))
+
+        # Uses adapter pattern - swap Pinecone for Chroma/Supabase by changing VECTOR_DB_PROVIDER env var
+        upserted_count = upsert_vectors(self.vector_adapter, embeddings, metadata_list, namespace, ids)
+
+        return {
+            "filename": filename,
+            "chunks_created": len(chunks),
+            "vectors_stored": upserted_count,
+            "namespace": namespace,
+        }
+
+    @property
+    def version_store(self) -> VersionStore:
+        # Opened lazily so non-versioned pipelines never create the SQLite file
+        if self._version_store is None:
+            self._version_store = get_version_store()
+        return self._version_store
+
+    def _store_versioned(
+        self, chunks: List[Chunk], filename: str, report: ProgressCallback
+    ) -> Dict[str, Any]:
+        # Stable namespace per filename, so every version lands in the same place
+        namespace = filename
+        upload_timestamp = datetime.now(timezone.utc).isoformat()
+        texts = [chunk.text for chunk in chunks]
+        ids = content_ids(namespace, texts)
+
+        # total_chunks is left out so unchanged chunks never need a metadata update
+        _, metadata_list = build_metadata(
+            chunks, filename, namespace, upload_timestamp=upload_timestamp,
+            include_total_chunks=False, compact=self.chunk_store is not None
+        )
+        positions = {vector_id: chunk_position(chunk) for vector_id, chunk in zip(ids, chunks)}
+
+        with self.version_store.namespace_lock(namespace):
+            version, previous = self.version_store.get(namespace)
+
+            added = [i for i, vector_id in enumerate(ids) if vector_id not in previous]
+            moved = [
+                i for i, vector_id in enumerate(ids)
+                if vector_id in previous and previous[vector_id] != positions[vector_id]
+            ]
+            removed = [vector_id for vector_id in previous if vector_id not in positions]
+
+            # Metadata updates merge fields, so a moved chunk that lost its page_end or
+            # duplicate_pages can't be fixed in place - it's re-upserted with fresh metadata
+            rewritten = {i for i in moved if _drops_position_field(previous[ids[i]], positions[ids[i]])}
+            updated = [i for i in moved if i not in rewritten]
+            upserted = added + sorted(rewritten)
+
+            # STEP 3: Embed only chunks that didn't exist in the previous version
+            report("embed", "running", {})
+            embeddings = self._embed([texts[i] for i in upserted])
+            report("embed", "completed", {"embeddings_generated": len(upserted)})
+
+            # STEP 4: Upsert new chunks, re-position moved ones, delete removed ones
+            report("upsert", "running", {})
+            if self.chunk_store is not None:
+                self.chunk_store.put_chunks(namespace, [ids[i] for i in added], [texts[i] for i in added])
+
+            vectors_stored = 0
+            if upserted:
+                vectors_stored = upsert_vectors(
+                    self.vector_adapter, embeddings, [metadata_list[i] for i in upserted], namespace,
+                    [ids[i] for i in upserted]
+                )
+            if updated:
+                self.vector_adapter.update_metadata(
+                    [ids[i] for i in updated],
+                    [{field: metadata_list[i][field] for field in POSITION_FIELDS if field in metadata_list[i]}
+                     for i in updated],
+                    namespace,
+                )
+            if removed:
+                self.vector_adapter.delete(removed, namespace)
+                if self.chunk_store is not None:
+                    self.chunk_store.delete_chunks(removed)
+
+            # Manifest is only advanced once the vector database reflects the new version
+            self.version_store.replace(namespace, version + 1, positions)
+            if self.chunk_store is not None:
+                self.chunk_store.put_document(namespace, filename, upload_timestamp, len(chunks))
+
+        invalidate_cached_results(namespace)
+        report("upsert", "completed", {"vectors_stored": vectors_stored})
+
+        return {
+            "filename": filename,
+            "chunks_created": len(chunks),
+            "vectors_stored": vectors_stored,
+            "namespace": namespace,
+            "version": version + 1,
+            "chunks_added": len(added),
+            "chunks_moved": len(moved),
+            "chunks_removed": len(removed),
+            "chunks_unchanged": len(chunks) - len(added) - len(moved),
+        }
+
+
+# Metadata fields that change when a chunk moves within its document
+POSITION_FIELDS = ("page_number", "chunk_index", "page_end", "duplicate_pages")
+
+
+def chunk_position(chunk: Chunk) -> Position:
+    """A chunk's position for the version manifest (see services.versions.Position)."""
+    return (
+        chunk.page_number,
+        chunk.chunk_index,
+        chunk.page_end,
+        ",".join(str(page) for page in chunk.duplicate_pages or []),
+    )
+
+
+def _drops_position_field(previous: Position, current: Position) -> bool:
+    # page_end or duplicate_pages was set in the stored metadata and isn't any more
+    return (previous[2] is not None and current[2] is None) or (bool(previous[3]) and not current[3])
+
+
+def build_metadata(
+    chunks: List[Chunk],
+    filename: str,
+    namespace: str,
+    upload_timestamp: Optional[str] = None,
+    include_total_chunks: bool = True,
+    compact: bool = False,
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Build vector IDs and metadata for a document's chunks.
+
+    IDs come from each chunk's document-wide chunk_index, so batches of the
+    same document can be built independently. Streaming batches pass
+    include_total_chunks=False since the total isn't known yet.
+
+    compact=True keeps only the filterable fields (filename, page_number,
+    chunk_index); text and document-level fields live in the chunk store.
+
+    Returns (ids, metadata_list) aligned with the chunks list.
+    """
+    upload_timestamp = upload_timestamp or datetime.now(timezone.utc).isoformat()
+
+    ids = []
+    metadata_list = []
+
+    for chunk in chunks:
+        ids.append(f"{namespace}-chunk-{chunk.chunk_index}")
+
+        metadata = {
+            "filename": filename,
+            "page_number": chunk.page_number,
+            "chunk_index": chunk.chunk_index,
+        }
+        if chunk.page_end is not None:
+            metadata["page_end"] = chunk.page_end  # Chunk spans pages page_number..page_end
+        if chunk.duplicate_pages:
+            metadata["duplicate_pages"] = _page_list(chunk.duplicate_pages)  # Same text also on these pages
+        if compact:
+            metadata_list.append(metadata)
+            continue
+
+        # Store rich metadata for future retrieval/filtering
+        metadata["upload_timestamp"] = upload_timestamp
+        metadata["text"] = chunk.text  # Store original text for display in search results
+        if include_total_chunks:
+            metadata["total_chunks"] = len(chunks)
+        metadata_list.append(metadata)
+
+    return ids, metadata_list
+
+
+def _page_list(pages: List[int]) -> List[str]:
+    # Pinecone metadata lists must hold strings
+    return [str(page) for page in pages]
+
+
+def upsert_vectors(
+    vector_adapter: VectorDBAdapter,
+    vectors: List[np.ndarray],
+    metadata: List[Dict[str, Any]],
+    namespace: str,
+    ids: List[str],
+) -> int:
+    """
+    Upsert vectors, re-sending only the batches the adapter reports as failed.
+
+    Returns the number of vectors stored.
+
+    Raises:
+        Exception: If any batch still fails after one retry
+    """
+    result = vector_adapter.upsert(vectors=vectors, metadata=metadata, namespace=namespace, ids=ids)
+    upserted_count = result["upserted_count"]
+
+    failed_ids = {
+        vector_id for batch in result.get("failed_batches", []) for vector_id in batch["ids"]
+    }
+    if not failed_ids:
+        return upserted_count
+
+    retry = [i for i, vector_id in enumerate(ids) if vector_id in failed_ids]
+    result = vector_adapter.upsert(
+        vectors=[vectors[i] for i in retry],
+        metadata=[metadata[i] for i in retry],
+        namespace=namespace,
+        ids=[ids[i] for i in retry],
+    )
+    upserted_count += result["upserted_count"]
+
+    failed_batches = result.get("failed_batches", [])
+    if failed_batches:
+        failed_count = sum(len(batch["ids"]) for batch in failed_batches)
+        raise Exception(
+            f"Upsert failed for {failed_count} vectors in {namespace}: {failed_batches[0]['error']}"
+        )
+
+    return upserted_count
+
+
+def create_pipeline(
+    embedding_service: Optional[EmbeddingProvider] = None,
+    vector_adapter: Optional[VectorDBAdapter] = None,
+) -> IngestionPipeline:
+    """
+    Build a pipeline, creating default services for any not given.
+
+    The embedding provider comes from EMBEDDING_PROVIDER. Fails fast if API
+    keys are missing or the provider's dimensions don't match the vector index.
+    """
+    embedding_service = embedding_service or create_embedding_service()
+    vector_adapter = vector_adapter or create_vector_adapter()
+    vector_adapter.check_dimensions(embedding_service.dimensions)
+
+    return IngestionPipeline(
+        pdf_processor=PDFProcessor(extraction_cache=get_extraction_cache()),
+        embedding_service=embedding_service,
+        vector_adapter=vector_adapter,
+    )
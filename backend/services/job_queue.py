@@ -0,0 +1,301 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from services.ingestion import Checkpoint
+from services.jobs import Job, QueueFullError
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class LeaseLostError(Exception):
+    """Raised in a worker whose lease on its job expired and may have been claimed by another worker."""
+
+
+class JobQueue:
+    """
+    Durable ingestion queue in a SQLite file, shared by the API and worker processes.
+
+    submit() moves the uploaded PDF into spool_dir and records the job, so
+    neither survives only in the API process. Workers (python -m worker)
+    claim jobs with a lease they renew while running; a job whose worker
+    dies is claimed again once the lease expires, up to max_attempts times.
+    Stage progress and checkpoints (pages, chunks, embedding batches,
+    upserted batches) are written to the same file, so the next worker
+    resumes where the last one stopped. Checkpoints and the spooled PDF are
+    deleted when the job finishes.
+
+    Has the same submit/get/start/stop interface as JobManager, so the
+    upload and job status routes work with either.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        spool_dir: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        max_retained_jobs: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.spool_dir = spool_dir or os.getenv("INGESTION_SPOOL_DIR", "./ingestion_spool")
+        self.lease_seconds = lease_seconds or float(os.getenv("INGESTION_JOB_LEASE_SECONDS", "60"))
+        self.max_attempts = max_attempts or int(os.getenv("INGESTION_JOB_MAX_ATTEMPTS", "3"))
+        self.max_queue_size = max_queue_size or int(os.getenv("INGESTION_QUEUE_SIZE", "100"))
+        self.max_retained_jobs = max_retained_jobs or int(
+            os.getenv("INGESTION_MAX_RETAINED_JOBS", "1000")
+        )
+        self.clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+        # Autocommit: each statement is its own transaction, and the claim is
+        # a single UPDATE ... RETURNING so two workers never get the same job.
+        # Shared across threads of this process; access is serialized by _lock.
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, filename TEXT NOT NULL, pdf_path TEXT NOT NULL, "
+            "status TEXT NOT NULL, stages TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at TEXT NOT NULL, started_at TEXT, finished_at TEXT, "
+            "worker_id TEXT, lease_expires_at REAL, attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "job_id TEXT NOT NULL, name TEXT NOT NULL, data BLOB NOT NULL, "
+            "PRIMARY KEY (job_id, name))"
+        )
+
+    def start(self) -> None:
+        """Nothing to start - jobs run in worker processes."""
+
+    async def stop(self) -> None:
+        """Nothing to stop - queued and running jobs stay in the queue for the workers."""
+
+    def submit(self, pdf_path: str, filename: str) -> Job:
+        """
+        Queue a PDF for ingestion. Takes ownership of pdf_path (moved into the spool directory).
+
+        Raises:
+            QueueFullError: If max_queue_size jobs are already waiting
+        """
+        with self._lock:
+            (queued,) = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+            ).fetchone()
+        if queued >= self.max_queue_size:
+            raise QueueFullError(
+                f"Ingestion queue is full ({self.max_queue_size} jobs). Try again later."
+            )
+
+        job = Job(filename=filename, pdf_path=pdf_path)
+        job.pdf_path = shutil.move(pdf_path, os.path.join(self.spool_dir, f"{job.id}.pdf"))
+
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, filename, pdf_path, status, stages, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job.id, job.filename, job.pdf_path, job.status, json.dumps(job.stages), job.created_at),
+                )
+        except Exception:
+            # No job row points at the spooled file, so nothing else would remove it
+            os.unlink(job.pdf_path)
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's state (same shape as JobManager.get), or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, filename, status, stages, result, error, created_at, started_at, "
+                "finished_at, attempts FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "filename": row[1],
+            "status": row[2],
+            "stages": json.loads(row[3]),
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8],
+            "attempts": row[9],
+        }
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest runnable job to worker_id: a queued job, or a running
+        one whose lease has expired. Returns job_id, filename, pdf_path and
+        attempts, or None if there is nothing to do.
+        """
+        now = self.clock()
+        with self._lock:
+            # Jobs whose workers died too many times aren't retried again
+            abandoned = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            ).fetchall()
+        for (job_id,) in abandoned:
+            self._finish(job_id, "failed", error=f"Worker stopped responding ({self.max_attempts} attempts)")
+
+        with self._lock:
+            row = self._conn.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1, started_at = COALESCE(started_at, ?) "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_expires_at < ? AND attempts < ?) "
+                "ORDER BY created_at LIMIT 1) "
+                "RETURNING id, filename, pdf_path, attempts",
+                (worker_id, now + self.lease_seconds, _now(), now, self.max_attempts),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"job_id": row[0], "filename": row[1], "pdf_path": row[2], "attempts": row[3]}
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Renew worker_id's lease on a running job; False if the lease was lost."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (self.clock() + self.lease_seconds, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def update_stage(self, job_id: str, stage: str, status: str, details: Dict[str, Any]) -> None:
+        """Record a progress report (a ProgressCallback bound to job_id)."""
+        with self._lock:
+            row = self._conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row[0])
+            stages[stage].update(details, status=status)
+            self._conn.execute(
+                "UPDATE jobs SET stages = ? WHERE id = ?", (json.dumps(stages), job_id)
+            )
+
+    def checkpoint(self, job_id: str) -> "JobCheckpoint":
+        return JobCheckpoint(self, job_id)
+
+    def complete(self, job_id: str, result: Dict[str, Any], worker_id: Optional[str] = None) -> None:
+        """Record a job's result. With worker_id, only if that worker still holds the lease."""
+        self._finish(job_id, "succeeded", result=result, worker_id=worker_id)
+
+    def fail(self, job_id: str, error: str, retry: bool = True, worker_id: Optional[str] = None) -> None:
+        """
+        Record a failed attempt. With retry, the job is queued again (keeping
+        its checkpoints) until it has been attempted max_attempts times.
+        With worker_id, nothing is recorded unless that worker still holds the lease.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None and retry and row[0] < self.max_attempts:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, worker_id = NULL, "
+                    "lease_expires_at = NULL WHERE id = ? AND (? IS NULL OR worker_id = ?)",
+                    (error, job_id, worker_id, worker_id),
+                )
+                return
+        self._finish(job_id, "failed", error=error, worker_id=worker_id)
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        worker_id: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pdf_path, stages FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row[1])
+            if status == "failed":
+                for info in stages.values():
+                    if info["status"] == "running":
+                        info["status"] = "failed"
+
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, stages = ?, result = ?, error = ?, finished_at = ?, "
+                "worker_id = NULL, lease_expires_at = NULL WHERE id = ? AND (? IS NULL OR worker_id = ?)",
+                (status, json.dumps(stages), json.dumps(result) if result else None, error, _now(), job_id,
+                 worker_id, worker_id),
+            )
+            if cursor.rowcount == 0:
+                return  # Lease lost - the job and its file belong to another worker now
+            self._conn.execute("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+            self._prune()
+
+        try:
+            os.unlink(row[0])
+        except FileNotFoundError:
+            pass
+
+    def _prune(self) -> None:
+        # Drop the oldest finished jobs so the queue file stays bounded (caller holds lock)
+        self._conn.execute(
+            "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN ('succeeded', 'failed') "
+            "ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_retained_jobs,),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobCheckpoint(Checkpoint):
+    """Checkpoint blobs of one job, stored in the queue file."""
+
+    def __init__(self, queue: JobQueue, job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+
+    def load(self, name: str) -> Optional[bytes]:
+        with self.queue._lock:
+            row = self.queue._conn.execute(
+                "SELECT data FROM checkpoints WHERE job_id = ? AND name = ?", (self.job_id, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, name: str, data: bytes) -> None:
+        with self.queue._lock:
+            self.queue._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, name, data) VALUES (?, ?, ?)",
+                (self.job_id, name, data),
+            )
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Return the process-wide durable queue.
+
+    Stored in INGESTION_QUEUE_PATH (default ./ingestion_queue.sqlite3).
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(os.getenv("INGESTION_QUEUE_PATH", "./ingestion_queue.sqlite3"))
+        return _queue
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+
+from services.executors import get_process_pool
+from services.clients import shared_pipeline
+from services.ingestion import STAGES, IngestionPipeline
+
+if TYPE_CHECKING:
+    from services.job_queue import JobQueue
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue is at capacity."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """
+    A single queued PDF ingestion.
+
+    Status moves queued → running → succeeded | failed. Each pipeline stage
+    tracks its own status plus whatever counters the stage reported.
+    """
+
+    def __init__(self, filename: str, pdf_path: str):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.pdf_path = pdf_path
+        self.status = "queued"
+        self.stages: Dict[str, Dict[str, Any]] = {
+            stage: {"status": "pending"} for stage in STAGES
+        }
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "stages": {stage: dict(info) for stage, info in self.stages.items()},
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Bounded worker pool for background PDF ingestion.
+
+    Uploads are queued and picked up by a fixed number of asyncio workers.
+    Workers run the non-blocking pipeline (parsing in the shared process
+    pool, SDK calls in threads) so the event loop stays free to accept
+    requests and serve job status lookups.
+    """
+
+    def __init__(
+        self,
+        pipeline_factory: Callable[[], IngestionPipeline] = shared_pipeline,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        max_retained_jobs: Optional[int] = None,
+    ):
+        self.pipeline_factory = pipeline_factory
+        self.max_workers = max_workers or int(os.getenv("INGESTION_WORKERS", "2"))
+        self.max_queue_size = max_queue_size or int(os.getenv("INGESTION_QUEUE_SIZE", "100"))
+        self.max_retained_jobs = max_retained_jobs or int(
+            os.getenv("INGESTION_MAX_RETAINED_JOBS", "1000")
+        )
+
+        self._pipeline: Optional[IngestionPipeline] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start worker tasks on the running event loop (idempotent)."""
+        if self._workers:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel workers and remove temp files of jobs that never ran."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == "queued":
+                    job.status = "failed"
+                    job.error = "Server shut down before job started"
+                    job.finished_at = _now()
+                    _remove_file(job.pdf_path)
+
+    def submit(self, pdf_path: str, filename: str) -> Job:
+        """
+        Queue a PDF for ingestion. Takes ownership of pdf_path (deleted when done).
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+            Exception: If the pipeline services cannot be initialized
+        """
+        self.start()
+        self._get_pipeline()  # Fail fast on missing API keys
+
+        job = Job(filename=filename, pdf_path=pdf_path)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(
+                f"Ingestion queue is full ({self.max_queue_size} jobs). Try again later."
+            )
+
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job's state, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def _get_pipeline(self) -> IngestionPipeline:
+        # Services are created once and shared by all workers
+        if self._pipeline is None:
+            self._pipeline = self.pipeline_factory()
+        return self._pipeline
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        with self._lock:
+            job.status = "running"
+            job.started_at = _now()
+
+        def on_progress(stage: str, status: str, details: Dict[str, Any]) -> None:
+            with self._lock:
+                job.stages[stage].update(details, status=status)
+
+        try:
+            result = await self._get_pipeline().ingest_async(
+                job.pdf_path, job.filename, on_progress, process_pool=get_process_pool()
+            )
+            with self._lock:
+                job.result = result
+                job.status = "succeeded"
+        except Exception as e:
+            with self._lock:
+                for info in job.stages.values():
+                    if info["status"] == "running":
+                        info["status"] = "failed"
+                job.error = str(e)
+                job.status = "failed"
+        finally:
+            _remove_file(job.pdf_path)
+            with self._lock:
+                job.finished_at = _now()
+                self._prune()
+
+    def _prune(self) -> None:
+        # Drop the oldest finished jobs so memory stays bounded (caller holds lock)
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_retained_jobs)]:
+            del self._jobs[job_id]
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> Union[JobManager, "JobQueue"]:
+    """
+    Return the process-wide job manager.
+
+    INGESTION_QUEUE=memory (default) runs jobs on in-process workers;
+    INGESTION_QUEUE=sqlite records them in the durable queue instead, for
+    separate worker processes (python -m worker) to run.
+    """
+    global _job_manager
+    if os.getenv("INGESTION_QUEUE", "memory").lower() == "sqlite":
+        # Imported here - the queue module builds on Job from this one
+        from services.job_queue import get_job_queue
+        return get_job_queue()
+    if _job_manager is None:
+        _job_manager = JobManager()
+    return _job_manager
@@ -0,0 +1,107 @@
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache, get_embedding_cache
+from services.embeddings import EmbeddingProvider
+from services.metrics import EMBEDDING_BATCH_SIZE
+
+try:
+    import torch
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional - only needed for EMBEDDING_PROVIDER=local
+    torch = None
+    SentenceTransformer = None
+
+
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class LocalEmbeddingService(EmbeddingProvider):
+    """
+    Generate embeddings in-process with a sentence-transformers model on CPU.
+
+    No network round trips: for air-gapped and latency-sensitive
+    deployments. Texts are encoded in batches of batch_size, one batch at a
+    time - torch already spreads each batch across threads (all cores by
+    default), so concurrent batches would only contend for them.
+
+    The model's output size is fixed: EMBEDDING_DIMENSIONS, if set, must
+    match it (and the vector index must too). The model also truncates
+    inputs past its max_seq_length tokens (256 for MiniLM, far less than a
+    default chunk), so longer chunks are split into windows that fit, and
+    the chunk's vector is the normalized mean of its windows' vectors.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        threads: Optional[int] = None,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        if SentenceTransformer is None:
+            raise ValueError(
+                "EMBEDDING_PROVIDER=local requires sentence-transformers (pip install sentence-transformers)"
+            )
+
+        self.model = model or os.getenv("EMBEDDING_LOCAL_MODEL", DEFAULT_LOCAL_MODEL)
+        self.max_batch_inputs = batch_size or int(os.getenv("EMBEDDING_LOCAL_BATCH_SIZE", "64"))
+
+        threads = threads or int(os.getenv("EMBEDDING_LOCAL_THREADS", "0")) or os.cpu_count() or 1
+        torch.set_num_threads(threads)
+        self._model = SentenceTransformer(self.model, device="cpu")
+
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+        self.max_seq_length = self._model.max_seq_length
+        self._tokenizer = self._model.tokenizer
+        requested = dimensions or int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+        if requested and requested != self.dimensions:
+            raise ValueError(
+                f"EMBEDDING_DIMENSIONS is {requested} but {self.model} produces "
+                f"{self.dimensions}-dimension embeddings"
+            )
+
+        # Content-addressed cache (enabled via EMBEDDING_CACHE_PATH); skips re-encoding known chunks
+        self.cache = cache if cache is not None else get_embedding_cache()
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the model's own tokenizer."""
+        return len(self._tokenizer.encode(text, add_special_tokens=False))
+
+    def _windows(self, text: str) -> List[str]:
+        # Leave room for the [CLS]/[SEP] tokens the model adds to every input
+        limit = max(1, self.max_seq_length - 2)
+        ids = self._tokenizer.encode(text, add_special_tokens=False)
+        if len(ids) <= limit:
+            return [text]
+        return [self._tokenizer.decode(ids[i:i + limit]) for i in range(0, len(ids), limit)]
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        try:
+            windows: List[str] = []
+            owners: List[int] = []
+            for i, text in enumerate(texts):
+                for window in self._windows(text):
+                    windows.append(window)
+                    owners.append(i)
+
+            embeddings = self._model.encode(
+                windows,
+                batch_size=self.max_batch_inputs,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            ).astype(np.float32, copy=False)
+            EMBEDDING_BATCH_SIZE.observe(len(texts))
+
+            if len(windows) > len(texts):
+                pooled = np.zeros((len(texts), embeddings.shape[1]), dtype=np.float32)
+                np.add.at(pooled, owners, embeddings)
+                embeddings = pooled / np.linalg.norm(pooled, axis=1, keepdims=True)
+            return embeddings
+
+        except Exception as e:
+            raise Exception(f"Failed to generate embeddings: {str(e)}")
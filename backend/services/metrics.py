@@ -0,0 +1,282 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from opentelemetry import trace
+except ImportError:  # Optional - spans are skipped without the OpenTelemetry API
+    trace = None
+
+
+# Latency buckets (seconds) from sub-millisecond calls to multi-minute documents
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+THROUGHPUT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2048)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Exposition lines for every labelled value."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (set at collection time for external stats)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram, as Prometheus expects."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = 'le="' + _number(bound) + '"'
+                    lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+                inf = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{self._labels(key, inf)} {count}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {_number(total)}")
+                lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Callback run before each render, e.g. to copy external stats into gauges."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                pass  # A failing stats source shouldn't break the whole scrape
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "vectory_stage_duration_seconds", "Time spent in each ingestion stage per document", ("stage",)
+))
+STAGE_THROUGHPUT = REGISTRY.register(Histogram(
+    "vectory_stage_throughput_items_per_second",
+    "Items per second per document: pages (extract), chunks (chunk, embed), vectors (upsert)",
+    ("stage",), buckets=THROUGHPUT_BUCKETS,
+))
+STAGE_ITEMS = REGISTRY.register(Counter(
+    "vectory_stage_items_total", "Pages extracted, chunks created, embeddings generated, vectors stored", ("stage",)
+))
+DOCUMENTS = REGISTRY.register(Counter(
+    "vectory_documents_ingested_total", "Documents run through the ingestion pipeline", ("status",)
+))
+DOCUMENT_DURATION = REGISTRY.register(Histogram(
+    "vectory_document_duration_seconds", "End-to-end ingestion time per document"
+))
+TOKENS_EMBEDDED = REGISTRY.register(Counter(
+    "vectory_embedding_tokens_total", "Tokens sent to the embeddings API (estimated when tiktoken is unavailable)"
+))
+EMBEDDING_REQUESTS = REGISTRY.register(Counter(
+    "vectory_embedding_requests_total", "Embeddings API requests"
+))
+EMBEDDING_BATCH_SIZE = REGISTRY.register(Histogram(
+    "vectory_embedding_batch_size", "Inputs per embeddings API request", buckets=BATCH_SIZE_BUCKETS
+))
+UPSERT_BATCH_SIZE = REGISTRY.register(Histogram(
+    "vectory_upsert_batch_size", "Vectors per vector database upsert request", ("provider",),
+    buckets=BATCH_SIZE_BUCKETS,
+))
+PROVIDER_RETRIES = REGISTRY.register(Counter(
+    "vectory_provider_retries_total", "Retried provider calls (rate limits, server errors, timeouts)", ("provider",)
+))
+CACHE_HITS = REGISTRY.register(Gauge(
+    "vectory_cache_hits", "Cache hits since process start", ("cache",)
+))
+CACHE_MISSES = REGISTRY.register(Gauge(
+    "vectory_cache_misses", "Cache misses since process start", ("cache",)
+))
+CACHE_HIT_RATE = REGISTRY.register(Gauge(
+    "vectory_cache_hit_rate", "Cache hit rate since process start", ("cache",)
+))
+
+# Items each stage reports in its "completed" progress details
+_STAGE_ITEM_KEYS = {
+    "extract": "pages_extracted",
+    "chunk": "chunks_created",
+    "embed": "embeddings_generated",
+    "upsert": "vectors_stored",
+}
+
+
+def record_cache_stats(cache: str, stats: Dict[str, Any]) -> None:
+    CACHE_HITS.set(stats["hits"], cache=cache)
+    CACHE_MISSES.set(stats["misses"], cache=cache)
+    CACHE_HIT_RATE.set(stats["hit_rate"], cache=cache)
+
+
+@contextmanager
+def track_ingestion(
+    filename: str,
+    on_progress: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+) -> Iterator[Callable[[str, str, Dict[str, Any]], None]]:
+    """
+    Instrument one document's ingestion.
+
+    Yields a progress callback to use in place of on_progress: it forwards
+    every call and records per-stage duration, throughput and item counts
+    from the "running"/"completed" transitions. With OpenTelemetry
+    installed, the document and each stage are also recorded as spans.
+    """
+    started: Dict[str, float] = {}
+    stage_spans: Dict[str, Any] = {}
+    document_start = time.perf_counter()
+    document_span = trace.get_tracer("vectory").start_span(
+        "ingest_document", attributes={"filename": filename}
+    ) if trace is not None else None
+
+    def report(stage: str, status: str, details: Dict[str, Any]) -> None:
+        if status == "running" and stage not in started:
+            started[stage] = time.perf_counter()
+            if document_span is not None:
+                stage_spans[stage] = trace.get_tracer("vectory").start_span(
+                    stage, context=trace.set_span_in_context(document_span)
+                )
+        elif status == "completed" and stage in started:
+            elapsed = time.perf_counter() - started[stage]
+            items = details.get(_STAGE_ITEM_KEYS.get(stage, ""), 0)
+            STAGE_DURATION.observe(elapsed, stage=stage)
+            STAGE_ITEMS.inc(items, stage=stage)
+            if elapsed > 0 and items:
+                STAGE_THROUGHPUT.observe(items / elapsed, stage=stage)
+            span = stage_spans.pop(stage, None)
+            if span is not None:
+                span.set_attribute("items", items)
+                span.end()
+
+        if on_progress is not None:
+            on_progress(stage, status, details)
+
+    status = "failed"
+    try:
+        yield report
+        status = "succeeded"
+    finally:
+        DOCUMENTS.inc(status=status)
+        DOCUMENT_DURATION.observe(time.perf_counter() - document_start)
+        if document_span is not None:
+            for span in stage_spans.values():
+                span.end()
+            document_span.set_attribute("status", status)
+            document_span.end()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
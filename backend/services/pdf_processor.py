@@ -1,47 +1,202 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pypdf import PdfReader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from services.chunker import TextChunker, count_tokens
+from services.extraction_cache import ExtractionCache
+
+
+class Chunk:
+    """
+    One chunk of document text and where it came from.
+
+    Slotted rather than a dict: large documents hold hundreds of thousands
+    of these in flight, and slots drop the per-record dict and key storage.
+    """
+
+    __slots__ = ("page_number", "chunk_index", "text", "page_end", "duplicate_pages")
+
+    def __init__(self, page_number: int, chunk_index: int, text: str, page_end: Optional[int] = None):
+        self.page_number = page_number
+        self.chunk_index = chunk_index
+        self.text = text
+        # Last page covered, set only when chunks may cross page boundaries
+        self.page_end = page_end
+        # Other pages with the same text, set when duplicate chunks are collapsed into this one
+        self.duplicate_pages: Optional[List[int]] = None
+
+    def __repr__(self) -> str:
+        return f"Chunk(page_number={self.page_number}, chunk_index={self.chunk_index}, text={self.text[:30]!r})"
 
 
 class PDFProcessor:
-    """Handles PDF text extraction and chunking."""
+    """
+    Handles PDF text extraction and chunking.
+
+    Documents with at least parallel_threshold_pages pages are extracted
+    page-parallel: page ranges are spread across extraction_workers
+    processes and reassembled in page order. Smaller documents are
+    extracted serially, where process startup and IPC would cost more than
+    they save (see benchmarks/extraction_cutover.py).
+
+    chunker selects the splitting engine (PDF_CHUNKER): "langchain"
+    (RecursiveCharacterTextSplitter, per page) or "native" (TextChunker, a
+    single pass over the document that can also chunk across pages with
+    chunk_across_pages). chunk_length="tokens" measures chunk_size and
+    chunk_overlap in embedding tokens instead of characters.
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
+    With an extraction_cache, extract_text_with_pages returns the pages of
+    a file it has extracted before (same bytes, same extractor version)
+    without parsing it again.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        extraction_workers: Optional[int] = None,
+        parallel_threshold_pages: Optional[int] = None,
+        chunker: Optional[str] = None,
+        chunk_length: Optional[str] = None,
+        chunk_across_pages: Optional[bool] = None,
+        extraction_cache: Optional[ExtractionCache] = None,
+    ):
+        self.chunk_size = chunk_size
+        self.extraction_cache = extraction_cache
+        self.chunk_overlap = chunk_overlap
+        self.extraction_workers = (
+            extraction_workers
+            or int(os.getenv("PDF_EXTRACTION_WORKERS", "0"))
+            or os.cpu_count()
+            or 1
+        )
+        self.parallel_threshold_pages = parallel_threshold_pages or int(
+            os.getenv("PDF_PARALLEL_THRESHOLD_PAGES", "64")
         )
 
-    def extract_text_with_pages(self, pdf_path: str) -> List[Dict[str, Any]]:
+        self.chunker = (chunker or os.getenv("PDF_CHUNKER", "langchain")).lower()
+        self.chunk_length = (chunk_length or os.getenv("PDF_CHUNK_LENGTH", "chars")).lower()
+        if chunk_across_pages is None:
+            chunk_across_pages = os.getenv("PDF_CHUNK_ACROSS_PAGES", "false").lower() == "true"
+        self.chunk_across_pages = chunk_across_pages
+
+        if self.chunker == "native":
+            self.text_splitter = TextChunker(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length=self.chunk_length,
+                across_pages=chunk_across_pages,
+            )
+        elif self.chunker == "langchain":
+            if chunk_across_pages:
+                raise ValueError("PDF_CHUNK_ACROSS_PAGES requires PDF_CHUNKER=native")
+            if self.chunk_length not in ("chars", "tokens"):
+                raise ValueError(f"PDF_CHUNK_LENGTH must be chars or tokens, got {self.chunk_length!r}")
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length_function=count_tokens if self.chunk_length == "tokens" else len,
+            )
+        else:
+            raise ValueError(f"PDF_CHUNKER must be langchain or native, got {self.chunker!r}")
+
+    def extract_text_with_pages(
+        self, pdf_path: str, executor: Optional[Executor] = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract text from PDF, preserving page numbers.
 
+        Large documents are extracted page-parallel on executor (or a
+        temporary process pool if none is given).
+
         Returns list of dicts: [{"page_number": 1, "text": "..."}, ...]
         """
+        if self.extraction_cache is None:
+            return self._extract(pdf_path, executor)
+
+        key = self.extraction_cache.key(pdf_path)
+        pages = self.extraction_cache.get(key)
+        if pages is None:
+            pages = self._extract(pdf_path, executor)
+            self.extraction_cache.put(key, pages)
+        return pages
+
+    def _extract(self, pdf_path: str, executor: Optional[Executor]) -> List[Dict[str, Any]]:
+        ranges = self.page_ranges(count_pages(pdf_path))
+        if len(ranges) <= 1:
+            return list(self.iter_pages(pdf_path))
+
+        if executor is not None:
+            return _extract_ranges(executor, pdf_path, ranges)
+
+        with ProcessPoolExecutor(max_workers=self.extraction_workers) as pool:
+            return _extract_ranges(pool, pdf_path, ranges)
+
+    def page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """
+        Split pages into (start, end) ranges for parallel extraction.
+
+        Returns a single range when the document is below the parallel
+        threshold. Otherwise makes ~2 ranges per worker so a slow range
+        (e.g. image-heavy pages) doesn't leave other workers idle.
+        """
+        if page_count < self.parallel_threshold_pages or self.extraction_workers <= 1:
+            return [(0, page_count)]
+
+        range_count = min(page_count, self.extraction_workers * 2)
+        size, remainder = divmod(page_count, range_count)
+        ranges = []
+        start = 0
+        for i in range(range_count):
+            end = start + size + (1 if i < remainder else 0)
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def iter_pages(
+        self, pdf_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield pages with text, one at a time.
+
+        pypdf loads page content on access, so only the current page's text
+        is held in memory. start/end select a 0-based page range.
+        """
         reader = PdfReader(pdf_path)
-        pages_data = []
+        pages = reader.pages[start:end]
 
-        for page_num, page in enumerate(reader.pages, start=1):
+        for page_num, page in enumerate(pages, start=start + 1):
             text = page.extract_text()
             if text.strip():  # Only include pages with actual text
-                pages_data.append({
+                yield {
                     "page_number": page_num,
                     "text": text
-                })
-
-        return pages_data
+                }
 
-    def chunk_text(self, pages_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def chunk_text(self, pages_data: List[Dict[str, Any]]) -> List[Chunk]:
         """
         Chunk text from pages, preserving metadata.
 
-        Returns list of dicts with: page_number, chunk_index, text
+        Returns list of Chunk records (page_number, chunk_index, text)
         """
-        chunks_with_metadata = []
+        return list(self.iter_chunks(pages_data))
+
+    def iter_chunks(self, pages: Iterable[Dict[str, Any]]) -> Iterator[Chunk]:
+        """
+        Incrementally chunk pages as they arrive (e.g. from iter_pages).
+
+        Yields Chunk records (page_number, chunk_index, text)
+        """
+        if isinstance(self.text_splitter, TextChunker):
+            for chunk_index, (page_number, page_end, text) in enumerate(self.text_splitter.iter_chunks(pages)):
+                yield Chunk(page_number, chunk_index, text, page_end)
+            return
+
         chunk_index = 0
 
-        for page_data in pages_data:
+        for page_data in pages:
             page_number = page_data["page_number"]
             text = page_data["text"]
 
@@ -50,16 +205,10 @@ class PDFProcessor:
 
             # Add metadata to each chunk
             for chunk_text in text_chunks:
-                chunks_with_metadata.append({
-                    "page_number": page_number,
-                    "chunk_index": chunk_index,
-                    "text": chunk_text
-                })
+                yield Chunk(page_number, chunk_index, chunk_text)
                 chunk_index += 1
 
-        return chunks_with_metadata
-
-    def process_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
+    def process_pdf(self, pdf_path: str) -> List[Chunk]:
         """
         Complete pipeline: extract text and chunk it.
 
@@ -68,3 +217,52 @@ class PDFProcessor:
         pages_data = self.extract_text_with_pages(pdf_path)
         chunks = self.chunk_text(pages_data)
         return chunks
+
+
+# Module-level entry points for process pools.
+# Workers receive plain arguments instead of a pickled PDFProcessor.
+
+def extract_pages(pdf_path: str) -> List[Dict[str, Any]]:
+    """Extract page text from a PDF serially (runs inside a worker process)."""
+    return list(PDFProcessor().iter_pages(pdf_path))
+
+
+def extract_page_range(pdf_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Extract pages [start, end) of a PDF (runs inside a worker process)."""
+    return list(PDFProcessor().iter_pages(pdf_path, start, end))
+
+
+def count_pages(pdf_path: str) -> int:
+    """Page count without extracting any text (pypdf parses pages lazily)."""
+    return len(PdfReader(pdf_path).pages)
+
+
+def _extract_ranges(
+    executor: Executor, pdf_path: str, ranges: List[Tuple[int, int]]
+) -> List[Dict[str, Any]]:
+    # executor.map yields in submission order, so pages stay in document order
+    results = executor.map(
+        extract_page_range,
+        [pdf_path] * len(ranges),
+        [start for start, _ in ranges],
+        [end for _, end in ranges],
+    )
+    return [page for pages in results for page in pages]
+
+
+def chunk_pages(
+    pages_data: List[Dict[str, Any]],
+    chunk_size: int,
+    chunk_overlap: int,
+    chunker: Optional[str] = None,
+    chunk_length: Optional[str] = None,
+    chunk_across_pages: Optional[bool] = None,
+) -> List[Chunk]:
+    """Chunk extracted pages (runs inside a worker process)."""
+    return PDFProcessor(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        chunker=chunker,
+        chunk_length=chunk_length,
+        chunk_across_pages=chunk_across_pages,
+    ).chunk_text(pages_data)
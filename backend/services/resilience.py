@@ -0,0 +1,294 @@
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from services.metrics import PROVIDER_RETRIES
+
+
+# HTTP statuses worth retrying: timeouts, conflicts during scaling, rate limits, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open and calls fail fast."""
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter.
+
+    Holds up to `capacity` tokens, refilled at `rate` tokens per second.
+    acquire() blocks until enough tokens are available.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0, sleep: Callable[[float], None] = time.sleep) -> None:
+        # Requests bigger than the bucket would wait forever - cap at a full bucket
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated provider failures.
+
+    closed → open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial call is let through (half-open) and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def before_call(self, name: str) -> None:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(f"{name} circuit is open - provider unavailable, failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """End a half-open trial call without an outcome, leaving the breaker state as it was."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+
+class ResilientCaller:
+    """
+    Wraps provider calls with rate limiting, retries and circuit breaking.
+
+    Retries transient failures (429/5xx, timeouts, connection errors) with
+    full-jitter exponential backoff, waiting at least as long as the
+    provider's Retry-After / rate-limit reset headers ask for.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+        request_bucket: Optional[TokenBucket] = None,
+        token_bucket: Optional[TokenBucket] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.request_bucket = request_bucket
+        self.token_bucket = token_bucket
+        self.sleep = sleep
+        self.retries = 0
+
+    def call(self, fn: Callable[..., Any], *args: Any, cost: float = 0, **kwargs: Any) -> Any:
+        """
+        Call fn(*args, **kwargs) with retries.
+
+        Args:
+            cost: Tokens this call consumes from the token bucket (e.g. embedding input tokens)
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open
+            Exception: The last error once retries are exhausted, or any non-retryable error
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.before_call(self.name)
+
+            if self.request_bucket is not None:
+                self.request_bucket.acquire(1, sleep=self.sleep)
+            if self.token_bucket is not None and cost:
+                self.token_bucket.acquire(cost, sleep=self.sleep)
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # Client errors (bad input, auth) say nothing about provider health:
+                    # neither reset the failure count nor add to it
+                    self.breaker.release_trial()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_attempts:
+                    raise
+                self.retries += 1
+                PROVIDER_RETRIES.inc(provider=self.name)
+                self.sleep(self._backoff(attempt, retry_after(e)))
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def _backoff(self, attempt: int, hinted: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if hinted is not None:
+            # Honour the provider's hint, but never wait longer than max_delay
+            delay = max(delay, min(hinted, self.max_delay))
+        return delay
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status of an SDK error (OpenAI uses status_code, Pinecone uses status)."""
+    for attr in ("status_code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for rate limits, server errors, timeouts and dropped connections."""
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # SDK transport errors (e.g. openai.APIConnectionError, APITimeoutError, urllib3 errors)
+    name = type(exc).__name__
+    return any(marker in name for marker in ("Timeout", "Connection", "ProtocolError"))
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from Retry-After or rate-limit reset headers."""
+    headers = _headers(exc)
+    if not headers:
+        return None
+
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+
+    if "retry-after" in headers:
+        value = headers["retry-after"]
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    # Reset headers come with every response and say when the window refills,
+    # not how long to wait - only meaningful when the request was rate limited.
+    # OpenAI reports reset times as durations like "6m0s", "1.5s", "20ms"
+    if status_code(exc) != 429:
+        return None
+    resets = [
+        _parse_duration(headers[name])
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if name in headers
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+def _headers(exc: BaseException) -> Dict[str, str]:
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None)
+    if not headers:
+        return {}
+    return {str(key).lower(): str(value) for key, value in dict(headers).items()}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    parts = re.findall(r"([\d.]+)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+_callers: Dict[str, ResilientCaller] = {}
+_callers_lock = threading.Lock()
+
+
+def get_resilience(provider: str) -> ResilientCaller:
+    """
+    Return the process-wide caller for a provider ("openai" or "pinecone").
+
+    Shared so rate limits and circuit state cover every request in the process.
+    Configured from {PROVIDER}_MAX_ATTEMPTS, {PROVIDER}_RPM, {PROVIDER}_TPM,
+    {PROVIDER}_CIRCUIT_THRESHOLD and {PROVIDER}_CIRCUIT_RESET_SECONDS.
+    """
+    with _callers_lock:
+        if provider not in _callers:
+            prefix = provider.upper()
+            rpm = float(os.getenv(f"{prefix}_RPM", "0"))
+            tpm = float(os.getenv(f"{prefix}_TPM", "0"))
+
+            _callers[provider] = ResilientCaller(
+                name=provider,
+                max_attempts=int(os.getenv(f"{prefix}_MAX_ATTEMPTS", "5")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv(f"{prefix}_CIRCUIT_THRESHOLD", "5")),
+                    reset_timeout=float(os.getenv(f"{prefix}_CIRCUIT_RESET_SECONDS", "30")),
+                ),
+                request_bucket=TokenBucket(rate=rpm / 60, capacity=rpm) if rpm else None,
+                token_bucket=TokenBucket(rate=tpm / 60, capacity=tpm) if tpm else None,
+            )
+        return _callers[provider]
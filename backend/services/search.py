@@ -0,0 +1,260 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from adapters import VectorDBAdapter
+from services.chunk_store import ChunkStore, get_chunk_store
+from services.embeddings import EmbeddingProvider
+
+
+class ResultCache:
+    """
+    LRU cache of search results with a per-entry time-to-live.
+
+    Repeated queries (same text, namespace, top_k and filter) are answered
+    without embedding the query or calling the vector database again.
+
+    Lookups run on the event loop, but versioned ingestion invalidates
+    namespaces from worker threads, so every access takes a lock. The cache
+    is per process: a re-upload ingested by a separate worker process
+    (INGESTION_QUEUE=sqlite) can't invalidate it, and searches of that
+    namespace may return the previous version for up to ttl seconds.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]  # Expired
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple, value: Any) -> None:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str) -> None:
+        """Drop every cached result for a namespace (keys start with the namespace)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class QueryBatcher:
+    """
+    Coalesces concurrent query embeddings into one embeddings API call.
+
+    The first query in a window starts a short timer (max_wait seconds);
+    every query that arrives before it fires, or until max_batch queries
+    are waiting, is embedded in the same request. Identical texts in a
+    batch are embedded once.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], List[np.ndarray]],
+                 max_batch: int = 64, max_wait: float = 0.005):
+        self.embed_many = embed
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def embed(self, text: str) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference so the task isn't garbage collected mid-flight
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+
+        try:
+            # The SDK call blocks - keep it off the event loop
+            embeddings = await asyncio.to_thread(self.embed_many, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+
+class SearchService:
+    """Semantic search over an ingested namespace: embed the query, then query the vector database."""
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingProvider,
+        vector_adapter: VectorDBAdapter,
+        cache: Optional[ResultCache] = None,
+        batcher: Optional[QueryBatcher] = None,
+        chunk_store: Optional[ChunkStore] = None,
+    ):
+        self.embedding_service = embedding_service
+        self.vector_adapter = vector_adapter
+        # Text lives here instead of vector metadata when CHUNK_STORE_PATH is set
+        self.chunk_store = chunk_store if chunk_store is not None else get_chunk_store()
+        self.cache = cache or ResultCache(
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024")),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "60")),
+        )
+        self.batcher = batcher or QueryBatcher(
+            embedding_service.generate_embeddings,
+            max_batch=int(os.getenv("SEARCH_MAX_BATCH", "64")),
+            max_wait=float(os.getenv("SEARCH_BATCH_WAIT_MS", "5")) / 1000,
+        )
+
+    async def search(
+        self,
+        query: str,
+        namespace: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Find the chunks most similar to a query.
+
+        Args:
+            query: Natural-language query text
+            namespace: Namespace returned by the upload that ingested the document
+            top_k: Maximum number of matches
+            filter: Optional metadata filter passed to the vector database
+
+        Returns:
+            {"matches": [{"id", "score", "metadata"}, ...], "cached": bool}
+        """
+        # Filter dicts aren't hashable - key on their canonical JSON
+        key = (namespace, query, top_k, json.dumps(filter, sort_keys=True))
+
+        matches = self.cache.get(key)
+        if matches is not None:
+            return {"matches": matches, "cached": True}
+
+        vector = await self.batcher.embed(query)
+        matches = await asyncio.to_thread(
+            self.vector_adapter.query, vector, top_k, namespace, filter
+        )
+        if self.chunk_store is not None:
+            matches = await asyncio.to_thread(self.chunk_store.hydrate, namespace, matches)
+
+        self.cache.put(key, matches)
+        return {"matches": matches, "cached": False}
+
+
+_service: Optional[SearchService] = None
+_service_lock = threading.Lock()
+
+
+def get_search_service() -> SearchService:
+    """
+    Return the process-wide search service.
+
+    Shared so the result cache and query batching cover every request. Uses
+    the app-wide embedding provider and vector database clients.
+
+    Raises:
+        ValueError: If credentials are missing or the embedding and index dimensions differ
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            # Imported here: services.clients imports the ingestion pipeline, which imports this module
+            from services.clients import get_clients
+
+            clients = get_clients()
+            embedding_service = clients.embedding_service()
+            vector_adapter = clients.vector_adapter()
+            vector_adapter.check_dimensions(embedding_service.dimensions)
+            _service = SearchService(embedding_service, vector_adapter)
+        return _service
+
+
+async def get_search_service_async() -> SearchService:
+    """
+    get_search_service() for request handlers.
+
+    The first call creates clients and checks the index dimensions over the
+    network, so it runs in a worker thread rather than blocking the event loop.
+    """
+    if _service is not None:
+        return _service
+    return await asyncio.to_thread(get_search_service)
+
+
+def invalidate_cached_results(namespace: str) -> None:
+    """
+    Drop cached search results for a namespace whose vectors just changed.
+
+    Safe to call from worker threads. Only reaches this process's cache.
+    """
+    with _service_lock:
+        if _service is not None:
+            _service.cache.invalidate(namespace)
+
+
+def result_cache_stats() -> Optional[Dict[str, Any]]:
+    """Search result cache counters, or None if no search has been served yet."""
+    with _service_lock:
+        return _service.cache.stats() if _service is not None else None
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+# SQLite limits bound parameters per statement, so IN (...) lookups are sliced to this many values
+MAX_IN_VALUES = 500
+
+StoreT = TypeVar("StoreT", bound="SQLiteStore")
+
+
+class SQLiteStore:
+    """
+    Base for the services' SQLite files (caches, chunk store, manifests, dedup index).
+
+    Opens one WAL-mode connection, shared across worker threads; all access
+    is serialized by _lock. Subclasses create their tables after calling
+    super().__init__().
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def _select_in(
+        self, sql: str, values: Sequence[Any], params: Sequence[Any] = ()
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Run sql, which contains "IN ({placeholders})", for all values in slices.
+
+        params are bound before each slice of values. Caller holds _lock.
+        """
+        rows: List[Tuple[Any, ...]] = []
+        for i in range(0, len(values), MAX_IN_VALUES):
+            batch = list(values[i:i + MAX_IN_VALUES])
+            rows.extend(self._conn.execute(
+                sql.format(placeholders=",".join("?" * len(batch))), [*params, *batch]
+            ).fetchall())
+        return rows
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[str, Any] = {}
+_stores_lock = threading.Lock()
+
+
+def store_from_env(
+    env_var: str, factory: Callable[[str], StoreT], default: Optional[str] = None
+) -> Optional[StoreT]:
+    """
+    Return the process-wide store for the path in env_var (or default), or None if neither is set.
+
+    Created by factory(path) on first use.
+    """
+    path = os.getenv(env_var, default)
+    if not path:
+        return None
+
+    with _stores_lock:
+        if env_var not in _stores:
+            _stores[env_var] = factory(path)
+        return _stores[env_var]
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.sqlite_store import SQLiteStore, store_from_env
+
+# (page_number, chunk_index, page_end, duplicate_pages) - every metadata field
+# that depends on where a chunk sits; duplicate_pages is comma-joined ("" if none)
+Position = Tuple[int, int, Optional[int], str]
+
+
+class VersionStore(SQLiteStore):
+    """
+    Chunk manifests of versioned documents.
+
+    Records, per namespace, the current version number and each chunk's
+    content-derived ID with its Position. A re-upload is diffed against
+    this manifest to find chunks that were added, moved or removed.
+
+    The file may be shared by several processes (the API and `python -m
+    worker`), so namespace_lock() is a lease row in the database rather than
+    an in-process lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: Optional[float] = None,
+        poll_interval: float = 0.05,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(path, timeout=30)
+        self.lease_seconds = lease_seconds or float(os.getenv("DOCUMENT_VERSIONS_LOCK_SECONDS", "60"))
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._namespace_locks: Dict[str, threading.Lock] = {}
+
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_versions ("
+            "namespace TEXT PRIMARY KEY, version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_chunks ("
+            "namespace TEXT NOT NULL, id TEXT NOT NULL, page_number INTEGER NOT NULL, "
+            "chunk_index INTEGER NOT NULL, PRIMARY KEY (namespace, id))"
+        )
+        # Manifests written before page_end/duplicate_pages were tracked
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(document_chunks)")}
+        if "page_end" not in columns:
+            self._conn.execute("ALTER TABLE document_chunks ADD COLUMN page_end INTEGER")
+            self._conn.execute(
+                "ALTER TABLE document_chunks ADD COLUMN duplicate_pages TEXT NOT NULL DEFAULT ''"
+            )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS namespace_leases ("
+            "namespace TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @contextmanager
+    def namespace_lock(self, namespace: str) -> Iterator[None]:
+        """
+        Held while a namespace is diffed and updated, so concurrent re-uploads don't interleave.
+
+        Threads of this process wait on a threading.Lock; other processes
+        poll for the namespace's lease row. The lease is renewed while held,
+        so a long re-upload keeps it, and expires if its holder dies.
+        """
+        with self._lock:
+            local_lock = self._namespace_locks.setdefault(namespace, threading.Lock())
+
+        with local_lock:
+            owner = uuid.uuid4().hex
+            while not self._acquire_lease(namespace, owner):
+                time.sleep(self.poll_interval)
+
+            released = threading.Event()
+
+            def renew_lease() -> None:
+                while not released.wait(self.lease_seconds / 3):
+                    self._renew_lease(namespace, owner)
+
+            renewer = threading.Thread(target=renew_lease, daemon=True)
+            renewer.start()
+            try:
+                yield
+            finally:
+                released.set()
+                renewer.join()
+                with self._lock:
+                    with self._conn:
+                        self._conn.execute(
+                            "DELETE FROM namespace_leases WHERE namespace = ? AND owner = ?", (namespace, owner)
+                        )
+
+    def _acquire_lease(self, namespace: str, owner: str) -> bool:
+        now = self.clock()
+        with self._lock:
+            with self._conn:
+                # Takes the row if it's free or its holder's lease expired
+                cursor = self._conn.execute(
+                    "INSERT INTO namespace_leases (namespace, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (namespace) DO UPDATE SET owner = excluded.owner, "
+                    "expires_at = excluded.expires_at WHERE namespace_leases.expires_at < ?",
+                    (namespace, owner, now + self.lease_seconds, now),
+                )
+        return cursor.rowcount == 1
+
+    def _renew_lease(self, namespace: str, owner: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE namespace_leases SET expires_at = ? WHERE namespace = ? AND owner = ?",
+                    (self.clock() + self.lease_seconds, namespace, owner),
+                )
+
+    def get(self, namespace: str) -> Tuple[int, Dict[str, Position]]:
+        """Returns (version, {id: Position}); version 0 if never ingested."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM document_versions WHERE namespace = ?", (namespace,)
+            ).fetchone()
+            chunks = self._conn.execute(
+                "SELECT id, page_number, chunk_index, page_end, duplicate_pages "
+                "FROM document_chunks WHERE namespace = ?",
+                (namespace,),
+            ).fetchall()
+        return (row[0] if row else 0), {chunk_id: tuple(position) for chunk_id, *position in chunks}
+
+    def replace(self, namespace: str, version: int, chunks: Dict[str, Position]) -> None:
+        """Store the manifest of a new version, replacing the previous one."""
+        with self._lock:
+            with self._conn:  # One transaction: readers never see a half-written manifest
+                self._conn.execute("DELETE FROM document_chunks WHERE namespace = ?", (namespace,))
+                self._conn.executemany(
+                    "INSERT INTO document_chunks (namespace, id, page_number, chunk_index, page_end, "
+                    "duplicate_pages) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(namespace, chunk_id, *position) for chunk_id, position in chunks.items()],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO document_versions (namespace, version, updated_at) VALUES (?, ?, ?)",
+                    (namespace, version, time.time()),
+                )
+
+
+def content_ids(namespace: str, texts: List[str]) -> List[str]:
+    """
+    Stable chunk IDs derived from chunk text.
+
+    The same text gets the same ID in every version, regardless of where it
+    moved in the document. Repeated texts within one document get an
+    occurrence suffix so IDs stay unique.
+    """
+    seen: Dict[str, int] = {}
+    ids = []
+    for text in texts:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(f"{namespace}-{digest}" + (f"-{occurrence}" if occurrence else ""))
+    return ids
+
+
+def get_version_store() -> VersionStore:
+    """Return the process-wide version store (DOCUMENT_VERSIONS_PATH)."""
+    return store_from_env("DOCUMENT_VERSIONS_PATH", VersionStore, default="./document_versions.sqlite3")
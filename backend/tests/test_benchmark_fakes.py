@@ -0,0 +1,49 @@
+"""
+Test script for the benchmark fakes' error injection
+Runs offline - no providers involved
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fakes import FakeEmbeddingService, FakeProviderError, FakeVectorAdapter
+from services.resilience import CircuitBreaker, ResilientCaller
+
+
+def _failures(fake, calls):
+    failed = []
+    for i in range(calls):
+        try:
+            fake.generate_embeddings([f"text {i}"])
+        except FakeProviderError:
+            failed.append(i)
+    return failed
+
+
+def test_error_injection_is_seeded():
+    first = _failures(FakeEmbeddingService(dimensions=4, latency=0, error_rate=0.3, seed=7), 50)
+    second = _failures(FakeEmbeddingService(dimensions=4, latency=0, error_rate=0.3, seed=7), 50)
+
+    assert first == second
+    assert 0 < len(first) < 50
+
+
+def test_injected_errors_are_retried_with_resilience():
+    caller = ResilientCaller(
+        "fake", max_attempts=10, breaker=CircuitBreaker(failure_threshold=100), sleep=lambda seconds: None
+    )
+    adapter = FakeVectorAdapter(latency=0, error_rate=0.3, seed=1, resilience=caller)
+
+    for i in range(20):
+        adapter.upsert([[0.0]], [{}], "ns", [f"id-{i}"])
+
+    assert adapter.upserted == 20
+    assert adapter.error_count > 0 and caller.retries == adapter.error_count
+
+
+if __name__ == "__main__":
+    test_error_injection_is_seeded()
+    test_injected_errors_are_retried_with_resilience()
+    print("✓ All benchmark fake tests passed!")
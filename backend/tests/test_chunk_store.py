@@ -0,0 +1,83 @@
+"""
+Test script for the chunk store (chunk text kept outside vector metadata)
+Runs offline - fake embeddings, in-memory adapter and a temporary SQLite file
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fakes import FakeEmbeddingService
+from benchmarks.pdf_corpus import make_pdf
+from adapters import LocalVectorAdapter
+from services.chunk_store import ChunkStore
+from services.ingestion import IngestionPipeline
+from services.pdf_processor import PDFProcessor
+from services.search import SearchService
+
+
+def _store():
+    return ChunkStore(str(Path(tempfile.mkdtemp()) / "chunks.sqlite3"))
+
+
+def test_compact_metadata_and_text_in_store():
+    store = _store()
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp())
+    pipeline = IngestionPipeline(
+        PDFProcessor(), FakeEmbeddingService(dimensions=8, latency=0), adapter, chunk_store=store
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result = pipeline.ingest(make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=3), "doc.pdf")
+    namespace = result["namespace"]
+
+    # Vector metadata holds only the filterable fields
+    stored = adapter.query([1.0] * 8, top_k=100, namespace=namespace)
+    assert len(stored) == result["vectors_stored"]
+    assert set(stored[0]["metadata"]) == {"filename", "page_number", "chunk_index"}
+
+    texts = store.get_texts([match["id"] for match in stored])
+    assert len(texts) == len(stored) and all(texts.values())
+    assert store.get_document(namespace)["total_chunks"] == result["chunks_created"]
+
+
+def test_search_rehydrates_text_from_store():
+    store = _store()
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp())
+    embeddings = FakeEmbeddingService(dimensions=8, latency=0)
+    pipeline = IngestionPipeline(PDFProcessor(), embeddings, adapter, chunk_store=store)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        namespace = pipeline.ingest(make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=2), "doc.pdf")["namespace"]
+
+    service = SearchService(embeddings, adapter, chunk_store=store)
+    result = asyncio.run(service.search("anything", namespace, top_k=3))
+
+    metadata = result["matches"][0]["metadata"]
+    assert metadata["text"] == store.get_texts([result["matches"][0]["id"]])[result["matches"][0]["id"]]
+    assert metadata["filename"] == "doc.pdf"
+    assert "upload_timestamp" in metadata and "total_chunks" in metadata
+
+
+def test_streaming_mode_records_document_total():
+    store = _store()
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp())
+    pipeline = IngestionPipeline(
+        PDFProcessor(), FakeEmbeddingService(dimensions=8, latency=0), adapter,
+        streaming=True, stream_batch_size=2, chunk_store=store
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=3)
+        result = asyncio.run(pipeline.ingest_async(pdf_path, "doc.pdf"))
+
+    assert store.get_document(result["namespace"])["total_chunks"] == result["chunks_created"]
+
+
+if __name__ == "__main__":
+    test_compact_metadata_and_text_in_store()
+    test_search_rehydrates_text_from_store()
+    test_streaming_mode_records_document_total()
+    print("✓ All chunk store tests passed!")
@@ -0,0 +1,87 @@
+"""
+Test script for the native single-pass chunker
+Runs offline - compares against LangChain's splitter on generated PDF text
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.pdf_corpus import make_pdf
+from services.chunker import TextChunker, count_tokens
+from services.ingestion import build_metadata
+from services.pdf_processor import PDFProcessor
+
+
+def _pages(count):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        return PDFProcessor().extract_text_with_pages(make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=count))
+
+
+def test_matches_langchain_on_paragraphs():
+    text = "\n\n".join(("word " * 30).strip() for _ in range(20))
+    for chunk_size, chunk_overlap in [(400, 100), (400, 200), (100, 30)]:
+        expected = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ).split_text(text)
+        assert TextChunker(chunk_size, chunk_overlap).split_text(text) == expected
+
+
+def test_respects_size_and_overlap_on_pdf_text():
+    page = _pages(1)[0]["text"]
+    chunks = TextChunker(chunk_size=500, chunk_overlap=200).split_text(page)
+
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    # Consecutive chunks share up to chunk_overlap characters of whole lines
+    for previous, current in zip(chunks, chunks[1:]):
+        overlap = max(k for k in range(len(current) + 1) if previous.endswith(current[:k]))
+        assert 0 < overlap <= 200
+        assert previous[-overlap - 1] == "\n"
+
+
+def test_across_pages_matches_whole_document_and_records_spans():
+    pages = _pages(4)
+    chunker = TextChunker(across_pages=True)
+
+    chunks = list(chunker.iter_chunks(pages))
+    whole = TextChunker().split_text("\n".join(page["text"].strip() for page in pages))
+
+    assert [text for _, _, text in chunks] == whole
+    assert any(page_end > page_number for page_number, page_end, _ in chunks)
+
+
+def test_token_length_keeps_chunks_under_token_limit():
+    page = _pages(1)[0]["text"]
+    chunks = TextChunker(chunk_size=64, chunk_overlap=16, length="tokens").split_text(page)
+    assert chunks and all(count_tokens(chunk) <= 64 + 1 for chunk in chunks)
+
+
+def test_processor_selects_native_chunker():
+    pages = _pages(3)
+    processor = PDFProcessor(chunker="native", chunk_across_pages=True)
+
+    chunks = processor.chunk_text(pages)
+    _, metadata = build_metadata(chunks, "doc.pdf", "doc.pdf-1")
+
+    assert [chunk.chunk_index for chunk in chunks] == list(range(len(chunks)))
+    assert any("page_end" in fields and fields["page_end"] > fields["page_number"] for fields in metadata)
+
+    try:
+        PDFProcessor(chunker="langchain", chunk_across_pages=True)
+        assert False, "across pages should require the native chunker"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_matches_langchain_on_paragraphs()
+    test_respects_size_and_overlap_on_pdf_text()
+    test_across_pages_matches_whole_document_and_records_spans()
+    test_token_length_keeps_chunks_under_token_limit()
+    test_processor_selects_native_chunker()
+    print("✓ All chunker tests passed!")
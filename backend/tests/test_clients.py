@@ -0,0 +1,91 @@
+"""
+Test script for app-scoped clients and the cached health check
+Runs offline - uses fake embedding and vector database services
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from services.clients import AppClients, get_clients
+
+
+class CountingAdapter(FakeVectorAdapter):
+    def __init__(self):
+        super().__init__(latency=0)
+        self.health_checks = 0
+
+    def health_check(self):
+        self.health_checks += 1
+        return True
+
+
+def test_clients_are_created_once():
+    created = []
+
+    def make_adapter():
+        created.append(1)
+        return CountingAdapter()
+
+    clients = AppClients(embedding_factory=lambda: FakeEmbeddingService(latency=0), adapter_factory=make_adapter)
+
+    assert clients.pipeline() is clients.pipeline()
+    assert clients.vector_adapter() is clients.pipeline().vector_adapter
+    assert len(created) == 1
+
+
+def test_failed_creation_is_retried():
+    attempts = []
+
+    def make_embeddings():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("OPENAI_API_KEY environment variable not set")
+        return FakeEmbeddingService(latency=0)
+
+    clients = AppClients(embedding_factory=make_embeddings, adapter_factory=CountingAdapter)
+    clients.start()  # Logs the failure instead of raising
+
+    assert clients.pipeline() is not None
+    assert len(attempts) == 2
+
+
+def test_health_check_is_cached():
+    now = [0.0]
+    adapter = CountingAdapter()
+    clients = AppClients(adapter_factory=lambda: adapter, health_ttl=5, clock=lambda: now[0])
+
+    main.app.dependency_overrides[get_clients] = lambda: clients
+    try:
+        client = TestClient(main.app)
+        for _ in range(3):
+            assert client.get("/api/health").json()["vector_db_connected"] is True
+        assert adapter.health_checks == 1
+
+        now[0] = 6.0
+        client.get("/api/health")
+        assert adapter.health_checks == 2
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def test_health_reports_client_errors():
+    def broken():
+        raise ValueError("PINECONE_API_KEY environment variable not set")
+
+    health = AppClients(adapter_factory=broken).health()
+    assert health["vector_db_connected"] is False
+    assert "PINECONE_API_KEY" in health["error"]
+
+
+if __name__ == "__main__":
+    test_clients_are_created_once()
+    test_failed_creation_is_retried()
+    test_health_check_is_cached()
+    test_health_reports_client_errors()
+    print("✓ All client tests passed!")
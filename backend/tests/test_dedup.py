@@ -0,0 +1,159 @@
+"""
+Test script for chunk deduplication
+Runs offline - uses in-memory embedding/vector fakes and a temporary index file
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from services.dedup import ChunkDeduplicator, DedupIndex, minhash
+from services.ingestion import IngestionPipeline
+from services.pdf_processor import Chunk, PDFProcessor
+
+
+BOILERPLATE = (
+    "This document is confidential and intended solely for the use of the individual "
+    "or entity to whom it is addressed. If you have received it in error please notify "
+    "the sender immediately and delete it from your system. Revision {revision}."
+)
+HEADER = "ACME Corp - Annual Report"
+
+
+class CountingEmbeddings(FakeEmbeddingService):
+    """Counts every text sent for embedding."""
+
+    def __init__(self):
+        super().__init__(dimensions=8, latency=0)
+        self.texts_embedded = 0
+
+    def generate_embeddings(self, texts, on_batch=None):
+        self.texts_embedded += len(texts)
+        return super().generate_embeddings(texts, on_batch)
+
+
+class RecordingAdapter(FakeVectorAdapter):
+    def __init__(self):
+        super().__init__(latency=0)
+        self.metadata = []
+
+    def upsert(self, vectors, metadata, namespace, ids):
+        self.metadata.extend(metadata)
+        return super().upsert(vectors, metadata, namespace, ids)
+
+
+class PagesProcessor(PDFProcessor):
+    """Serves fixed page texts instead of parsing a PDF, one chunk per paragraph."""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def extract_text_with_pages(self, pdf_path, executor=None):
+        return [{"page_number": i + 1, "text": text} for i, text in enumerate(self.pages)]
+
+    def chunk_text(self, pages_data):
+        paragraphs = [
+            (page["page_number"], text) for page in pages_data for text in page["text"].split("\n\n")
+        ]
+        return [Chunk(page, index, text) for index, (page, text) in enumerate(paragraphs)]
+
+
+def _report_pages(bodies, first_revision=0):
+    # Each page chunks into: header, unique body, boilerplate footer with a changing revision number
+    return [
+        f"{HEADER}\n\n{body}\n\n" + BOILERPLATE.format(revision=i)
+        for i, body in enumerate(bodies, start=first_revision)
+    ]
+
+
+def test_exact_and_near_duplicates_collapse_within_document():
+    chunks = [
+        Chunk(1, 0, HEADER),
+        Chunk(1, 1, BOILERPLATE.format(revision=1)),
+        Chunk(2, 2, HEADER),
+        Chunk(2, 3, "Revenue grew in every region this year, led by strong demand for widgets."),
+        Chunk(3, 4, "  ACME Corp -   Annual Report "),
+        Chunk(3, 5, BOILERPLATE.format(revision=2)),
+    ]
+
+    exact = ChunkDeduplicator().dedupe([Chunk(c.page_number, c.chunk_index, c.text) for c in chunks])
+    assert [c.chunk_index for c in exact] == [0, 1, 3, 5]
+    assert exact[0].duplicate_pages == [2, 3]
+
+    near = ChunkDeduplicator(near_duplicates=True).dedupe(chunks)
+    assert [c.chunk_index for c in near] == [0, 1, 3]
+    assert near[1].duplicate_pages == [3], "Near-duplicate footer should point at its page"
+
+    # Short texts are never near-matched, only exact
+    assert minhash(HEADER) is None
+
+
+def test_pipeline_embeds_and_stores_each_text_once():
+    pages = _report_pages([f"Section {i} covers the results of division number {i} in considerable detail." for i in range(5)])
+    embeddings, adapter = CountingEmbeddings(), RecordingAdapter()
+    pipeline = IngestionPipeline(
+        PagesProcessor(pages), embeddings, adapter,
+        chunk_store=None, deduplicator=ChunkDeduplicator(near_duplicates=True)
+    )
+
+    result = pipeline.ingest("unused.pdf", "report.pdf")
+
+    # One header, one footer and five bodies survive out of 15 chunks
+    assert result["duplicates_skipped"] == 8
+    assert result["vectors_stored"] == result["chunks_created"] == 7
+    assert embeddings.texts_embedded == 7
+    header = next(m for m in adapter.metadata if m["text"] == HEADER)
+    assert header["page_number"] == 1
+    assert header["duplicate_pages"] == ["2", "3", "4", "5"]
+
+
+def test_corpus_index_reuses_embeddings_across_documents():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = DedupIndex(os.path.join(tmp_dir, "dedup.sqlite3"))
+        embeddings = CountingEmbeddings()
+
+        def ingest(bodies, filename, first_revision):
+            pipeline = IngestionPipeline(
+                PagesProcessor(_report_pages(bodies, first_revision)), embeddings, RecordingAdapter(),
+                chunk_store=None, deduplicator=ChunkDeduplicator(near_duplicates=True, index=index)
+            )
+            return pipeline.ingest("unused.pdf", filename)
+
+        first = ingest(["Quarterly sales rose sharply across all of our regional markets this year."], "q1.pdf", 1)
+        embedded_first = embeddings.texts_embedded
+
+        # Shared header and near-identical footer are reused; only the new body is embedded
+        second = ingest(["Staff headcount was flat while most hiring plans were moved to next year."], "q2.pdf", 2)
+        assert embeddings.texts_embedded - embedded_first == 1
+        assert second["vectors_stored"] == first["vectors_stored"], "Every document keeps a complete namespace"
+        index.close()
+
+
+
+def test_index_adds_bands_for_new_texts_in_mixed_batch():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = DedupIndex(os.path.join(tmp_dir, "dedup.sqlite3"))
+        known = "Quarterly sales rose sharply across all of our regional markets this year."
+        new = "Staff headcount was flat while most hiring plans were moved to next year as budgets tightened."
+        index.add([known], [[1.0, 0.0]], "model")
+
+        # One text already indexed must not stop the other's bands being stored
+        index.add([known, new], [[1.0, 0.0], [0.0, 1.0]], "model")
+
+        near = new.replace("tightened", "tightened again")
+        found = index.lookup([near], "model", threshold=0.5)
+        assert 0 in found and list(found[0]) == [0.0, 1.0]
+        index.close()
+
+
+if __name__ == "__main__":
+    test_exact_and_near_duplicates_collapse_within_document()
+    test_pipeline_embeds_and_stores_each_text_once()
+    test_corpus_index_reuses_embeddings_across_documents()
+    test_index_adds_bands_for_new_texts_in_mixed_batch()
+    print("✓ All deduplication tests passed!")
@@ -0,0 +1,123 @@
+"""
+Test script for EmbeddingService batching
+Runs offline - replaces the OpenAI client with a fake that records requests
+"""
+import base64
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from services.batching import make_batches
+from services.embeddings import EmbeddingService
+
+
+class FakeEmbeddingsAPI:
+    """Embeds each text as [len(text)] (base64 float32, like the real API) and tracks peak concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.dimensions = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, input, dimensions=None, encoding_format="float"):
+        with self._lock:
+            self.calls.append(list(input))
+            self.dimensions.append(dimensions)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+
+        # Return items out of order to check reassembly by index
+        assert encoding_format == "base64"
+        data = [
+            SimpleNamespace(index=i, embedding=base64.b64encode(np.float32([len(t)]).tobytes()).decode())
+            for i, t in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def _service(fake_api, max_concurrency=4, dimensions=None):
+    # Set a dummy key only while constructing, so other test scripts still see the real env
+    original_key = os.environ.get("OPENAI_API_KEY")
+    os.environ["OPENAI_API_KEY"] = original_key or "test-key"
+    try:
+        service = EmbeddingService(max_concurrency=max_concurrency, dimensions=dimensions)
+    finally:
+        if original_key is None:
+            del os.environ["OPENAI_API_KEY"]
+    service.client = SimpleNamespace(embeddings=fake_api)
+    return service
+
+
+def test_make_batches_respects_input_limit():
+    batches = make_batches(["a"] * 5000, lambda t: 1, max_items=2048, max_size=300_000)
+    assert batches == [(0, 2048), (2048, 4096), (4096, 5000)]
+
+
+def test_make_batches_respects_token_limit():
+    batches = make_batches(["x"] * 10, lambda t: 40, max_items=2048, max_size=100)
+    assert batches == [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10)]
+
+
+def test_oversized_single_input_gets_own_batch():
+    batches = make_batches(["small", "huge", "small"], len, max_items=2048, max_size=4)
+    assert batches == [(0, 1), (1, 2), (2, 3)]
+
+
+def test_results_keep_input_order_across_batches():
+    fake_api = FakeEmbeddingsAPI()
+    service = _service(fake_api)
+    texts = ["x" * (i % 50 + 1) for i in range(5000)]
+
+    embeddings = service.generate_embeddings(texts)
+
+    assert len(fake_api.calls) == 3
+    assert embeddings == [[float(len(t))] for t in texts]
+
+
+def test_batches_run_concurrently_up_to_cap():
+    fake_api = FakeEmbeddingsAPI(delay=0.05)
+    service = _service(fake_api, max_concurrency=2)
+
+    service.generate_embeddings(["text"] * (2048 * 4))
+
+    assert len(fake_api.calls) == 4
+    assert fake_api.peak_in_flight == 2
+
+
+def test_dimensions_are_sent_to_the_api_and_validated():
+    fake_api = FakeEmbeddingsAPI()
+    service = _service(fake_api, dimensions=512)
+
+    service.generate_embeddings(["text"])
+    assert fake_api.dimensions == [512]
+
+    try:
+        _service(fake_api, dimensions=4096)
+    except ValueError as e:
+        assert "EMBEDDING_DIMENSIONS" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    test_make_batches_respects_input_limit()
+    test_make_batches_respects_token_limit()
+    test_oversized_single_input_gets_own_batch()
+    test_results_keep_input_order_across_batches()
+    test_batches_run_concurrently_up_to_cap()
+    test_dimensions_are_sent_to_the_api_and_validated()
+    print("✓ All batching tests passed!")
@@ -0,0 +1,65 @@
+"""
+Test script for EmbeddingCache
+Runs offline against a temporary SQLite file
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.embedding_cache import EmbeddingCache
+
+
+def _cache(**kwargs):
+    path = Path(tempfile.mkdtemp()) / "cache.sqlite3"
+    return EmbeddingCache(str(path), **kwargs)
+
+
+def test_round_trip_and_counters():
+    cache = _cache()
+    cache.put_many("model", ["alpha", "beta"], [[0.5, 1.0], [0.25, -2.0]])
+
+    results = cache.get_many("model", ["alpha", "gamma", "beta"])
+
+    assert [None if r is None else r.tolist() for r in results] == [[0.5, 1.0], None, [0.25, -2.0]]
+    assert results[0].dtype == "float32"
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["entries"] == 2
+
+
+def test_keys_are_model_specific():
+    cache = _cache()
+    cache.put_many("model-a", ["text"], [[1.0]])
+
+    assert cache.get_many("model-b", ["text"]) == [None]
+
+
+def test_disk_tier_survives_reopen():
+    cache = _cache(memory_entries=0)
+    cache.put_many("model", ["persisted"], [[3.0]])
+    cache.close()
+
+    reopened = EmbeddingCache(cache.path)
+    assert reopened.get_many("model", ["persisted"]) == [[3.0]]
+
+
+def test_eviction_drops_least_recently_used():
+    cache = _cache(max_entries=2, memory_entries=0)
+    cache.put_many("model", ["old"], [[1.0]])
+    cache.put_many("model", ["newer"], [[2.0]])
+    cache.get_many("model", ["old"])  # Touch "old" so "newer" is now least recent
+    cache.put_many("model", ["newest"], [[3.0]])
+
+    assert cache.get_many("model", ["old", "newer", "newest"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["entries"] == 2
+
+
+if __name__ == "__main__":
+    test_round_trip_and_counters()
+    test_keys_are_model_specific()
+    test_disk_tier_survives_reopen()
+    test_eviction_drops_least_recently_used()
+    print("✓ All embedding cache tests passed!")
@@ -0,0 +1,149 @@
+"""
+Test script for pluggable embedding providers
+Runs offline - uses the deterministic hashing provider and the local NumPy vector store
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from adapters import LocalVectorAdapter
+from benchmarks.fakes import FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+from services import local_embeddings
+from services.embeddings import HashingEmbeddingService, create_embedding_service
+from services.ingestion import create_pipeline
+from services.search import SearchService
+
+
+class FixedIndexAdapter(FakeVectorAdapter):
+    def __init__(self, dimension):
+        super().__init__(latency=0)
+        self.dimension = dimension
+
+    def index_dimension(self):
+        return self.dimension
+
+
+def test_hashing_provider_is_deterministic_and_similarity_aware():
+    service = HashingEmbeddingService(dimensions=64)
+    texts = [
+        "Quarterly revenue grew in every region",
+        "Revenue grew in every region this quarter",
+        "The cafeteria menu changes on Mondays",
+    ]
+
+    progress = []
+    service.max_batch_inputs = 2
+    first = service.generate_embeddings(texts, on_batch=progress.append)
+    second = HashingEmbeddingService(dimensions=64).generate_embeddings(texts)
+
+    assert all(np.array_equal(a, b) for a, b in zip(first, second)), "Same text, same vector"
+    assert all(v.dtype == np.float32 and v.shape == (64,) for v in first)
+    assert np.allclose([np.linalg.norm(v) for v in first], 1.0)
+    assert first[0] @ first[1] > first[0] @ first[2], "Shared words score higher"
+    assert progress == [2, 3], "Batches of max_batch_inputs report running counts"
+
+
+def test_provider_selected_by_config():
+    original = os.environ.get("EMBEDDING_PROVIDER")
+    os.environ["EMBEDDING_PROVIDER"] = "hashing"
+    try:
+        assert isinstance(create_embedding_service(), HashingEmbeddingService)
+    finally:
+        if original is None:
+            del os.environ["EMBEDDING_PROVIDER"]
+        else:
+            os.environ["EMBEDDING_PROVIDER"] = original
+
+    try:
+        create_embedding_service("word2vec")
+        raise AssertionError("Unknown provider should be rejected")
+    except ValueError as e:
+        assert "EMBEDDING_PROVIDER" in str(e)
+
+    if local_embeddings.SentenceTransformer is None:
+        try:
+            create_embedding_service("local")
+            raise AssertionError("Local provider needs sentence-transformers installed")
+        except ValueError as e:
+            assert "sentence-transformers" in str(e)
+
+
+class WordTokenizer:
+    """One token per word, standing in for the model's tokenizer."""
+
+    def encode(self, text, add_special_tokens=True):
+        return text.split()
+
+    def decode(self, ids):
+        return " ".join(ids)
+
+
+class WindowRecordingModel:
+    """Records what the model is asked to encode; one hashed vector per input."""
+
+    def __init__(self):
+        self.inputs = []
+
+    def encode(self, texts, **kwargs):
+        self.inputs.extend(texts)
+        return np.stack(HashingEmbeddingService(dimensions=16).generate_embeddings(texts))
+
+
+def test_local_provider_splits_chunks_past_max_seq_length():
+    # Built without sentence-transformers: only the windowing around the model is under test
+    service = local_embeddings.LocalEmbeddingService.__new__(local_embeddings.LocalEmbeddingService)
+    service._model, service._tokenizer = WindowRecordingModel(), WordTokenizer()
+    service.max_seq_length, service.max_batch_inputs = 12, 64
+
+    short = "a short chunk"
+    long = " ".join(f"word{i}" for i in range(25))
+    vectors = service._embed_batch([short, long])
+
+    # 10 tokens per window (12 minus [CLS]/[SEP]): the long chunk is fully read, not truncated
+    assert service._model.inputs[0] == short
+    assert [len(window.split()) for window in service._model.inputs[1:]] == [10, 10, 5]
+    assert vectors.shape == (2, 16)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert service.count_tokens(long) == 25
+
+
+def test_dimensions_checked_against_vector_index():
+    try:
+        create_pipeline(HashingEmbeddingService(dimensions=32), FixedIndexAdapter(dimension=64))
+        raise AssertionError("Dimension mismatch should fail fast")
+    except ValueError as e:
+        assert "(32)" in str(e) and "(64)" in str(e)
+
+    assert create_pipeline(HashingEmbeddingService(dimensions=64), FixedIndexAdapter(dimension=64))
+
+
+def test_offline_ingest_and_search():
+    embeddings = HashingEmbeddingService(dimensions=64)
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp())
+    pipeline = create_pipeline(embeddings, adapter)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=2)
+        result = pipeline.ingest(pdf_path, "doc.pdf")
+        chunk = pipeline.pdf_processor.process_pdf(pdf_path)[1]
+
+    # No network anywhere: a chunk's own text finds that chunk first
+    search = SearchService(embeddings, adapter, chunk_store=None)
+    found = asyncio.run(search.search(chunk.text, result["namespace"], top_k=3))
+    assert found["matches"][0]["metadata"]["chunk_index"] == chunk.chunk_index
+
+
+if __name__ == "__main__":
+    test_hashing_provider_is_deterministic_and_similarity_aware()
+    test_provider_selected_by_config()
+    test_local_provider_splits_chunks_past_max_seq_length()
+    test_dimensions_checked_against_vector_index()
+    test_offline_ingest_and_search()
+    print("✓ All embedding provider tests passed!")
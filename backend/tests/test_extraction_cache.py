@@ -0,0 +1,123 @@
+"""
+Test script for the page extraction cache
+Runs offline - generates PDFs and uses in-memory embedding/vector fakes
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+from services.extraction_cache import ExtractionCache
+from services.ingestion import IngestionPipeline
+from services.pdf_processor import PDFProcessor
+
+
+class CountingProcessor(PDFProcessor):
+    """Counts how often a PDF is actually parsed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.parses = 0
+
+    def iter_pages(self, pdf_path, start=0, end=None):
+        self.parses += 1
+        return super().iter_pages(pdf_path, start, end)
+
+
+def _cache(**kwargs):
+    path = Path(tempfile.mkdtemp()) / "extraction.sqlite3"
+    return ExtractionCache(str(path), **kwargs)
+
+
+def test_repeat_extraction_skips_parsing():
+    cache = _cache()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=3)
+
+        first = CountingProcessor(extraction_cache=cache)
+        pages = first.extract_text_with_pages(pdf_path)
+
+        # Same bytes under another name, chunked with different settings
+        copy_path = shutil.copy(pdf_path, os.path.join(tmp_dir, "copy.pdf"))
+        rechunk = CountingProcessor(chunk_size=300, chunk_overlap=0, extraction_cache=cache)
+        assert rechunk.extract_text_with_pages(copy_path) == pages
+        assert first.parses == 1 and rechunk.parses == 0
+
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+        # Different content is a different key
+        other_path = make_pdf(os.path.join(tmp_dir, "other.pdf"), pages=4)
+        assert cache.key(other_path) != cache.key(pdf_path)
+
+
+def test_least_recently_used_evicted_over_size_limit():
+    pages = [{"page_number": 1, "text": "x"}]
+    size = len(zlib.compress(b'[{"page_number": 1, "text": "x"}]'))
+    cache = _cache(max_bytes=size * 2)
+
+    cache.put("a", pages)
+    cache.put("b", pages)
+    assert cache.get("a") == pages  # "b" is now least recently used
+    cache.put("c", pages)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == pages and cache.get("c") == pages
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] <= size * 2
+
+
+def test_size_bound_holds_across_processes_sharing_the_file():
+    pages = [{"page_number": 1, "text": "x"}]
+    size = len(zlib.compress(b'[{"page_number": 1, "text": "x"}]'))
+    path = str(Path(tempfile.mkdtemp()) / "extraction.sqlite3")
+    # Two handles on one file, as the API and worker processes would have
+    first = ExtractionCache(path, max_bytes=size * 2)
+    second = ExtractionCache(path, max_bytes=size * 2)
+
+    first.put("a", pages)
+    first.put("b", pages)
+    second.put("c", pages)  # Evicts "a", which only the first handle wrote
+    first.put("d", pages)  # Must see that "a" is gone
+
+    assert first.stats()["entries"] == second.stats()["entries"] == 2
+    assert first.stats()["bytes"] <= size * 2
+    assert first.get("c") == pages and first.get("d") == pages
+    first.close()
+    second.close()
+
+
+def test_async_and_streaming_pipelines_use_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=3)
+        for streaming in (False, True):
+            cache = _cache()
+            pipeline = IngestionPipeline(
+                PDFProcessor(extraction_cache=cache),
+                FakeEmbeddingService(dimensions=8, latency=0),
+                FakeVectorAdapter(latency=0),
+                streaming=streaming,
+                chunk_store=None,
+            )
+
+            first = asyncio.run(pipeline.ingest_async(pdf_path, "doc.pdf"))
+            second = asyncio.run(pipeline.ingest_async(pdf_path, "doc.pdf"))
+
+            assert first["chunks_created"] == second["chunks_created"] > 0
+            stats = cache.stats()
+            assert stats["hits"] == 1 and stats["misses"] == 1, f"streaming={streaming}: {stats}"
+
+
+if __name__ == "__main__":
+    test_repeat_extraction_skips_parsing()
+    test_least_recently_used_evicted_over_size_limit()
+    test_size_bound_holds_across_processes_sharing_the_file()
+    test_async_and_streaming_pipelines_use_cache()
+    print("✓ All extraction cache tests passed!")
@@ -0,0 +1,173 @@
+"""
+Test script for versioned (incremental) re-ingestion
+Runs offline - fake embeddings, local vector store and temporary SQLite files
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from adapters import LocalVectorAdapter
+from benchmarks.fakes import FakeEmbeddingService
+from services.dedup import ChunkDeduplicator
+from services.ingestion import IngestionPipeline
+from services.pdf_processor import PDFProcessor
+from services.versions import VersionStore, content_ids
+
+
+class PagesProcessor(PDFProcessor):
+    """Serves page text from a dict instead of parsing PDFs."""
+
+    def __init__(self, documents):
+        super().__init__(chunk_size=200, chunk_overlap=0)
+        self.documents = documents
+
+    def extract_text_with_pages(self, pdf_path, executor=None):
+        return [{"page_number": i + 1, "text": text} for i, text in enumerate(self.documents[pdf_path])]
+
+
+class CountingEmbeddings(FakeEmbeddingService):
+    def __init__(self):
+        super().__init__(dimensions=8, latency=0)
+        self.embedded = []
+
+    def generate_embeddings(self, texts, on_batch=None):
+        self.embedded.extend(texts)
+        return super().generate_embeddings(texts, on_batch)
+
+
+def _page(name):
+    return f"Section {name}. " + " ".join(f"{name}-word{i}" for i in range(20))
+
+
+def _pipeline(documents, deduplicator=None):
+    embeddings = CountingEmbeddings()
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp())
+    pipeline = IngestionPipeline(
+        PagesProcessor(documents), embeddings, adapter, versioned=True,
+        version_store=VersionStore(str(Path(tempfile.mkdtemp()) / "versions.sqlite3")),
+        deduplicator=deduplicator,
+    )
+    return pipeline, embeddings, adapter
+
+
+def _stored_ids(adapter, namespace):
+    return {match["id"] for match in adapter.query([1.0] * 8, top_k=1000, namespace=namespace)}
+
+
+def test_reupload_embeds_only_changes():
+    documents = {
+        "v1": [_page("a"), _page("b"), _page("c")],
+        "v2": [_page("a"), _page("b"), _page("c"), _page("d")],
+    }
+    pipeline, embeddings, adapter = _pipeline(documents)
+
+    first = pipeline.ingest("v1", "manual.pdf")
+    assert first["version"] == 1 and first["chunks_added"] == first["chunks_created"]
+    assert first["namespace"] == "manual.pdf"
+
+    embeddings.embedded.clear()
+    same = pipeline.ingest("v1", "manual.pdf")
+    assert same["version"] == 2 and same["chunks_unchanged"] == same["chunks_created"]
+    assert embeddings.embedded == []
+
+    embeddings.embedded.clear()
+    appended = pipeline.ingest("v2", "manual.pdf")
+    assert appended["chunks_added"] == appended["chunks_created"] - first["chunks_created"]
+    assert appended["chunks_removed"] == 0
+    assert all("d-word" in text for text in embeddings.embedded)
+    assert len(_stored_ids(adapter, "manual.pdf")) == appended["chunks_created"]
+
+
+def test_removed_chunks_are_deleted_and_moved_chunks_repositioned():
+    documents = {
+        "v1": [_page("a"), _page("b"), _page("c")],
+        "v2": [_page("c"), _page("a")],
+    }
+    pipeline, embeddings, adapter = _pipeline(documents)
+    pipeline.ingest("v1", "manual.pdf")
+
+    embeddings.embedded.clear()
+    result = pipeline.ingest("v2", "manual.pdf")
+
+    assert embeddings.embedded == []
+    assert result["chunks_added"] == 0
+    assert result["chunks_removed"] > 0 and result["chunks_moved"] > 0
+
+    matches = adapter.query([1.0] * 8, top_k=1000, namespace="manual.pdf")
+    assert len(matches) == result["chunks_created"]
+    assert not any("b-word" in match["metadata"]["text"] for match in matches)
+    # Page "c" moved from page 3 to page 1
+    assert {match["metadata"]["page_number"] for match in matches if "c-word" in match["metadata"]["text"]} == {1}
+
+
+def test_moved_chunks_keep_page_fields_current():
+    documents = {
+        "v1": [_page("a"), _page("b")],
+        "v2": [_page("a"), _page("b"), _page("a")],  # "a" now also on page 3
+    }
+    pipeline, embeddings, adapter = _pipeline(documents, deduplicator=ChunkDeduplicator())
+
+    def duplicate_pages():
+        matches = adapter.query([1.0] * 8, top_k=1000, namespace="manual.pdf")
+        return [match["metadata"].get("duplicate_pages") for match in matches if "a-word" in match["metadata"]["text"]]
+
+    pipeline.ingest("v1", "manual.pdf")
+    embeddings.embedded.clear()
+    gained = pipeline.ingest("v2", "manual.pdf")
+    assert gained["chunks_moved"] > 0 and embeddings.embedded == []
+    assert duplicate_pages() == [["3"]]
+
+    # Updates merge metadata, so dropping the field means re-upserting the chunk
+    embeddings.embedded.clear()
+    lost = pipeline.ingest("v1", "manual.pdf")
+    assert lost["chunks_moved"] > 0 and lost["chunks_added"] == 0
+    assert all("a-word" in text for text in embeddings.embedded) and embeddings.embedded
+    assert duplicate_pages() == [None]
+
+
+def test_namespace_lock_is_shared_across_processes():
+    path = str(Path(tempfile.mkdtemp()) / "versions.sqlite3")
+    # Separate stores on one file stand in for the API and a worker process
+    api, worker = VersionStore(path, poll_interval=0.01), VersionStore(path, poll_interval=0.01)
+    order = []
+
+    def reupload():
+        with worker.namespace_lock("manual.pdf"):
+            order.append("worker")
+
+    with api.namespace_lock("manual.pdf"):
+        thread = threading.Thread(target=reupload)
+        thread.start()
+        time.sleep(0.1)
+        order.append("api")
+    thread.join()
+    assert order == ["api", "worker"]
+
+    # A lease whose holder died is taken over once it expires
+    now = [1000.0]
+    dead = VersionStore(path, lease_seconds=30, clock=lambda: now[0])
+    assert dead._acquire_lease("other.pdf", "dead-process")
+    live = VersionStore(path, lease_seconds=30, clock=lambda: now[0])
+    assert not live._acquire_lease("other.pdf", "live-process")
+    now[0] += 31
+    assert live._acquire_lease("other.pdf", "live-process")
+
+
+def test_content_ids_are_stable_and_unique():
+    ids = content_ids("doc.pdf", ["same", "other", "same"])
+    assert ids[0] != ids[2] and ids[2].startswith(ids[0])
+    assert content_ids("doc.pdf", ["other"])[0] == ids[1]
+
+
+if __name__ == "__main__":
+    test_reupload_embeds_only_changes()
+    test_removed_chunks_are_deleted_and_moved_chunks_repositioned()
+    test_moved_chunks_keep_page_fields_current()
+    test_namespace_lock_is_shared_across_processes()
+    test_content_ids_are_stable_and_unique()
+    print("✓ All incremental ingestion tests passed!")
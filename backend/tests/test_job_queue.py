@@ -0,0 +1,200 @@
+"""
+Test script for the durable ingestion queue and worker
+Runs offline - generates a PDF and uses in-memory embedding/vector fakes
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+from services.ingestion import IngestionPipeline
+from services.job_queue import JobQueue
+from services.jobs import QueueFullError
+from services.pdf_processor import PDFProcessor
+from worker import run_job, run_worker
+
+
+class CrashingAdapter(FakeVectorAdapter):
+    """Raises on the given upsert call, standing in for a worker dying mid-document."""
+
+    def __init__(self, crash_on_call=None):
+        super().__init__(latency=0)
+        self.crash_on_call = crash_on_call
+        self.upsert_calls = 0
+
+    def upsert(self, vectors, metadata, namespace, ids):
+        self.upsert_calls += 1
+        if self.upsert_calls == self.crash_on_call:
+            raise RuntimeError("worker killed")
+        return super().upsert(vectors, metadata, namespace, ids)
+
+
+class DownAdapter(FakeVectorAdapter):
+    def __init__(self):
+        super().__init__(latency=0)
+
+    def upsert(self, vectors, metadata, namespace, ids):
+        raise RuntimeError("vector database down")
+
+
+def _pipeline(embeddings, adapter):
+    return IngestionPipeline(PDFProcessor(), embeddings, adapter, stream_batch_size=20)
+
+
+def _queue(tmp_dir, **kwargs):
+    return JobQueue(
+        os.path.join(tmp_dir, "queue.sqlite3"), spool_dir=os.path.join(tmp_dir, "spool"), **kwargs
+    )
+
+
+def _submit(queue, pages=12):
+    # Uploads are written beside the queue file, inside the test's temporary directory
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(queue.path), suffix=".pdf", delete=False) as upload:
+        pass
+    return queue.submit(make_pdf(upload.name, pages=pages), "doc.pdf")
+
+
+def test_crashed_job_resumes_from_checkpoint():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        now = [1000.0]
+        queue = _queue(tmp_dir, lease_seconds=30, clock=lambda: now[0])
+        job = _submit(queue)
+
+        # First worker embeds everything, stores one batch, then dies
+        embeddings = FakeEmbeddingService(dimensions=8, latency=0)
+        claimed = queue.claim("worker-1")
+        try:
+            _pipeline(embeddings, CrashingAdapter(crash_on_call=2)).ingest_resumable(
+                claimed["pdf_path"], claimed["filename"], queue.checkpoint(claimed["job_id"])
+            )
+        except RuntimeError:
+            pass
+        embed_calls = embeddings.call_count
+        assert queue.get(job.id)["status"] == "running"
+
+        # Lease still held - nobody else may take the job
+        assert queue.claim("worker-2") is None
+        now[0] += 31
+
+        adapter = CrashingAdapter()
+        resumed = queue.claim("worker-2")
+        assert resumed["job_id"] == job.id and resumed["attempts"] == 2
+        run_job(queue, _pipeline(embeddings, adapter), resumed, "worker-2")
+
+        result = queue.get(job.id)
+        assert result["status"] == "succeeded", result["error"]
+        assert embeddings.call_count == embed_calls, "Resumed job must not re-embed any batch"
+        assert result["stages"]["embed"]["batches_resumed"] > 0
+        assert result["stages"]["upsert"]["batches_resumed"] == 1
+        batches = -(-result["result"]["chunks_created"] // 20)
+        assert adapter.upsert_calls == batches - 1, "Only batches not yet stored are upserted"
+        assert result["result"]["vectors_stored"] == result["result"]["chunks_created"]
+
+        # Checkpoints and the spooled PDF are cleaned up
+        assert queue.checkpoint(job.id).load("pages") is None
+        assert not os.path.exists(job.pdf_path)
+        queue.close()
+
+
+def test_worker_runs_queued_jobs():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = _queue(tmp_dir)
+        jobs = [_submit(queue, pages=3) for _ in range(2)]
+        pipeline = _pipeline(FakeEmbeddingService(dimensions=8, latency=0), CrashingAdapter())
+
+        processed = run_worker(queue, pipeline_factory=lambda: pipeline, poll_interval=0, max_jobs=2)
+
+        assert processed == 2
+        for job in jobs:
+            state = queue.get(job.id)
+            assert state["status"] == "succeeded"
+            assert all(info["status"] == "completed" for info in state["stages"].values())
+        queue.close()
+
+
+def test_failing_job_retried_until_max_attempts():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = _queue(tmp_dir, max_attempts=2)
+        job = _submit(queue, pages=3)
+        pipeline = _pipeline(FakeEmbeddingService(dimensions=8, latency=0), CrashingAdapter(crash_on_call=1))
+
+        # Attempt 1 fails and is requeued; attempt 2 gets past the crash and succeeds
+        run_worker(queue, pipeline_factory=lambda: pipeline, poll_interval=0, max_jobs=1)
+        assert queue.get(job.id)["status"] == "queued"
+        run_worker(queue, pipeline_factory=lambda: pipeline, poll_interval=0, max_jobs=1)
+        assert queue.get(job.id)["status"] == "succeeded"
+
+        # A job that keeps failing gives up after max_attempts
+        job = _submit(queue, pages=3)
+        pipeline = _pipeline(FakeEmbeddingService(dimensions=8, latency=0), DownAdapter())
+        run_worker(queue, pipeline_factory=lambda: pipeline, poll_interval=0, max_jobs=2)
+        state = queue.get(job.id)
+        assert state["status"] == "failed" and state["attempts"] == 2
+        assert "vector database down" in state["error"]
+        assert state["stages"]["upsert"]["status"] == "failed"
+        queue.close()
+
+
+def test_worker_abandons_job_after_losing_lease():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        now = [1000.0]
+        # Heartbeats every 10ms of real time; lease expiry follows the fake clock
+        queue = _queue(tmp_dir, lease_seconds=0.03, clock=lambda: now[0])
+        job = _submit(queue, pages=3)
+
+        stalled = queue.claim("worker-1")
+        now[0] += 1
+        assert queue.claim("worker-2")["job_id"] == job.id
+
+        adapter = CrashingAdapter()
+        run_job(queue, _pipeline(FakeEmbeddingService(dimensions=8, latency=0.1), adapter), stalled, "worker-1")
+
+        # Worker 1 stopped at its next progress report and left the job to worker 2
+        state = queue.get(job.id)
+        assert state["status"] == "running" and state["attempts"] == 2
+        assert adapter.upsert_calls == 0
+        assert os.path.exists(job.pdf_path)
+        queue.close()
+
+
+def test_failed_submission_removes_spooled_file():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = _queue(tmp_dir)
+        queue._conn.execute("CREATE TRIGGER reject BEFORE INSERT ON jobs BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+        path = make_pdf(os.path.join(tmp_dir, "upload.pdf"), pages=1)
+        try:
+            queue.submit(path, "doc.pdf")
+            raise AssertionError("Expected the insert to fail")
+        except Exception as e:
+            assert "disk full" in str(e)
+        assert os.listdir(os.path.join(tmp_dir, "spool")) == []
+        queue.close()
+
+
+def test_full_queue_rejects_submission():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = _queue(tmp_dir, max_queue_size=1)
+        _submit(queue, pages=1)
+        path = make_pdf(os.path.join(tmp_dir, "b.pdf"), pages=1)
+        try:
+            queue.submit(path, "b.pdf")
+            raise AssertionError("Second job should be rejected while the queue is full")
+        except QueueFullError:
+            pass
+        assert os.path.exists(path), "A rejected upload stays with the caller"
+        queue.close()
+
+
+if __name__ == "__main__":
+    test_crashed_job_resumes_from_checkpoint()
+    test_worker_runs_queued_jobs()
+    test_failing_job_retried_until_max_attempts()
+    test_worker_abandons_job_after_losing_lease()
+    test_failed_submission_removes_spooled_file()
+    test_full_queue_rejects_submission()
+    print("✓ All durable queue tests passed!")
@@ -0,0 +1,104 @@
+"""
+Test script for the background ingestion JobManager
+Runs offline - uses a fake pipeline instead of OpenAI/Pinecone
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.jobs import JobManager, QueueFullError
+
+
+class FakePipeline:
+    """Reports every stage and returns a fixed result, or fails on request."""
+
+    async def ingest_async(self, pdf_path, filename, on_progress=None, process_pool=None):
+        if filename == "broken.pdf":
+            on_progress("extract", "running", {})
+            raise ValueError("corrupt PDF")
+
+        for stage in ("extract", "chunk", "embed", "upsert"):
+            on_progress(stage, "running", {})
+            on_progress(stage, "completed", {"count": 3})
+        return {"filename": filename, "chunks_created": 3, "vectors_stored": 3, "namespace": "ns"}
+
+
+def _temp_pdf() -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
+        return f.name
+
+
+async def _wait_until_finished(manager, job_id):
+    for _ in range(200):
+        job = manager.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_succeeds_and_reports_stages():
+    async def run():
+        manager = JobManager(pipeline_factory=FakePipeline, max_workers=2)
+        path = _temp_pdf()
+        job = manager.submit(path, "doc.pdf")
+
+        result = await _wait_until_finished(manager, job.id)
+        await manager.stop()
+        return path, result
+
+    path, job = asyncio.run(run())
+
+    assert job["status"] == "succeeded"
+    assert job["result"]["vectors_stored"] == 3
+    assert all(info["status"] == "completed" for info in job["stages"].values())
+    assert not os.path.exists(path), "Temp file should be removed after the job"
+
+
+def test_job_failure_is_recorded():
+    async def run():
+        manager = JobManager(pipeline_factory=FakePipeline, max_workers=1)
+        job = manager.submit(_temp_pdf(), "broken.pdf")
+        result = await _wait_until_finished(manager, job.id)
+        await manager.stop()
+        return result
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "failed"
+    assert "corrupt PDF" in job["error"]
+    assert job["stages"]["extract"]["status"] == "failed"
+    assert job["stages"]["upsert"]["status"] == "pending"
+
+
+def test_queue_full_rejects_submission():
+    async def run():
+        manager = JobManager(pipeline_factory=FakePipeline, max_workers=1, max_queue_size=1)
+        manager.submit(_temp_pdf(), "a.pdf")
+        try:
+            manager.submit(_temp_pdf(), "b.pdf")
+        except QueueFullError:
+            return True
+        finally:
+            await manager.stop()
+        return False
+
+    assert asyncio.run(run()), "Second job should be rejected while the queue is full"
+
+
+def test_unknown_job_returns_none():
+    manager = JobManager(pipeline_factory=FakePipeline)
+    assert manager.get("missing") is None
+
+
+if __name__ == "__main__":
+    test_job_succeeds_and_reports_stages()
+    test_job_failure_is_recorded()
+    test_queue_full_rejects_submission()
+    test_unknown_job_returns_none()
+    print("✓ All job manager tests passed!")
@@ -0,0 +1,212 @@
+"""
+Test script for LocalVectorAdapter
+Runs offline against a temporary data directory
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from adapters import LocalVectorAdapter
+
+
+def _random_vectors(count, dims=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dims)).astype(np.float32)
+
+
+def _metadata(count):
+    return [{"filename": f"doc-{i % 3}.pdf", "page_number": i % 5 + 1, "text": f"chunk {i}"} for i in range(count)]
+
+
+def test_exact_search_returns_nearest_first():
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp(), ann_threshold=0)
+    vectors = _random_vectors(100)
+    ids = [f"v{i}" for i in range(100)]
+    adapter.upsert(vectors.tolist(), _metadata(100), "docs", ids)
+
+    matches = adapter.query(vectors[42].tolist(), top_k=5, namespace="docs")
+
+    assert len(matches) == 5
+    assert matches[0]["id"] == "v42"
+    assert abs(matches[0]["score"] - 1.0) < 1e-5
+    assert [m["score"] for m in matches] == sorted((m["score"] for m in matches), reverse=True)
+
+
+def test_metadata_filter_and_overwrite():
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp(), ann_threshold=0)
+    vectors = _random_vectors(30)
+    adapter.upsert(vectors.tolist(), _metadata(30), "docs", [f"v{i}" for i in range(30)])
+
+    matches = adapter.query(vectors[0].tolist(), top_k=50, namespace="docs",
+                            filter={"filename": "doc-1.pdf", "page_number": {"$in": [2, 3]}})
+    assert matches and all(m["metadata"]["filename"] == "doc-1.pdf" for m in matches)
+    assert all(m["metadata"]["page_number"] in (2, 3) for m in matches)
+
+    # Re-upserting an ID replaces it rather than adding a row
+    adapter.upsert([vectors[1].tolist()], [{"filename": "new.pdf"}], "docs", ["v0"])
+    top = adapter.query(vectors[1].tolist(), top_k=2, namespace="docs")
+    assert {m["id"] for m in top} == {"v0", "v1"}
+    assert len(adapter.query(vectors[0].tolist(), top_k=100, namespace="docs")) == 30
+
+
+def test_filter_operators_match_pinecone():
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp(), ann_threshold=0)
+    vectors = _random_vectors(30)
+    adapter.upsert(vectors, _metadata(30), "docs", [f"v{i}" for i in range(30)])
+
+    def pages(filter):
+        return {m["metadata"]["page_number"] for m in adapter.query(vectors[0], 50, "docs", filter=filter)}
+
+    assert pages({"page_number": {"$gte": 4}}) == {4, 5}
+    assert pages({"page_number": {"$gt": 1, "$lt": 4}}) == {2, 3}
+    assert pages({"page_number": {"$ne": 1, "$nin": [2, 3]}}) == {4, 5}
+    assert pages({"$or": [{"page_number": {"$lte": 1}}, {"page_number": 5}]}) == {1, 5}
+    assert pages({"$and": [{"filename": "doc-0.pdf"}, {"page_number": {"$in": [1, 2]}}]}) == {1, 2}
+    assert pages({"duplicate_pages": {"$exists": True}}) == set()
+
+    try:
+        adapter.query(vectors[0], 50, "docs", filter={"page_number": {"$between": [1, 2]}})
+        raise AssertionError("Unsupported operator should be rejected")
+    except ValueError as e:
+        assert "$between" in str(e)
+
+
+def test_persists_and_reloads_memory_mapped():
+    data_dir = tempfile.mkdtemp()
+    vectors = _random_vectors(50)
+    LocalVectorAdapter(data_dir=data_dir).upsert(
+        vectors.tolist(), _metadata(50), "report.pdf-1234", [f"v{i}" for i in range(50)]
+    )
+
+    reopened = LocalVectorAdapter(data_dir=data_dir)
+    assert reopened.query(vectors[7].tolist(), top_k=1, namespace="report.pdf-1234")[0]["id"] == "v7"
+
+    # Writing after reload detaches from the read-only memmap
+    reopened.upsert([vectors[0].tolist()], [{}], "report.pdf-1234", ["extra"])
+    assert len(reopened.query(vectors[0].tolist(), top_k=100, namespace="report.pdf-1234")) == 51
+
+
+def test_small_upserts_append_to_journal():
+    for quantization in ("none", "int8"):
+        data_dir = tempfile.mkdtemp()
+        adapter = LocalVectorAdapter(data_dir=data_dir, quantization=quantization)
+        vectors = _random_vectors(200)
+        adapter.upsert(vectors[:100], _metadata(100), "docs", [f"v{i}" for i in range(100)])
+        namespace_dir = next(Path(data_dir).iterdir())
+        records_written = (namespace_dir / "records.json").stat().st_mtime_ns
+
+        # One vector at a time, as a slow trickle of uploads would: no snapshot rewrites
+        for i in range(100, 200):
+            adapter.upsert(vectors[i:i + 1], [{"text": f"chunk {i}"}], "docs", [f"v{i}"])
+        adapter.update_metadata(["v3"], [{"page_number": 99}], "docs")
+        assert (namespace_dir / "records.json").stat().st_mtime_ns == records_written
+        assert len(np.load(namespace_dir / "vectors-0.npy")) == 100
+
+        reopened = LocalVectorAdapter(data_dir=data_dir)
+        assert reopened.query(vectors[150], top_k=1, namespace="docs")[0]["id"] == "v150", quantization
+        assert len(reopened.query(vectors[0], top_k=500, namespace="docs")) == 200
+        assert reopened.query(vectors[3], top_k=1, namespace="docs")[0]["metadata"]["page_number"] == 99
+
+        # A delete compacts into a new snapshot and drops the old journal
+        reopened.delete(["v150"], "docs")
+        assert sorted(path.name for path in namespace_dir.iterdir()) == (
+            ["records.json", "scales-1.npy", "vectors-1.npy"] if quantization == "int8"
+            else ["records.json", "vectors-1.npy"]
+        )
+        assert len(LocalVectorAdapter(data_dir=data_dir).query(vectors[0], top_k=500, namespace="docs")) == 199
+
+
+def test_interrupted_snapshot_keeps_previous_generation():
+    data_dir = tempfile.mkdtemp()
+    adapter = LocalVectorAdapter(data_dir=data_dir)
+    vectors = _random_vectors(101)
+    adapter.upsert(vectors[:100], _metadata(100), "docs", [f"v{i}" for i in range(100)])
+    adapter.upsert(vectors[100:], [{"text": "chunk 100"}], "docs", ["v100"])  # Journaled
+
+    # Crash after the new arrays are written but before records.json switches to them
+    replace = os.replace
+
+    def crash_on_records(src, dst):
+        if str(dst).endswith("records.json"):
+            raise OSError("crashed")
+        replace(src, dst)
+
+    with mock.patch("os.replace", crash_on_records):
+        try:
+            adapter.delete(["v5"], "docs")
+            raise AssertionError("Expected the snapshot write to fail")
+        except OSError:
+            pass
+
+    reopened = LocalVectorAdapter(data_dir=data_dir)
+    for i in (0, 5, 50, 99, 100):
+        assert reopened.query(vectors[i], top_k=1, namespace="docs")[0]["id"] == f"v{i}"
+    assert len(reopened.query(vectors[0], top_k=500, namespace="docs")) == 101
+
+
+def test_ivf_index_finds_exact_neighbours():
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp(), ann_threshold=1000, nprobe=8)
+    vectors = _random_vectors(5000, dims=16)
+    adapter.upsert(vectors.tolist(), [{} for _ in range(5000)], "big", [f"v{i}" for i in range(5000)])
+
+    hits = sum(
+        adapter.query(vectors[i].tolist(), top_k=1, namespace="big")[0]["id"] == f"v{i}"
+        for i in range(0, 5000, 100)
+    )
+    assert hits >= 45, f"IVF recall@1 too low: {hits}/50"
+
+
+def test_unknown_namespace_returns_no_matches():
+    adapter = LocalVectorAdapter(data_dir=tempfile.mkdtemp())
+    assert adapter.query([0.1] * 8, top_k=3, namespace="missing") == []
+    assert adapter.health_check()
+
+
+def test_quantized_storage_keeps_nearest_neighbours():
+    vectors = _random_vectors(500, dims=64)
+    ids = [f"v{i}" for i in range(500)]
+
+    for quantization, min_hits in (("int8", 50), ("binary", 45)):
+        data_dir = tempfile.mkdtemp()
+        adapter = LocalVectorAdapter(data_dir=data_dir, ann_threshold=0, quantization=quantization)
+        adapter.upsert(vectors, [{} for _ in ids], "docs", ids)
+
+        # Reload from disk so the stored codes (not the inputs) are searched
+        reopened = LocalVectorAdapter(data_dir=data_dir, quantization="none")
+        hits = sum(
+            reopened.query(vectors[i], top_k=1, namespace="docs")[0]["id"] == f"v{i}"
+            for i in range(0, 500, 10)
+        )
+        assert hits >= min_hits, f"{quantization} recall@1 too low: {hits}/50"
+
+    stored = np.load(Path(data_dir) / next(Path(data_dir).iterdir()).name / "vectors-0.npy")
+    assert stored.dtype == np.uint8 and stored.shape == (500, 8)  # 64 sign bits per vector
+
+
+def test_rejects_unknown_quantization():
+    try:
+        LocalVectorAdapter(data_dir=tempfile.mkdtemp(), quantization="fp4")
+    except ValueError as e:
+        assert "LOCAL_VECTOR_QUANTIZATION" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    test_exact_search_returns_nearest_first()
+    test_metadata_filter_and_overwrite()
+    test_filter_operators_match_pinecone()
+    test_persists_and_reloads_memory_mapped()
+    test_small_upserts_append_to_journal()
+    test_interrupted_snapshot_keeps_previous_generation()
+    test_ivf_index_finds_exact_neighbours()
+    test_unknown_namespace_returns_no_matches()
+    test_quantized_storage_keeps_nearest_neighbours()
+    test_rejects_unknown_quantization()
+    print("✓ All local adapter tests passed!")
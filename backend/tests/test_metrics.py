@@ -0,0 +1,92 @@
+"""
+Test script for pipeline instrumentation and GET /metrics
+Runs offline - uses fake embeddings and a local vector store
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main
+from adapters import LocalVectorAdapter
+from benchmarks.fakes import FakeEmbeddingService
+from services import metrics
+from services.ingestion import IngestionPipeline
+from services.pdf_processor import PDFProcessor
+from services.resilience import ResilientCaller
+
+
+class PagesProcessor(PDFProcessor):
+    def extract_text_with_pages(self, pdf_path, executor=None):
+        return [{"page_number": i + 1, "text": f"Page {i} " + "word " * 200} for i in range(3)]
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test histogram", ("stage",), buckets=(1, 5))
+    histogram.observe(0.5, stage="a")
+    histogram.observe(3, stage="a")
+    histogram.observe(10, stage="a")
+
+    lines = histogram.render()
+    assert "# TYPE test_seconds histogram" in lines
+    assert 'test_seconds_bucket{stage="a",le="1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="5"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_sum{stage="a"} 13.5' in lines
+
+
+def test_ingestion_records_stage_metrics():
+    pipeline = IngestionPipeline(
+        PagesProcessor(), FakeEmbeddingService(dimensions=8, latency=0),
+        LocalVectorAdapter(data_dir=tempfile.mkdtemp()),
+    )
+    seen = []
+    before = {stage: metrics.STAGE_DURATION.count(stage=stage) for stage in ("extract", "embed")}
+    pages_before = metrics.STAGE_ITEMS.value(stage="extract")
+    succeeded_before = metrics.DOCUMENTS.value(status="succeeded")
+
+    result = pipeline.ingest("doc.pdf", "doc.pdf", on_progress=lambda *args: seen.append(args[:2]))
+
+    # Progress still reaches the caller's callback
+    assert ("upsert", "completed") in seen
+    assert metrics.STAGE_DURATION.count(stage="extract") == before["extract"] + 1
+    assert metrics.STAGE_DURATION.count(stage="embed") == before["embed"] + 1
+    assert metrics.STAGE_ITEMS.value(stage="extract") == pages_before + 3
+    assert metrics.DOCUMENTS.value(status="succeeded") == succeeded_before + 1
+    assert result["vectors_stored"] > 0
+
+
+def test_retries_are_counted_per_provider():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise TimeoutError("timed out")
+        return "ok"
+
+    before = metrics.PROVIDER_RETRIES.value(provider="flaky")
+    caller = ResilientCaller("flaky", sleep=lambda seconds: None)
+    assert caller.call(flaky) == "ok"
+    assert metrics.PROVIDER_RETRIES.value(provider="flaky") == before + 2
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    response = TestClient(main.app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE vectory_stage_duration_seconds histogram" in response.text
+    assert "# TYPE vectory_provider_retries_total counter" in response.text
+
+
+if __name__ == "__main__":
+    test_histogram_renders_cumulative_buckets()
+    test_ingestion_records_stage_metrics()
+    test_retries_are_counted_per_provider()
+    test_metrics_endpoint_serves_prometheus_text()
+    print("✓ All metrics tests passed!")
@@ -0,0 +1,50 @@
+"""
+Test script for page-parallel PDF extraction
+Runs offline against a generated PDF
+"""
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.pdf_corpus import make_pdf
+from services.pdf_processor import PDFProcessor
+
+
+def test_small_documents_use_a_single_range():
+    processor = PDFProcessor(extraction_workers=4, parallel_threshold_pages=64)
+    assert processor.page_ranges(63) == [(0, 63)]
+
+
+def test_ranges_cover_every_page_once():
+    processor = PDFProcessor(extraction_workers=4, parallel_threshold_pages=64)
+    ranges = processor.page_ranges(101)
+
+    assert len(ranges) == 8
+    assert ranges[0][0] == 0 and ranges[-1][1] == 101
+    assert all(prev_end == start for (_, prev_end), (start, _) in zip(ranges, ranges[1:]))
+
+
+def test_parallel_extraction_matches_serial_page_order():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=20)
+        serial = PDFProcessor(parallel_threshold_pages=10_000).extract_text_with_pages(pdf_path)
+
+        # A thread pool exercises the same range fan-out without process startup cost
+        processor = PDFProcessor(extraction_workers=3, parallel_threshold_pages=5)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            parallel = processor.extract_text_with_pages(pdf_path, executor=pool)
+
+    assert parallel == serial
+    assert [page["page_number"] for page in parallel] == list(range(1, 21))
+
+
+if __name__ == "__main__":
+    test_small_documents_use_a_single_range()
+    test_ranges_cover_every_page_once()
+    test_parallel_extraction_matches_serial_page_order()
+    print("✓ All parallel extraction tests passed!")
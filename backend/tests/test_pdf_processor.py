@@ -38,10 +38,10 @@ def test_pdf_processor():
             print("\n📝 Sample chunk (first chunk):")
             print("-" * 60)
             sample = chunks[0]
-            print(f"Page Number: {sample['page_number']}")
-            print(f"Chunk Index: {sample['chunk_index']}")
-            print(f"Text Length: {len(sample['text'])} characters")
-            print(f"Text Preview:\n{sample['text'][:200]}...")
+            print(f"Page Number: {sample.page_number}")
+            print(f"Chunk Index: {sample.chunk_index}")
+            print(f"Text Length: {len(sample.text)} characters")
+            print(f"Text Preview:\n{sample.text[:200]}...")
             print("-" * 60)
 
         # Display stats
@@ -0,0 +1,157 @@
+"""
+Test script for PineconeAdapter batched upserts
+Runs offline - swaps the Pinecone index for a fake that records requests
+"""
+import json
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from adapters import PineconeAdapter
+from services.ingestion import upsert_vectors
+from services.resilience import ResilientCaller
+
+
+class RejectedBatch(Exception):
+    status_code = 400  # Not retryable, so the batch is reported as failed
+
+
+class FakeIndex:
+    """Records upsert calls; rejects batches containing any ID in fail_ids."""
+
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.calls = []
+        self.payloads = []
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors, namespace, show_progress=True):
+        with self._lock:
+            self.calls.append([vector["id"] for vector in vectors])
+            self.payloads.append(vectors)
+        if any(vector["id"] in self.fail_ids for vector in vectors):
+            raise RejectedBatch("rejected")
+        return SimpleNamespace(upserted_count=len(vectors))
+
+
+def _adapter(index):
+    # Bypass __init__ so no Pinecone client or API key is needed
+    adapter = PineconeAdapter.__new__(PineconeAdapter)
+    adapter.index = index
+    adapter.upsert_concurrency = 4
+    adapter.use_grpc = False
+    adapter._dimension = None
+    adapter.resilience = ResilientCaller("test", sleep=lambda seconds: None)
+    return adapter
+
+
+def _records(count, dims=8, text="chunk"):
+    ids = [f"doc-chunk-{i}" for i in range(count)]
+    vectors = [[0.1] * dims for _ in range(count)]
+    metadata = [{"filename": "doc.pdf", "text": text} for _ in range(count)]
+    return vectors, metadata, ids
+
+
+def test_splits_by_vector_count():
+    index = FakeIndex()
+    vectors, metadata, ids = _records(2500)
+
+    result = _adapter(index).upsert(vectors, metadata, "doc", ids)
+
+    assert result["upserted_count"] == 2500
+    assert result["batch_count"] == 3
+    assert sorted(len(call) for call in index.calls) == [500, 1000, 1000]
+
+
+def test_splits_by_payload_size():
+    index = FakeIndex()
+    # ~40KB of text per vector → well under 100 vectors fit in a 2MB request
+    vectors, metadata, ids = _records(100, text="x" * 40_000)
+
+    result = _adapter(index).upsert(vectors, metadata, "doc", ids)
+
+    assert result["upserted_count"] == 100
+    assert result["batch_count"] > 1
+    assert all(len(call) < 50 for call in index.calls)
+
+
+def test_reports_failed_batches_without_aborting_others():
+    index = FakeIndex(fail_ids={"doc-chunk-1500"})
+    vectors, metadata, ids = _records(2500)
+
+    result = _adapter(index).upsert(vectors, metadata, "doc", ids)
+
+    assert result["upserted_count"] == 1500
+    assert len(result["failed_batches"]) == 1
+    assert result["failed_batches"][0]["ids"] == ids[1000:2000]
+
+
+def test_upsert_vectors_retries_only_failed_ids():
+    index = FakeIndex(fail_ids={"doc-chunk-1500"})
+    vectors, metadata, ids = _records(2500)
+    adapter = _adapter(index)
+
+    # Second attempt succeeds
+    original_upsert = index.upsert
+
+    def upsert_then_recover(vectors, namespace, show_progress=True):
+        if len(index.calls) >= 3:
+            index.fail_ids.clear()
+        return original_upsert(vectors, namespace, show_progress)
+
+    index.upsert = upsert_then_recover
+
+    assert upsert_vectors(adapter, vectors, metadata, "doc", ids) == 2500
+    assert index.calls[-1] == ids[1000:2000]
+
+
+def test_float32_vectors_are_sent_as_compact_rounded_floats():
+    index = FakeIndex()
+    vectors = (np.random.default_rng(0).standard_normal((3, 1536)) / 40).astype(np.float32)
+    ids = [f"doc-chunk-{i}" for i in range(3)]
+
+    _adapter(index).upsert(vectors, [{"filename": "doc.pdf"}] * 3, "doc", ids)
+
+    sent = index.payloads[0][0]["values"]
+    assert isinstance(sent, list) and isinstance(sent[0], float)
+    assert np.allclose(sent, vectors[0], atol=1e-8)
+    # Widened float32 values print ~20 characters each; rounded ones stay near 12
+    assert len(json.dumps(sent)) / 1536 < 13
+
+
+def test_dimension_mismatch_is_rejected():
+    adapter = _adapter(FakeIndex())
+    adapter.index_name = "vectory"
+    adapter.client = SimpleNamespace(describe_index=lambda name: SimpleNamespace(dimension=1536))
+
+    adapter.check_dimensions(1536)
+    try:
+        adapter.check_dimensions(512)
+    except ValueError as e:
+        assert "EMBEDDING_DIMENSIONS=1536" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+    vectors, metadata, ids = _records(3, dims=512)
+    try:
+        adapter.upsert(vectors, metadata, "doc", ids)
+    except ValueError as e:
+        assert "does not match index dimension" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    test_splits_by_vector_count()
+    test_splits_by_payload_size()
+    test_reports_failed_batches_without_aborting_others()
+    test_upsert_vectors_retries_only_failed_ids()
+    test_float32_vectors_are_sent_as_compact_rounded_floats()
+    test_dimension_mismatch_is_rejected()
+    print("✓ All Pinecone batching tests passed!")
@@ -0,0 +1,157 @@
+"""
+Test script for the shared resilience layer
+Runs offline - uses fake provider errors and a recorded sleep function
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    TokenBucket,
+    retry_after,
+)
+
+
+class ProviderError(Exception):
+    """Mimics an SDK error carrying an HTTP status and response headers."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FlakyCall:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_retries_transient_errors_then_succeeds():
+    sleeps = []
+    caller = ResilientCaller("test", sleep=sleeps.append)
+    call = FlakyCall(ProviderError(429), ProviderError(503))
+
+    assert caller.call(call) == "ok"
+    assert call.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_honors_retry_after_header():
+    sleeps = []
+    caller = ResilientCaller("test", base_delay=0.01, sleep=sleeps.append)
+
+    caller.call(FlakyCall(ProviderError(429, {"Retry-After": "7"})))
+
+    assert sleeps[0] >= 7
+
+
+def test_parses_openai_rate_limit_reset_headers():
+    error = ProviderError(429, {"x-ratelimit-reset-requests": "1.5s", "x-ratelimit-reset-tokens": "6m0s"})
+    assert retry_after(error) == 360
+
+    # Sent with every response - only a wait hint when the request was rate limited
+    assert retry_after(ProviderError(503, {"x-ratelimit-reset-tokens": "6m0s"})) is None
+
+    sleeps = []
+    caller = ResilientCaller("test", max_delay=30, sleep=sleeps.append)
+    caller.call(FlakyCall(error))
+    assert sleeps == [30], "Hints are capped at max_delay"
+
+
+def test_client_errors_are_not_retried():
+    caller = ResilientCaller("test", sleep=lambda seconds: None)
+    call = FlakyCall(ProviderError(400))
+
+    try:
+        caller.call(call)
+        raise AssertionError("Expected the 400 to propagate")
+    except ProviderError:
+        pass
+    assert call.calls == 1
+
+
+def test_client_errors_leave_circuit_state_unchanged():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    caller = ResilientCaller("test", max_attempts=1, breaker=breaker, sleep=lambda seconds: None)
+
+    for error in (ProviderError(500), ProviderError(400), ProviderError(500)):
+        try:
+            caller.call(FlakyCall(error))
+        except ProviderError:
+            pass
+    assert breaker.state == "open", "A 400 between failures doesn't reset the count"
+
+    # A half-open trial ending in a client error lets the next call try again
+    now[0] = 11
+    try:
+        caller.call(FlakyCall(ProviderError(400)))
+    except ProviderError:
+        pass
+    assert breaker.state == "half_open"
+    assert caller.call(FlakyCall()) == "ok" and breaker.state == "closed"
+
+
+def test_circuit_opens_and_fails_fast():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    caller = ResilientCaller("test", max_attempts=2, breaker=breaker, sleep=lambda seconds: None)
+
+    try:
+        caller.call(FlakyCall(ProviderError(500), ProviderError(500)))
+    except ProviderError:
+        pass
+    assert breaker.state == "open"
+
+    call = FlakyCall()
+    try:
+        caller.call(call)
+        raise AssertionError("Expected CircuitOpenError")
+    except CircuitOpenError:
+        pass
+    assert call.calls == 0
+
+    # After the reset timeout one trial call goes through and closes the circuit
+    now[0] = 11
+    assert caller.call(call) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    bucket = TokenBucket(rate=10, capacity=10, clock=lambda: now[0])
+    waits = []
+
+    def fake_sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket.acquire(10, sleep=fake_sleep)
+    bucket.acquire(5, sleep=fake_sleep)
+
+    assert waits == [0.5]
+
+
+if __name__ == "__main__":
+    test_retries_transient_errors_then_succeeds()
+    test_honors_retry_after_header()
+    test_parses_openai_rate_limit_reset_headers()
+    test_client_errors_are_not_retried()
+    test_client_errors_leave_circuit_state_unchanged()
+    test_circuit_opens_and_fails_fast()
+    test_token_bucket_waits_for_refill()
+    print("✓ All resilience tests passed!")
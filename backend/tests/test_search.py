@@ -0,0 +1,202 @@
+"""
+Test script for the search service and POST /api/search
+Runs offline - uses fake embedding and vector database services
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main
+from routers import search as search_router
+from services import search as search_module
+from services.search import QueryBatcher, ResultCache, SearchService
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def generate_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class CountingAdapter:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, vector, top_k, namespace, filter=None):
+        self.queries.append({"vector": vector, "top_k": top_k, "namespace": namespace, "filter": filter})
+        return [{"id": f"{namespace}-chunk-0", "score": 0.9, "metadata": {"text": "hello"}}]
+
+
+def _service(**cache_kwargs):
+    embeddings, adapter = CountingEmbeddings(), CountingAdapter()
+    service = SearchService(
+        embeddings,
+        adapter,
+        cache=ResultCache(**cache_kwargs),
+        batcher=QueryBatcher(embeddings.generate_embeddings, max_wait=0.02),
+    )
+    return service, embeddings, adapter
+
+
+def test_concurrent_queries_share_one_embedding_call():
+    service, embeddings, adapter = _service()
+
+    async def run():
+        return await asyncio.gather(*(
+            service.search(query, "ns") for query in ["alpha", "beta", "gamma", "alpha"]
+        ))
+
+    results = asyncio.run(run())
+
+    assert len(embeddings.calls) == 1
+    assert embeddings.calls[0] == ["alpha", "beta", "gamma"]  # Duplicates embedded once
+    assert [query["vector"] for query in adapter.queries[:3]] == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+    assert all(result["matches"][0]["id"] == "ns-chunk-0" for result in results)
+
+
+def test_batch_is_sent_early_when_full():
+    embeddings = CountingEmbeddings()
+    batcher = QueryBatcher(embeddings.generate_embeddings, max_batch=2, max_wait=10)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.embed("a"), batcher.embed("bb")), timeout=2
+        )
+
+    assert asyncio.run(run()) == [[1.0, 1.0], [2.0, 1.0]]
+    assert batcher.batches == 1
+
+
+def test_repeated_query_is_served_from_cache():
+    service, embeddings, adapter = _service()
+
+    first = asyncio.run(service.search("alpha", "ns", top_k=3, filter={"page_number": {"$eq": 2}}))
+    second = asyncio.run(service.search("alpha", "ns", top_k=3, filter={"page_number": {"$eq": 2}}))
+    other_filter = asyncio.run(service.search("alpha", "ns", top_k=3, filter={"page_number": {"$eq": 3}}))
+
+    assert first["cached"] is False and second["cached"] is True
+    assert other_filter["cached"] is False
+    assert len(embeddings.calls) == 2 and len(adapter.queries) == 2
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_cache_entries_expire_and_evict():
+    now = [0.0]
+    cache = ResultCache(max_entries=2, ttl=10, clock=lambda: now[0])
+
+    cache.put(("ns", "a"), 1)
+    cache.put(("ns", "b"), 2)
+    cache.get(("ns", "a"))
+    cache.put(("ns", "c"), 3)  # Evicts least recently used ("b")
+
+    assert cache.get(("ns", "b")) is None
+    assert cache.get(("ns", "a")) == 1
+
+    now[0] = 11
+    assert cache.get(("ns", "a")) is None
+
+    cache.put(("other", "a"), 4)
+    cache.put(("ns", "d"), 5)
+    cache.invalidate("ns")
+    assert cache.get(("ns", "d")) is None
+    assert cache.get(("other", "a")) == 4
+
+
+def test_cache_invalidated_from_worker_threads():
+    # Versioned ingestion invalidates from a worker thread while searches fill the cache
+    cache = ResultCache(max_entries=10_000, ttl=60)
+    stop = threading.Event()
+    errors = []
+
+    def invalidate():
+        try:
+            while not stop.is_set():
+                cache.invalidate("ns")
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=invalidate)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often enough to interleave
+    thread.start()
+    try:
+        for i in range(20_000):
+            cache.put(("ns", str(i)), i)
+            cache.get(("ns", str(i - 1)))
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(switch_interval)
+
+    assert not errors, errors
+    cache.invalidate("ns")
+    assert cache.stats()["entries"] == 0
+
+
+def test_search_endpoint_builds_metadata_filter():
+    service, _, adapter = _service()
+    original = search_router.get_search_service_async
+
+    async def get_service():
+        return service
+
+    search_router.get_search_service_async = get_service
+    try:
+        response = TestClient(main.app).post(
+            "/api/search",
+            json={"query": "alpha", "namespace": "doc.pdf-1234", "top_k": 4, "page_number": 7},
+        )
+    finally:
+        search_router.get_search_service_async = original
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["matches"][0]["metadata"]["text"] == "hello"
+    assert data["cached"] is False
+    assert adapter.queries[0]["filter"] == {"page_number": {"$eq": 7}}
+    assert adapter.queries[0]["top_k"] == 4
+
+
+def test_service_is_built_off_the_event_loop():
+    service, _, _ = _service()
+    built_in = []
+
+    def build():
+        built_in.append(threading.current_thread())
+        return service
+
+    original, original_service = search_module.get_search_service, search_module._service
+    search_module.get_search_service, search_module._service = build, None
+    try:
+        assert asyncio.run(search_module.get_search_service_async()) is service
+    finally:
+        search_module.get_search_service, search_module._service = original, original_service
+
+    # Network I/O of the first build (dimension check) never blocks the event loop
+    assert built_in and built_in[0] is not threading.main_thread()
+
+
+def test_search_endpoint_validates_request():
+    response = TestClient(main.app).post("/api/search", json={"query": "", "namespace": "ns"})
+    assert response.status_code == 422
+
+
+if __name__ == "__main__":
+    test_concurrent_queries_share_one_embedding_call()
+    test_batch_is_sent_early_when_full()
+    test_repeated_query_is_served_from_cache()
+    test_cache_entries_expire_and_evict()
+    test_cache_invalidated_from_worker_threads()
+    test_search_endpoint_builds_metadata_filter()
+    test_service_is_built_off_the_event_loop()
+    test_search_endpoint_validates_request()
+    print("✓ All search tests passed!")
@@ -0,0 +1,45 @@
+"""
+Test script for the shared SQLite store helpers
+Runs offline against temporary SQLite files
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.chunk_store import ChunkStore
+from services.sqlite_store import MAX_IN_VALUES, store_from_env
+
+
+def test_lookups_span_parameter_slices():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ChunkStore(os.path.join(tmp_dir, "chunks.sqlite3"))
+        ids = [f"doc-chunk-{i}" for i in range(MAX_IN_VALUES * 2 + 1)]
+        store.put_chunks("doc", ids, [f"text {i}" for i in range(len(ids))])
+
+        found = store.get_texts(ids + ["unknown"])
+        assert len(found) == len(ids)
+        assert found[ids[-1]] == f"text {len(ids) - 1}"
+        store.close()
+
+
+def test_store_from_env_is_created_once():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["TEST_SQLITE_STORE_PATH"] = os.path.join(tmp_dir, "chunks.sqlite3")
+        try:
+            store = store_from_env("TEST_SQLITE_STORE_PATH", ChunkStore)
+            assert store is store_from_env("TEST_SQLITE_STORE_PATH", ChunkStore)
+            assert store.path == os.environ["TEST_SQLITE_STORE_PATH"]
+            store.close()
+        finally:
+            del os.environ["TEST_SQLITE_STORE_PATH"]
+        assert store_from_env("TEST_SQLITE_STORE_PATH", ChunkStore) is None
+
+
+if __name__ == "__main__":
+    test_lookups_span_parameter_slices()
+    test_store_from_env_is_created_once()
+    print("✓ All SQLite store tests passed!")
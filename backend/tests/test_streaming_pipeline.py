@@ -0,0 +1,120 @@
+"""
+Test script for the streaming ingestion pipeline
+Runs offline - generates a PDF and uses in-memory embedding/vector fakes
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+from services.ingestion import IngestionPipeline
+from services.pdf_processor import PDFProcessor
+
+
+class StalledProcessor(PDFProcessor):
+    """Produces no chunks until released, so the consumer waits on an empty queue."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def iter_pages(self, pdf_path, *args, **kwargs):
+        return iter([])
+
+    def iter_chunks(self, pages):
+        self.release.wait(timeout=5)
+        return iter([])
+
+
+class RecordingAdapter(FakeVectorAdapter):
+    """Keeps every upsert call so batches and metadata can be inspected."""
+
+    def __init__(self):
+        super().__init__(latency=0)
+        self.calls = []
+
+    def upsert(self, vectors, metadata, namespace, ids):
+        self.calls.append((ids, metadata))
+        return super().upsert(vectors, metadata, namespace, ids)
+
+
+def _pipeline(adapter, streaming):
+    return IngestionPipeline(
+        PDFProcessor(),
+        FakeEmbeddingService(dimensions=8, latency=0),
+        adapter,
+        streaming=streaming,
+        stream_batch_size=50,
+    )
+
+
+def test_streaming_matches_batch_pipeline():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=30)
+
+        batch_adapter = RecordingAdapter()
+        batch_result = asyncio.run(_pipeline(batch_adapter, streaming=False).ingest_async(pdf_path, "doc.pdf"))
+
+        stream_adapter = RecordingAdapter()
+        stages = {}
+        stream_result = asyncio.run(_pipeline(stream_adapter, streaming=True).ingest_async(
+            pdf_path, "doc.pdf", lambda stage, status, details: stages.update({stage: status})
+        ))
+
+    assert stream_result["chunks_created"] == batch_result["chunks_created"]
+    assert stream_result["vectors_stored"] == batch_result["vectors_stored"]
+    assert all(status == "completed" for status in stages.values())
+
+    # Upserts arrive in rolling batches with document-wide chunk indexes
+    assert len(stream_adapter.calls) > 1
+    all_ids = [vector_id for ids, _ in stream_adapter.calls for vector_id in ids]
+    namespace = stream_result["namespace"]
+    assert all_ids == [f"{namespace}-chunk-{i}" for i in range(stream_result["chunks_created"])]
+    assert "total_chunks" not in stream_adapter.calls[0][1][0]
+
+
+def test_cancelled_stream_frees_its_worker_thread():
+    processor = StalledProcessor()
+    pipeline = IngestionPipeline(
+        processor, FakeEmbeddingService(dimensions=8, latency=0), RecordingAdapter(), streaming=True
+    )
+
+    async def run():
+        # One executor thread: it only runs the probe once the cancelled wait has returned
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+        loop.set_default_executor(executor)
+        task = asyncio.create_task(pipeline.ingest_async("unused.pdf", "doc.pdf"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(lambda: "free"), timeout=2)
+        except asyncio.TimeoutError:
+            return "still blocked"
+        finally:
+            # Don't let asyncio.run wait on a leaked thread when the check fails
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+            executor.shutdown(wait=False)
+
+    try:
+        assert asyncio.run(run()) == "free"
+    finally:
+        processor.release.set()
+
+
+if __name__ == "__main__":
+    test_streaming_matches_batch_pipeline()
+    test_cancelled_stream_frees_its_worker_thread()
+    print("✓ All streaming pipeline tests passed!")
@@ -0,0 +1,89 @@
+"""
+Test script for concurrent multi-file uploads
+Runs offline - patches the pipeline factory with fake OpenAI/Pinecone services
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+from services.clients import AppClients, get_clients
+from services.executors import shutdown_executors
+
+
+def _post(files):
+    main.app.dependency_overrides[get_clients] = lambda: AppClients(
+        embedding_factory=lambda: FakeEmbeddingService(dimensions=8, latency=0.5),
+        adapter_factory=lambda: FakeVectorAdapter(latency=0),
+    )
+    try:
+        return TestClient(main.app).post("/api/upload", files=files)
+    finally:
+        main.app.dependency_overrides.clear()
+        shutdown_executors()
+
+
+def test_files_are_processed_concurrently_and_fail_independently():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_bytes = Path(make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=3)).read_bytes()
+    files = [("files", (f"doc-{i}.pdf", pdf_bytes, "application/pdf")) for i in range(4)]
+    files.append(("files", ("broken.pdf", b"not a pdf", "application/pdf")))
+
+    start = time.perf_counter()
+    response = _post(files)
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is False
+    assert data["files_processed"] == 4
+    assert [error["filename"] for error in data["errors"]] == ["broken.pdf"]
+    assert data["errors"][0]["status_code"] == 503
+
+    # Four files with 0.5s embedding latency each: concurrent, not sequential
+    assert elapsed < 1.9, f"Uploads took {elapsed:.2f}s - files ran sequentially?"
+
+
+def test_request_fails_when_every_file_fails():
+    response = _post([("files", ("broken.pdf", b"not a pdf", "application/pdf"))])
+
+    assert response.status_code == 503
+    assert "broken.pdf" in response.json()["detail"]
+
+
+def test_concurrency_limit_read_per_request():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_bytes = Path(make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=3)).read_bytes()
+    files = [("files", (f"doc-{i}.pdf", pdf_bytes, "application/pdf")) for i in range(2)]
+
+    # Set after import, as load_dotenv() does in main.py
+    original = os.environ.get("UPLOAD_FILE_CONCURRENCY")
+    os.environ["UPLOAD_FILE_CONCURRENCY"] = "1"
+    try:
+        start = time.perf_counter()
+        response = _post(files)
+        elapsed = time.perf_counter() - start
+    finally:
+        if original is None:
+            del os.environ["UPLOAD_FILE_CONCURRENCY"]
+        else:
+            os.environ["UPLOAD_FILE_CONCURRENCY"] = original
+
+    assert response.status_code == 200 and response.json()["files_processed"] == 2
+    assert elapsed >= 1.0, f"Uploads took {elapsed:.2f}s - limit of 1 file at a time ignored?"
+
+
+if __name__ == "__main__":
+    test_files_are_processed_concurrently_and_fail_independently()
+    test_request_fails_when_every_file_fails()
+    test_concurrency_limit_read_per_request()
+    print("✓ All concurrent upload tests passed!")
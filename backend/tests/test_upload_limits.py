@@ -0,0 +1,58 @@
+"""
+Test script for streaming uploads to disk with a size guard
+Runs offline - no API keys needed
+"""
+import asyncio
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import HTTPException, UploadFile
+
+from routers import upload
+
+
+def _upload(data: bytes) -> UploadFile:
+    # size=None mimics chunked requests where the size isn't known up front
+    return UploadFile(file=io.BytesIO(data), filename="doc.pdf", size=None)
+
+
+def test_copies_upload_in_blocks():
+    data = os.urandom(upload.UPLOAD_BLOCK_SIZE * 2 + 123)
+
+    path = asyncio.run(upload._save_to_tempfile(_upload(data)))
+    try:
+        assert Path(path).read_bytes() == data
+    finally:
+        os.unlink(path)
+
+
+def test_rejects_oversize_upload_and_removes_partial_file():
+    # Set after import, as load_dotenv() does in main.py - the limit is read per request
+    original_limit = os.environ.get("MAX_UPLOAD_MB")
+    os.environ["MAX_UPLOAD_MB"] = "1"
+    before = set(os.listdir(tempfile.gettempdir()))
+    try:
+        asyncio.run(upload._save_to_tempfile(_upload(b"x" * (upload.UPLOAD_BLOCK_SIZE * 3))))
+        raise AssertionError("Expected 413")
+    except HTTPException as e:
+        assert e.status_code == 413
+    finally:
+        if original_limit is None:
+            del os.environ["MAX_UPLOAD_MB"]
+        else:
+            os.environ["MAX_UPLOAD_MB"] = original_limit
+
+    leftover = set(os.listdir(tempfile.gettempdir())) - before
+    assert not [name for name in leftover if name.endswith(".pdf")]
+
+
+if __name__ == "__main__":
+    test_copies_upload_in_blocks()
+    test_rejects_oversize_upload_and_removes_partial_file()
+    print("✓ All upload limit tests passed!")
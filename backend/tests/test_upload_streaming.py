@@ -0,0 +1,91 @@
+"""
+Test script for streamed upload progress (POST /api/upload?mode=stream)
+Runs offline - patches the clients with fake OpenAI/Pinecone services
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fakes import FakeEmbeddingService, FakeVectorAdapter
+from benchmarks.pdf_corpus import make_pdf
+from services.clients import AppClients, get_clients
+from services.executors import shutdown_executors
+
+
+def _stream(files, headers=None):
+    main.app.dependency_overrides[get_clients] = lambda: AppClients(
+        embedding_factory=lambda: FakeEmbeddingService(dimensions=8, latency=0),
+        adapter_factory=lambda: FakeVectorAdapter(latency=0),
+    )
+    try:
+        with TestClient(main.app).stream(
+            "POST", "/api/upload", params={"mode": "stream"}, files=files, headers=headers or {}
+        ) as response:
+            return response.status_code, response.headers["content-type"], list(response.iter_lines())
+    finally:
+        main.app.dependency_overrides.clear()
+        shutdown_executors()
+
+
+def _pdf_files():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_bytes = Path(make_pdf(os.path.join(tmp_dir, "doc.pdf"), pages=3)).read_bytes()
+    return [
+        ("files", ("a.pdf", pdf_bytes, "application/pdf")),
+        ("files", ("broken.pdf", b"not a pdf", "application/pdf")),
+    ]
+
+
+def test_ndjson_stream_reports_stages_then_results():
+    status, content_type, lines = _stream(_pdf_files())
+    events = [json.loads(line) for line in lines if line]
+
+    assert status == 200
+    assert content_type.startswith("application/x-ndjson")
+
+    progress = [(e["stage"], e["status"]) for e in events if e["event"] == "progress" and e["filename"] == "a.pdf"]
+    completed = [stage for stage, state in progress if state == "completed"]
+    assert completed == ["extract", "chunk", "embed", "upsert"], "Stages complete in pipeline order"
+    assert any(
+        e["event"] == "progress" and e["stage"] == "embed" and "embeddings_generated" in e["details"]
+        and e["status"] == "running" for e in events
+    ), "Embedding batches report running counts"
+
+    # Per-file outcome follows that file's progress; the summary comes last
+    result_index = next(i for i, e in enumerate(events) if e["event"] == "result")
+    assert events[result_index]["result"]["vectors_stored"] > 0
+    assert all(
+        i < result_index for i, e in enumerate(events) if e["event"] == "progress" and e["filename"] == "a.pdf"
+    )
+    assert any(e["event"] == "error" and e["filename"] == "broken.pdf" for e in events)
+
+    done = events[-1]
+    assert done["event"] == "done"
+    assert done["files_processed"] == 1 and done["success"] is False
+    assert [error["filename"] for error in done["errors"]] == ["broken.pdf"]
+
+
+def test_sse_framing_when_requested():
+    status, content_type, lines = _stream(_pdf_files()[:1], headers={"Accept": "text/event-stream"})
+
+    assert status == 200
+    assert content_type.startswith("text/event-stream")
+    names = [line[len("event: "):] for line in lines if line.startswith("event: ")]
+    data = [json.loads(line[len("data: "):]) for line in lines if line.startswith("data: ")]
+    assert len(names) == len(data)
+    assert names[-1] == "done" and data[-1]["success"] is True
+    assert names.count("result") == 1
+
+
+if __name__ == "__main__":
+    test_ndjson_stream_reports_stages_then_results()
+    test_sse_framing_when_requested()
+    print("✓ All streamed upload tests passed!")
@@ -0,0 +1,143 @@
+"""
+Ingestion worker: runs jobs from the durable queue (INGESTION_QUEUE=sqlite).
+
+The API only records uploads in the queue; workers claim them, run the
+checkpointed pipeline and write progress and results back, where
+GET /api/jobs/{job_id} reads them. Run one worker per core - with
+--processes, or as separate commands sharing INGESTION_QUEUE_PATH.
+
+A worker renews its lease on the running job every lease/3 seconds. If it
+dies, the lease expires (INGESTION_JOB_LEASE_SECONDS) and another worker
+claims the job and resumes it from its last checkpoint. A worker that finds
+its lease lost (e.g. it stalled past the lease) abandons the job at the next
+progress report and records nothing, leaving it to the new owner. SIGINT/SIGTERM let
+the current job finish before the worker exits.
+
+Usage (from backend/):
+    python -m worker
+    python -m worker --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from services.clients import shared_pipeline
+from services.ingestion import EmptyDocumentError, IngestionPipeline
+from services.job_queue import JobQueue, LeaseLostError, get_job_queue
+
+
+def run_worker(
+    queue: JobQueue,
+    pipeline_factory: Callable[[], IngestionPipeline] = shared_pipeline,
+    poll_interval: float = 1.0,
+    stop: Optional[threading.Event] = None,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """
+    Claim and run jobs until stop is set (or max_jobs have run). Returns the number of jobs run.
+
+    Raises:
+        Exception: If the pipeline services cannot be initialized
+    """
+    stop = stop or threading.Event()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    # Fail fast on missing API keys, before claiming a job we couldn't run
+    pipeline = pipeline_factory()
+
+    processed = 0
+    while not stop.is_set() and (max_jobs is None or processed < max_jobs):
+        job = queue.claim(worker_id)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        run_job(queue, pipeline, job, worker_id)
+        processed += 1
+    return processed
+
+
+def run_job(queue: JobQueue, pipeline: IngestionPipeline, job: Dict[str, Any], worker_id: str) -> None:
+    """Run one claimed job, renewing its lease until it finishes."""
+    job_id = job["job_id"]
+    done = threading.Event()
+    lease_lost = threading.Event()
+
+    def renew_lease() -> None:
+        while not done.wait(queue.lease_seconds / 3):
+            if not queue.heartbeat(job_id, worker_id):
+                lease_lost.set()
+                return
+
+    threading.Thread(target=renew_lease, daemon=True).start()
+
+    def on_progress(stage: str, status: str, details: Dict[str, Any]) -> None:
+        # Stop before writing over the progress of the worker that now owns the job
+        if lease_lost.is_set():
+            raise LeaseLostError(f"Lease on job {job_id} lost")
+        queue.update_stage(job_id, stage, status, details)
+
+    # Results are only recorded while this worker still holds the lease
+    try:
+        result = pipeline.ingest_resumable(
+            job["pdf_path"], job["filename"], queue.checkpoint(job_id), on_progress
+        )
+        queue.complete(job_id, result, worker_id=worker_id)
+    except LeaseLostError:
+        pass
+    except EmptyDocumentError as e:
+        # Retrying won't find text that isn't there
+        queue.fail(job_id, str(e), retry=False, worker_id=worker_id)
+    except Exception as e:
+        queue.fail(job_id, str(e), worker_id=worker_id)
+    finally:
+        done.set()
+
+
+def _serve(poll_interval: float) -> None:
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    processed = run_worker(get_job_queue(), poll_interval=poll_interval, stop=stop)
+    print(f"Worker {os.getpid()} stopped after {processed} jobs")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--processes", type=int, default=1, help="worker processes (e.g. one per core)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between polls of an empty queue")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.processes == 1:
+        _serve(args.poll_interval)
+        return
+
+    workers = [
+        multiprocessing.Process(target=_serve, args=(args.poll_interval,))
+        for _ in range(args.processes)
+    ]
+
+    def forward(signum: int, _frame: Any) -> None:
+        for worker in workers:
+            if worker.pid:
+                os.kill(worker.pid, signum)
+
+    # Ctrl-C already reaches every process in the group; SIGTERM is passed on
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, forward)
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -49,3 +49,85 @@ export async function uploadPDFs(files: File[]): Promise<UploadResult[]> {
   const data: UploadResponse = await response.json();
   return data.results;
 }
+
+interface UploadError {
+  filename: string;
+  status_code: number;
+  detail: string;
+}
+
+/** Per-file events streamed by /api/upload?mode=stream, keyed on `event` */
+export type UploadProgressEvent =
+  | {
+      event: "progress";
+      filename: string;
+      stage: "extract" | "chunk" | "embed" | "upsert";
+      status: string;
+      details: Record<string, number>;
+    }
+  | { event: "result"; filename: string; result: UploadResult }
+  | ({ event: "error" } & UploadError);
+
+/** Last event of the stream: same body as the non-streaming response */
+type UploadDoneEvent = { event: "done"; errors: UploadError[] } & UploadResponse;
+
+/**
+ * Upload PDF files and receive processing progress as it happens
+ * @param files Array of PDF files to upload
+ * @param onProgress Called for each progress/result/error event
+ * @returns Upload results with chunk and vector counts
+ * @throws Error if upload fails
+ */
+export async function uploadPDFsWithProgress(
+  files: File[],
+  onProgress: (event: UploadProgressEvent) => void
+): Promise<UploadResult[]> {
+  if (files.length === 0) {
+    throw new Error("No files provided");
+  }
+
+  const formData = new FormData();
+  files.forEach((file) => {
+    formData.append("files", file);
+  });
+
+  const response = await fetch(
+    `${process.env.NEXT_PUBLIC_API_URL}/api/upload?mode=stream`,
+    {
+      method: "POST",
+      body: formData,
+    }
+  );
+
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({
+      detail: "Upload failed",
+    }));
+    throw new Error(
+      errorData.detail || `Upload failed with status ${response.status}`
+    );
+  }
+
+  // One JSON event per line (NDJSON); the last event is the summary
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    const lines = buffer.split("\n");
+    buffer = lines.pop() ?? "";
+    for (const line of lines.filter(Boolean)) {
+      const event: UploadProgressEvent | UploadDoneEvent = JSON.parse(line);
+      if (event.event === "done") {
+        if (event.results.length === 0 && event.errors.length > 0) {
+          throw new Error(event.errors[0].detail);
+        }
+        return event.results;
+      }
+      onProgress(event);
+    }
+  }
+
+  throw new Error("Upload stream ended before processing finished");
+}